@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Loafware slice hot-path benchmarks.
+
+Runs offline against an in-process SimulatedCrumbsBus (no latency, no faults)
+and measures:
+  - per-call latency distribution and calls/sec of send_command(),
+    handle_message() and request_status() for RLHT and DCMT slices
+  - whole-rack sweep time as the number of slices grows
+  - logging overhead of the status path at INFO vs WARNING
+
+Results are written as JSON; pass --compare with an earlier result file to
+print the relative change of every median.
+
+Usage:
+    python benchmarks/bench_slices.py --output bench_results.json
+    python benchmarks/bench_slices.py --compare bench_results.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from pyCRUMBS import CRUMBSMessage
+from loafware.simulated_bus import SimulatedCrumbsBus, SimulatedRLHT, SimulatedDCMT
+from loafware.relay_heater_slice import RelayHeaterSlice
+from loafware.motor_controller_slice import MotorControllerSlice, CLOSED_LOOP_POSITION
+
+RACK_SIZES = [1, 5, 10, 20, 40]
+FIRST_ADDRESS = 0x08
+
+
+def measure(fn: Callable[[], object], iterations: int) -> Dict[str, float]:
+    """Time fn() individually `iterations` times; return latency stats in us."""
+    for _ in range(min(100, iterations)):  # warm-up
+        fn()
+    samples: List[float] = []
+    clock = time.perf_counter
+    start = clock()
+    for _ in range(iterations):
+        t0 = clock()
+        fn()
+        samples.append(clock() - t0)
+    total = clock() - start
+    samples.sort()
+    us = 1e6
+
+    def pct(p: float) -> float:
+        return samples[min(len(samples) - 1, int(p * len(samples)))] * us
+
+    return {
+        "iterations": iterations,
+        "calls_per_sec": iterations / total if total > 0 else 0.0,
+        "mean_us": statistics.mean(samples) * us,
+        "min_us": samples[0] * us,
+        "p50_us": pct(0.50),
+        "p90_us": pct(0.90),
+        "p99_us": pct(0.99),
+        "max_us": samples[-1] * us,
+    }
+
+
+def build_rack(count: int) -> Tuple[SimulatedCrumbsBus, List[object]]:
+    """Alternate RLHT and DCMT slices on one simulated bus."""
+    bus = SimulatedCrumbsBus()
+    slices: List[object] = []
+    for i in range(count):
+        address = FIRST_ADDRESS + i
+        if i % 2 == 0:
+            bus.add_device(address, SimulatedRLHT())
+            slices.append(RelayHeaterSlice(address, bus))
+        else:
+            bus.add_device(address, SimulatedDCMT())
+            slices.append(MotorControllerSlice(address, bus))
+    return bus, slices
+
+
+def bench_slices(iterations: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    bus, (rlht, dcmt) = build_rack(2)
+    dcmt.change_mode(CLOSED_LOOP_POSITION)
+
+    rlht_msg = CRUMBSMessage()
+    rlht_msg.typeID, rlht_msg.commandType = 1, 0
+    rlht_msg.data = [25.0, 26.0, 60.0, 40.0, 500.0, 250.0]
+    rlht_msg.errorFlags = 0
+    dcmt_msg = CRUMBSMessage()
+    dcmt_msg.typeID, dcmt_msg.commandType = 2, 0
+    dcmt_msg.data = [0.0, 10.0, -5.0, 9.5, -4.5, 0.0]
+    dcmt_msg.errorFlags = 0
+    payload = [1.0, 2.0, 0.0, 0.0, 0.0, 0.0]
+
+    for name, s, msg in (("rlht", rlht, rlht_msg), ("dcmt", dcmt, dcmt_msg)):
+        results[name + ".send_command"] = measure(
+            lambda: s.send_command(2, payload), iterations
+        )
+        results[name + ".handle_message"] = measure(
+            lambda: s.handle_message(msg), iterations
+        )
+        results[name + ".request_status"] = measure(s.request_status, iterations)
+    bus.close()
+    return results
+
+
+def bench_sweeps(iterations: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for count in RACK_SIZES:
+        bus, rack = build_rack(count)
+
+        def sweep() -> None:
+            for s in rack:
+                s.request_status()
+
+        results["sweep.%d_slices" % count] = measure(
+            sweep, max(10, iterations // count)
+        )
+        bus.close()
+    return results
+
+
+def bench_logging(iterations: int) -> Dict[str, Dict[str, float]]:
+    """Status path cost with slice loggers at INFO (emitting) vs WARNING."""
+    results: Dict[str, Dict[str, float]] = {}
+    devnull = open(os.devnull, "w")
+    handler = logging.StreamHandler(devnull)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+    root = logging.getLogger("loafware")
+    old_level, old_propagate = root.level, root.propagate
+    root.addHandler(handler)
+    root.propagate = False
+    try:
+        bus, rack = build_rack(2)
+        for level in (logging.INFO, logging.WARNING):
+            root.setLevel(level)
+            for s in rack:
+                name = "logging.%s.%s" % (
+                    logging.getLevelName(level).lower(),
+                    "rlht" if isinstance(s, RelayHeaterSlice) else "dcmt",
+                )
+                results[name] = measure(s.request_status, iterations)
+        bus.close()
+    finally:
+        root.removeHandler(handler)
+        root.setLevel(old_level)
+        root.propagate = old_propagate
+        devnull.close()
+    return results
+
+
+def compare(current: Dict[str, object], previous: Dict[str, object]) -> None:
+    """Print the relative change of each benchmark's median latency."""
+    cur = current["results"]
+    prev = previous["results"]
+    print("%-36s %12s %12s %9s" % ("benchmark", "prev p50 us", "p50 us", "change"))
+    for name in sorted(cur):
+        if name not in prev:
+            continue
+        before, after = prev[name]["p50_us"], cur[name]["p50_us"]
+        change = (after - before) / before * 100.0 if before else 0.0
+        print("%-36s %12.2f %12.2f %+8.1f%%" % (name, before, after, change))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    # benchmark the library, not the default WARNING/INFO console output
+    logging.getLogger("loafware").setLevel(logging.WARNING)
+
+    results: Dict[str, Dict[str, float]] = {}
+    results.update(bench_slices(args.iterations))
+    results.update(bench_sweeps(args.iterations))
+    results.update(bench_logging(args.iterations))
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    for name, r in sorted(results.items()):
+        print(
+            "%-36s p50=%9.2fus p99=%9.2fus %12.0f calls/s"
+            % (name, r["p50_us"], r["p99_us"], r["calls_per_sec"])
+        )
+    if previous is not None:
+        print()
+        compare(report, previous)
+    print("\nResults written to %s" % args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
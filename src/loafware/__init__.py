@@ -1,5 +1,66 @@
-from .slice_base import Slice
+from .metrics import METRICS
+from .tracing import TRACER, Tracer
+from .slice_base import NOT_FRESH, Slice
+from .change_subscription import ChangeSubscription
 from .relay_heater_slice import RelayHeaterSlice
 from .pycrumbs_wrapper import PyCRUMBSWrapper
+from .async_pycrumbs_wrapper import AsyncPyCRUMBSWrapper
+from .bus_worker import BusWorker
+from .bus_health import HealthTracker, HealthGuard
+from .simulated_bus import SimulatedCrumbsBus, SimulatedRLHT, SimulatedDCMT
+from .telemetry_history import TelemetryHistory
+from .influx_exporter import InfluxExporter
+from .discovery import discover, register_slice_type, SLICE_TYPES
+from .bus_manager import BusManager
+from .rest_api import RestServer, StateCache
+from .stream_hub import StreamHub
+from .bus_capture import CaptureWrapper, CaptureReader, ReplayBus
+from .pid_engine import PIDEngine
+from .fleet_state import FleetTable, FleetRowView
+from .trajectory import TrajectoryExecutor
+from .bus_daemon import BusDaemon, DaemonProxy
+from .telemetry_aggregation import WindowAggregator, LTTBDownsampler
+from .telemetry_store import TelemetryStore
+from .slice_poller import SlicePoller, PollStats, AdaptivePolicy
 
-__all__ = ["Slice", "RelayHeaterSlice", "PyCRUMBSWrapper"]
+__all__ = [
+    "METRICS",
+    "TRACER",
+    "Tracer",
+    "Slice",
+    "NOT_FRESH",
+    "ChangeSubscription",
+    "RelayHeaterSlice",
+    "PyCRUMBSWrapper",
+    "AsyncPyCRUMBSWrapper",
+    "BusWorker",
+    "HealthTracker",
+    "HealthGuard",
+    "SimulatedCrumbsBus",
+    "SimulatedRLHT",
+    "SimulatedDCMT",
+    "TelemetryHistory",
+    "InfluxExporter",
+    "discover",
+    "register_slice_type",
+    "SLICE_TYPES",
+    "BusManager",
+    "RestServer",
+    "StateCache",
+    "StreamHub",
+    "CaptureWrapper",
+    "CaptureReader",
+    "ReplayBus",
+    "PIDEngine",
+    "FleetTable",
+    "FleetRowView",
+    "TrajectoryExecutor",
+    "BusDaemon",
+    "DaemonProxy",
+    "WindowAggregator",
+    "LTTBDownsampler",
+    "TelemetryStore",
+    "SlicePoller",
+    "PollStats",
+    "AdaptivePolicy",
+]
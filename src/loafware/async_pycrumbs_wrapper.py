@@ -0,0 +1,77 @@
+# src/loafware/async_pycrumbs_wrapper.py
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+import asyncio
+import functools
+import logging
+import threading
+
+logger = logging.getLogger("loafware.async_pycrumbs_wrapper")
+
+T = TypeVar("T")
+
+# One front-end per underlying wrapper (i.e. per I2C bus), keyed by id(wrapper)
+_registry: Dict[int, "AsyncPyCRUMBSWrapper"] = {}
+_registry_lock = threading.Lock()
+
+
+class AsyncPyCRUMBSWrapper:
+    """
+    asyncio front-end for a (blocking) PyCRUMBSWrapper.
+    Every transaction for the bus runs on a single I/O thread owned by this
+    object, so bus access is serialized per bus while any number of coroutines
+    can await it concurrently. Rack-wide fan-out is then bounded by bus time:
+
+        await asyncio.gather(*(s.request_status_async() for s in rack))
+    """
+
+    def __init__(self, crumbs_wrapper: Any) -> None:
+        """
+        :param crumbs_wrapper: The blocking wrapper (PyCRUMBSWrapper or compatible).
+        """
+        self.crumbs = crumbs_wrapper
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="loafware-bus"
+        )
+        self._closed = False
+
+    @classmethod
+    def for_wrapper(cls, crumbs_wrapper: Any) -> "AsyncPyCRUMBSWrapper":
+        """Return the shared async front-end for crumbs_wrapper, creating it once."""
+        if isinstance(crumbs_wrapper, AsyncPyCRUMBSWrapper):
+            return crumbs_wrapper
+        with _registry_lock:
+            front = _registry.get(id(crumbs_wrapper))
+            if front is None or front.crumbs is not crumbs_wrapper or front._closed:
+                front = cls(crumbs_wrapper)
+                _registry[id(crumbs_wrapper)] = front
+            return front
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a blocking bus transaction (any callable) on this bus's I/O thread."""
+        if self._closed:
+            raise RuntimeError("AsyncPyCRUMBSWrapper is closed")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(fn, *args)
+        )
+
+    async def send_message(self, message: Any, target_address: int) -> None:
+        """Send a CRUMBSMessage to the specified target address."""
+        await self.run(self.crumbs.send_message, message, target_address)
+
+    async def request_message(self, target_address: int) -> Optional[Any]:
+        """Request a CRUMBSMessage from the specified target address."""
+        return await self.run(self.crumbs.request_message, target_address)
+
+    def close(self) -> None:
+        """Finish queued transactions, stop the I/O thread and close the bus."""
+        if self._closed:
+            return
+        self._closed = True
+        with _registry_lock:
+            if _registry.get(id(self.crumbs)) is self:
+                del _registry[id(self.crumbs)]
+        self._executor.shutdown(wait=True)
+        self.crumbs.close()
+        logger.info("AsyncPyCRUMBSWrapper: closed")
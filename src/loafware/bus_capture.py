@@ -0,0 +1,342 @@
+# src/loafware/bus_capture.py
+from typing import Any, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional
+from pyCRUMBS import CRUMBSMessage
+from .message_schema import FRAME, frame_dtype, normalize_payload
+from .slice_base import NOT_FRESH
+from concurrent.futures import Future
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only CaptureReader.as_array() needs it
+    np = None
+
+logger = logging.getLogger("loafware.bus_capture")
+
+# Record directions
+SENT = 0  # master -> slice write
+RECEIVED = 1  # slice -> master status reply
+NO_RESPONSE = 2  # request_message() returned None
+SEND_FAILED = 3  # send_message() raised
+
+# File header: magic, format version, record size
+HEADER = struct.Struct("<5sBH8x")
+MAGIC = b"LFCAP"
+VERSION = 1
+# Record: wall-clock timestamp, address, direction, then a FRAME
+RECORD = struct.Struct("<dBB" + FRAME.format.lstrip("<"))
+_EMPTY = [0.0] * 6
+
+
+class CaptureRecord(NamedTuple):
+    timestamp: float
+    address: int
+    direction: int
+    type_id: int
+    command_type: int
+    data: List[float]
+    error_flags: int
+
+
+def capture_dtype() -> Any:
+    """numpy dtype matching RECORD (packed, no alignment)."""
+    if np is None:
+        raise ImportError("capture_dtype requires numpy (pip install numpy)")
+    frame = frame_dtype()
+    return np.dtype(
+        [("timestamp", "<f8"), ("address", "u1"), ("direction", "u1")]
+        + [(name, frame.fields[name][0]) for name in frame.names]
+    )
+
+
+def _to_message(record: CaptureRecord) -> CRUMBSMessage:
+    msg = CRUMBSMessage()
+    msg.typeID = record.type_id
+    msg.commandType = record.command_type
+    msg.data = list(record.data)
+    msg.errorFlags = record.error_flags
+    return msg
+
+
+class CaptureWrapper:
+    """
+    Wrapper-compatible recorder: forwards every call to the inner wrapper and
+    appends one fixed-size record per transaction (timestamp, address,
+    direction, message frame) to a capture file. Records are packed with a
+    single struct call and written through a buffered file, so the capture
+    costs a few microseconds per transaction.
+
+    When the inner wrapper queues a write and returns a Future (a coalescing
+    BusWorker), the write is recorded once, when the Future resolves, with the
+    payload that won coalescing.
+    """
+
+    def __init__(
+        self,
+        crumbs_wrapper: Any,
+        path: str,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        :param crumbs_wrapper: The wrapper doing the bus I/O.
+        :param path: Capture file; appended to (after any partial trailing
+            record is cut off) if it already exists.
+        :param clock: Timestamp source (wall clock by default).
+        """
+        self.crumbs = crumbs_wrapper
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.records = 0
+        # queued write -> (address, newest message) until its Future resolves
+        self._queued: Dict[Future, Any] = {}
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new:
+            _check_header(path)
+            # drop a partial record (crash mid-write) so appends stay aligned
+            size = os.path.getsize(path)
+            whole = HEADER.size + (size - HEADER.size) // RECORD.size * RECORD.size
+            if size != whole:
+                logger.warning(
+                    "CaptureWrapper: dropping %d bytes of a partial record in %s",
+                    size - whole,
+                    path,
+                )
+                os.truncate(path, whole)
+        self._file = open(path, "ab")
+        if new:
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        logger.info("CaptureWrapper: recording bus traffic to %s", path)
+
+    def _write(self, address: int, direction: int, message: Any) -> None:
+        if message is None:
+            type_id, command_type, data, error_flags = 0, 0, _EMPTY, 0
+        else:
+            type_id = int(getattr(message, "typeID", 0))
+            command_type = int(getattr(message, "commandType", 0))
+            data = normalize_payload(getattr(message, "data", ()))
+            error_flags = int(getattr(message, "errorFlags", 0))
+        record = RECORD.pack(
+            self._clock(),
+            address,
+            direction,
+            type_id & 0xFF,
+            command_type & 0xFF,
+            *data,
+            error_flags & 0xFF,
+        )
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(record)
+            self.records += 1
+
+    def send_message(self, message: Any, target_address: int) -> Optional[Future]:
+        try:
+            result = self.crumbs.send_message(message, target_address)
+        except Exception:
+            self._write(target_address, SEND_FAILED, message)
+            raise
+        if not isinstance(result, Future):
+            self._write(target_address, SENT, message)
+            return result
+        with self._lock:
+            known = result in self._queued
+            self._queued[result] = (target_address, message)
+        if not known:
+            result.add_done_callback(self._record_queued)
+        return result
+
+    def _record_queued(self, future: Future) -> None:
+        with self._lock:
+            target_address, message = self._queued.pop(future)
+        if future.cancelled() or future.exception() is not None:
+            self._write(target_address, SEND_FAILED, message)
+        else:
+            self._write(target_address, SENT, message)
+
+    def request_message(self, target_address: int) -> Optional[Any]:
+        response = self.crumbs.request_message(target_address)
+        if response is NOT_FRESH:
+            return response  # no bus transaction behind it
+        if response is None:
+            self._write(target_address, NO_RESPONSE, None)
+        else:
+            self._write(target_address, RECEIVED, response)
+        return response
+
+    def flush(self) -> None:
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        """Close the inner wrapper, then finish the capture file."""
+        # closing first lets a BusWorker drain queued writes into the capture
+        self.crumbs.close()
+        with self._lock:
+            self._file.close()
+        logger.info("CaptureWrapper: %d records in %s", self.records, self.path)
+
+
+def _check_header(path: str) -> None:
+    with open(path, "rb") as f:
+        raw = f.read(HEADER.size)
+    if len(raw) < HEADER.size:
+        raise ValueError("%s: truncated capture header" % path)
+    magic, version, record_size = HEADER.unpack(raw)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError("%s: not a version %d loafware capture" % (path, VERSION))
+
+
+class CaptureReader:
+    """
+    Random access to a capture file through mmap: len(reader), reader[i],
+    iteration, and (with numpy) a zero-copy structured array of all records.
+    A trailing partial record (e.g. from a crash mid-write) is ignored.
+    """
+
+    def __init__(self, path: str) -> None:
+        _check_header(path)
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._count = (size - HEADER.size) // RECORD.size
+        self._map: Optional[mmap.mmap] = None
+        if self._count:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> CaptureRecord:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count or self._map is None:
+            raise IndexError("capture record %d out of range" % index)
+        fields = RECORD.unpack_from(self._map, HEADER.size + index * RECORD.size)
+        return CaptureRecord(*fields[:5], list(fields[5:11]), fields[11])
+
+    def __iter__(self) -> Iterator[CaptureRecord]:
+        for index in range(self._count):
+            yield self[index]
+
+    def as_array(self) -> Any:
+        """Zero-copy numpy view of every record (valid until close())."""
+        if np is None:
+            raise ImportError("as_array requires numpy (pip install numpy)")
+        if self._map is None:
+            return np.zeros(0, dtype=capture_dtype())
+        return np.frombuffer(
+            self._map, dtype=capture_dtype(), count=self._count, offset=HEADER.size
+        )
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+class ReplayBus:
+    """
+    Wrapper-compatible backend that answers request_message() with the
+    captured replies of each address, in recorded order, so the real slice
+    classes (and pollers, exporters, ...) run against production data.
+    speed=1.0 paces replies at their recorded timing, 10.0 ten times faster,
+    None as fast as possible. Writes are accepted and counted, not checked.
+    feed() skips the bus layer entirely for decode/state pipeline tests.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        speed: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.reader = CaptureReader(path)
+        self.speed = speed
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._replies: Dict[int, List[int]] = {}
+        for index, record in enumerate(self.reader):
+            if record.direction in (RECEIVED, NO_RESPONSE):
+                self._replies.setdefault(record.address, []).append(index)
+        self._cursor: Dict[int, int] = {}
+        self._origin = self.reader[0].timestamp if len(self.reader) else 0.0
+        self._started: Optional[float] = None
+        self.writes = 0
+        self.requests = 0
+
+    @property
+    def addresses(self) -> List[int]:
+        """Addresses with captured replies."""
+        return sorted(self._replies)
+
+    def exhausted(self, target_address: Optional[int] = None) -> bool:
+        """True once every captured reply (of one address) has been replayed."""
+        with self._lock:
+            addresses = self._replies if target_address is None else [target_address]
+            return all(
+                self._cursor.get(a, 0) >= len(self._replies.get(a, ()))
+                for a in addresses
+            )
+
+    def _pace(self, timestamp: float) -> None:
+        if not self.speed:
+            return
+        now = self._clock()
+        if self._started is None:
+            self._started = now
+        delay = self._started + (timestamp - self._origin) / self.speed - now
+        if delay > 0:
+            self._sleep(delay)
+
+    def send_message(self, message: Any, target_address: int) -> None:
+        with self._lock:
+            self.writes += 1
+
+    def request_message(self, target_address: int) -> Optional[CRUMBSMessage]:
+        with self._lock:
+            indexes = self._replies.get(target_address, ())
+            cursor = self._cursor.get(target_address, 0)
+            if cursor >= len(indexes):
+                return None
+            self._cursor[target_address] = cursor + 1
+            self.requests += 1
+        record = self.reader[indexes[cursor]]
+        self._pace(record.timestamp)
+        if record.direction == NO_RESPONSE:
+            return None
+        return _to_message(record)
+
+    def feed(self, slices: Mapping[int, Any]) -> int:
+        """
+        Pass every captured reply to slices[address].handle_message() in
+        recorded order (paced by speed). Returns the number of messages fed.
+        """
+        fed = 0
+        for record in self.reader:
+            if record.direction != RECEIVED:
+                continue
+            slice_obj = slices.get(record.address)
+            if slice_obj is None:
+                continue
+            self._pace(record.timestamp)
+            slice_obj.handle_message(_to_message(record))
+            fed += 1
+        return fed
+
+    def rewind(self) -> None:
+        with self._lock:
+            self._cursor.clear()
+            self._started = None
+
+    def close(self) -> None:
+        self.reader.close()
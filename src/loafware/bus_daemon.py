@@ -0,0 +1,317 @@
+# src/loafware/bus_daemon.py
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from pyCRUMBS import CRUMBSMessage
+from .message_schema import FRAME, normalize_payload
+from .slice_base import NOT_FRESH
+import heapq
+import logging
+import multiprocessing
+import os
+import struct
+import threading
+import time
+
+logger = logging.getLogger("loafware.bus_daemon")
+
+# Row of the shared table: seqlock counter, timestamp of the last poll,
+# state (NEVER / OK / NO_RESPONSE), polls, last and max release jitter, FRAME
+ROW = struct.Struct("<IdBIdd" + FRAME.format.lstrip("<"))
+NEVER = 0
+OK = 1
+NO_RESPONSE = 2
+
+
+def _to_message(
+    type_id: int, command_type: int, data: Sequence[float], error_flags: int
+) -> CRUMBSMessage:
+    msg = CRUMBSMessage()
+    msg.typeID = type_id
+    msg.commandType = command_type
+    msg.data = list(data)
+    msg.errorFlags = error_flags
+    return msg
+
+
+def _write_row(
+    view: memoryview,
+    row: int,
+    timestamp: float,
+    state: int,
+    polls: int,
+    jitter: float,
+    max_jitter: float,
+    frame: Tuple[Any, ...],
+) -> None:
+    offset = row * ROW.size
+    seq = struct.unpack_from("<I", view, offset)[0]
+    struct.pack_into("<I", view, offset, (seq + 1) & 0xFFFFFFFF)  # odd: writing
+    ROW.pack_into(
+        view,
+        offset,
+        (seq + 1) & 0xFFFFFFFF,
+        timestamp,
+        state,
+        polls,
+        jitter,
+        max_jitter,
+        *frame,
+    )
+    struct.pack_into("<I", view, offset, (seq + 2) & 0xFFFFFFFF)
+
+
+def _daemon_main(
+    bus_factory: Callable[[], Any],
+    shared: Any,
+    conn: Any,
+    cpus: Optional[Sequence[int]],
+) -> None:
+    """Child process: owns the bus, polls on schedule, executes commands."""
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, set(cpus))
+    view = memoryview(shared).cast("B")
+    wrapper = bus_factory()
+    schedule: List[Any] = []  # heap of (release, generation, address)
+    # address -> [row, period, polls, max jitter, generation]
+    entries: Dict[int, List[Any]] = {}
+    generation = 0
+    empty = (0, 0) + (0.0,) * 6 + (0,)
+    clock = time.monotonic
+    try:
+        while True:
+            timeout = None
+            if schedule:
+                timeout = max(0.0, schedule[0][0] - clock())
+            # commands first: a pending command delays the next poll
+            if conn.poll(timeout):
+                request = conn.recv()
+                op = request[0]
+                if op == "stop":
+                    conn.send(("ok", None))
+                    return
+                try:
+                    if op == "send":
+                        wrapper.send_message(_to_message(*request[2:]), request[1])
+                    elif op == "add":
+                        _, address, row, period = request
+                        # a new generation: heap items of an earlier add are stale
+                        generation += 1
+                        entries[address] = [row, period, 0, 0.0, generation]
+                        heapq.heappush(schedule, (clock(), generation, address))
+                    elif op == "remove":
+                        entries.pop(request[1], None)
+                    conn.send(("ok", None))
+                except Exception as e:
+                    conn.send(("error", "%s: %s" % (type(e).__name__, e)))
+                continue
+            release, item_generation, address = heapq.heappop(schedule)
+            entry = entries.get(address)
+            if entry is None or entry[4] != item_generation:
+                continue  # removed or re-added
+            row, period = entry[0], entry[1]
+            started = clock()
+            jitter = started - release
+            try:
+                response = wrapper.request_message(address)
+            except Exception:
+                response = None
+            entry[2] += 1
+            entry[3] = max(entry[3], jitter)
+            if response is None:
+                state, frame = NO_RESPONSE, empty
+            else:
+                state = OK
+                frame = (
+                    int(getattr(response, "typeID", 0)) & 0xFF,
+                    int(getattr(response, "commandType", 0)) & 0xFF,
+                    *normalize_payload(getattr(response, "data", ())),
+                    int(getattr(response, "errorFlags", 0)) & 0xFF,
+                )
+            _write_row(view, row, started, state, entry[2], jitter, entry[3], frame)
+            release += period
+            now = clock()
+            if release < now:
+                # overran: skip to the next period boundary instead of bursting
+                release += ((now - release) // period + 1) * period
+            heapq.heappush(schedule, (release, item_generation, address))
+    finally:
+        wrapper.close()
+
+
+class BusDaemon:
+    """
+    Runs all traffic of one bus in a dedicated child process, so poll timing
+    is isolated from the GIL and GC pauses of the application process.
+
+    The child polls every registered address on its own schedule and writes
+    the latest raw status frame into a shared-memory table (one seqlocked
+    row per address). Writes are forwarded to it over a pipe and acked.
+    `daemon.proxy` is a wrapper-compatible object for the parent's slices:
+    request_message() decodes a newly polled shared frame without any I/O
+    or IPC (NOT_FRESH until the child has polled again, so slices polled
+    faster than the child keep their state instead of seeing a failure),
+    send_message() waits for the child to execute the write.
+
+        daemon = BusDaemon(functools.partial(PyCRUMBSWrapper, 1))
+        daemon.start()
+        daemon.add_address(0x0A, 0.1)
+        rlht = RelayHeaterSlice(0x0A, daemon.proxy)
+    """
+
+    def __init__(
+        self,
+        bus_factory: Callable[[], Any],
+        capacity: int = 128,
+        max_age: Optional[float] = None,
+        cpus: Optional[Sequence[int]] = None,
+    ) -> None:
+        """
+        :param bus_factory: Picklable callable creating the wrapper in the child.
+        :param capacity: Maximum number of polled addresses.
+        :param max_age: Treat frames older than this (s) as no response.
+        :param cpus: Optional CPU affinity of the child process.
+        """
+        self.bus_factory = bus_factory
+        self.capacity = capacity
+        self.max_age = max_age
+        self.cpus = cpus
+        self._shared = multiprocessing.RawArray("B", ROW.size * capacity)
+        self._view = memoryview(self._shared).cast("B")
+        self._rows: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._conn: Any = None
+        self._process: Optional[multiprocessing.Process] = None
+        self.proxy = DaemonProxy(self)
+
+    def start(self) -> None:
+        """Start the child process (it opens the bus)."""
+        if self._process is not None:
+            return
+        parent_conn, child_conn = multiprocessing.Pipe()
+        self._conn = parent_conn
+        self._process = multiprocessing.Process(
+            target=_daemon_main,
+            args=(self.bus_factory, self._shared, child_conn, self.cpus),
+            name="loafware-bus-daemon",
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        logger.info("BusDaemon: child pid %d started", self._process.pid)
+
+    def _call(self, *request: Any) -> None:
+        if self._process is None or not self._process.is_alive():
+            raise OSError("bus daemon is not running")
+        with self._lock:
+            self._conn.send(request)
+            status, detail = self._conn.recv()
+        if status != "ok":
+            raise OSError(detail)
+
+    def add_address(self, target_address: int, period: float) -> None:
+        """Poll target_address every period seconds in the child."""
+        with self._lock:
+            row = self._rows.get(target_address)
+            if row is None:
+                if len(self._rows) >= self.capacity:
+                    raise ValueError("bus daemon table is full")
+                row = self._rows[target_address] = len(self._rows)
+        self._call("add", target_address, row, float(period))
+
+    def remove_address(self, target_address: int) -> None:
+        self._call("remove", target_address)
+
+    def send(self, message: Any, target_address: int) -> None:
+        self._call(
+            "send",
+            target_address,
+            int(getattr(message, "typeID", 0)),
+            int(getattr(message, "commandType", 0)),
+            normalize_payload(getattr(message, "data", ())),
+            int(getattr(message, "errorFlags", 0)),
+        )
+
+    def read(
+        self, target_address: int, retries: int = 100
+    ) -> Optional[Tuple[Any, ...]]:
+        """
+        Consistent copy of an address's row (seqlock read); None if it is not
+        polled or the child kept it busy for `retries` attempts.
+        """
+        row = self._rows.get(target_address)
+        if row is None:
+            return None
+        offset = row * ROW.size
+        for _ in range(retries):
+            before = struct.unpack_from("<I", self._view, offset)[0]
+            if before & 1:
+                continue
+            values = ROW.unpack_from(self._view, offset)
+            if struct.unpack_from("<I", self._view, offset)[0] == before:
+                return values
+        return None
+
+    def stats(self) -> Dict[int, Dict[str, float]]:
+        """Per-address poll count, jitter and age of the latest sample."""
+        now = time.monotonic()
+        out = {}
+        for address in list(self._rows):
+            values = self.read(address)
+            if values is None:
+                continue
+            out[address] = {
+                "polls": values[3],
+                "last_jitter": values[4],
+                "max_jitter": values[5],
+                "age": now - values[1] if values[2] != NEVER else float("inf"),
+                "responding": values[2] == OK,
+            }
+        return out
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Ask the child to close the bus and exit."""
+        if self._process is None:
+            return
+        try:
+            if self._process.is_alive():
+                self._call("stop")
+        except (OSError, EOFError) as e:
+            logger.warning("BusDaemon: stop request failed: %s", e)
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process = None
+        self._conn.close()
+        logger.info("BusDaemon: stopped")
+
+
+class DaemonProxy:
+    """Wrapper-compatible view of a BusDaemon for slices in the parent."""
+
+    def __init__(self, daemon: BusDaemon) -> None:
+        self._daemon = daemon
+        self._delivered: Dict[int, Tuple[int, float]] = {}  # address -> (polls, ts)
+
+    def send_message(self, message: Any, target_address: int) -> None:
+        self._daemon.send(message, target_address)
+
+    def request_message(self, target_address: int) -> Optional[Any]:
+        """
+        The frame polled by the child since the previous call, without
+        touching the bus. NOT_FRESH if the device answers but there is no new
+        frame yet (so history, stores and exporters never record a sample
+        twice); None if the child's last poll got no response.
+        """
+        values = self._daemon.read(target_address)
+        if values is None or values[2] != OK:
+            return None
+        max_age = self._daemon.max_age
+        if max_age is not None and time.monotonic() - values[1] > max_age:
+            return None
+        poll = (values[3], values[1])
+        if self._delivered.get(target_address) == poll:
+            return NOT_FRESH
+        self._delivered[target_address] = poll
+        return _to_message(values[6], values[7], values[8:14], values[14])
+
+    def close(self) -> None:
+        self._daemon.stop()
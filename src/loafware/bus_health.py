@@ -0,0 +1,268 @@
+# src/loafware/bus_health.py
+from typing import Any, Callable, Dict, List, Optional
+from .metrics import METRICS, format_address
+import logging
+import threading
+import time
+
+logger = logging.getLogger("loafware.bus_health")
+
+# Circuit breaker states
+CLOSED = "closed"  # healthy, polled normally
+OPEN = "open"  # out of rotation, only probed every probe_interval
+HALF_OPEN = "half_open"  # a probe is allowed through
+
+# callback(target_address) on trip / recovery
+HealthListener = Callable[[int], None]
+
+
+class AddressHealth:
+    """Health record of one bus address."""
+
+    def __init__(self) -> None:
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.next_attempt = 0.0
+        self.total_failures = 0
+        self.trips = 0
+        self.recoveries = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "next_attempt": self.next_attempt,
+            "total_failures": self.total_failures,
+            "trips": self.trips,
+            "recoveries": self.recoveries,
+        }
+
+
+class HealthTracker:
+    """
+    Per-address failure tracking with exponential backoff and a circuit breaker.
+    After each failure an address is not read again for base_backoff * 2^(n-1)
+    seconds (capped at max_backoff). After failure_threshold consecutive
+    failures the breaker opens: the address leaves the poll rotation and is
+    only probed every probe_interval seconds. The first success closes the
+    breaker again and fires the recovery listeners.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        base_backoff: float = 0.05,
+        max_backoff: float = 2.0,
+        probe_interval: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        :param failure_threshold: Consecutive failures that open the breaker.
+        :param base_backoff: Backoff after the first failure (s).
+        :param max_backoff: Backoff cap while the breaker is closed (s).
+        :param probe_interval: Probe period of an open breaker (s).
+        :param clock: Monotonic time source.
+        """
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.probe_interval = probe_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._addresses: Dict[int, AddressHealth] = {}
+        self._trip_listeners: List[HealthListener] = []
+        self._recovery_listeners: List[HealthListener] = []
+
+    def _get(self, target_address: int) -> AddressHealth:
+        health = self._addresses.get(target_address)
+        if health is None:
+            health = self._addresses[target_address] = AddressHealth()
+        return health
+
+    def add_trip_listener(self, callback: HealthListener) -> None:
+        """Call callback(address) when an address is taken out of rotation."""
+        self._trip_listeners.append(callback)
+
+    def add_recovery_listener(self, callback: HealthListener) -> None:
+        """Call callback(address) when an out-of-rotation address answers again."""
+        self._recovery_listeners.append(callback)
+
+    def next_attempt(self, target_address: int) -> float:
+        """Earliest clock() time at which the address should be read again."""
+        with self._lock:
+            health = self._addresses.get(target_address)
+            return 0.0 if health is None else health.next_attempt
+
+    def allow(self, target_address: int) -> bool:
+        """
+        True if a read of the address may go on the bus now. An open breaker
+        lets one probe through per probe_interval.
+        """
+        with self._lock:
+            health = self._addresses.get(target_address)
+            if health is None or health.state == CLOSED and not health.next_attempt:
+                return True
+            if self._clock() < health.next_attempt:
+                return False
+            if health.state == OPEN:
+                health.state = HALF_OPEN
+                # hold further probes back until this one reports
+                health.next_attempt = self._clock() + self.probe_interval
+            return True
+
+    def state(self, target_address: int) -> str:
+        with self._lock:
+            health = self._addresses.get(target_address)
+            return CLOSED if health is None else health.state
+
+    def record_success(self, target_address: int) -> None:
+        with self._lock:
+            health = self._addresses.get(target_address)
+            if health is None or (
+                health.state == CLOSED and not health.consecutive_failures
+            ):
+                return
+            recovered = health.state != CLOSED
+            health.state = CLOSED
+            health.consecutive_failures = 0
+            health.next_attempt = 0.0
+            if recovered:
+                health.recoveries += 1
+            listeners = list(self._recovery_listeners) if recovered else []
+        if recovered:
+            logger.warning("0x%02X recovered; back in rotation", target_address)
+        for callback in listeners:
+            self._fire(callback, target_address)
+
+    def record_failure(self, target_address: int, cause: str = "failure") -> None:
+        now = self._clock()
+        with self._lock:
+            health = self._get(target_address)
+            health.consecutive_failures += 1
+            health.total_failures += 1
+            tripped = False
+            if health.state == HALF_OPEN or (
+                health.state == CLOSED
+                and health.consecutive_failures >= self.failure_threshold
+            ):
+                tripped = health.state == CLOSED
+                health.state = OPEN
+                health.next_attempt = now + self.probe_interval
+                if tripped:
+                    health.trips += 1
+            elif health.state == CLOSED:
+                backoff = self.base_backoff * 2 ** (health.consecutive_failures - 1)
+                health.next_attempt = now + min(backoff, self.max_backoff)
+            listeners = list(self._trip_listeners) if tripped else []
+        if tripped:
+            if METRICS.enabled:
+                METRICS.errors.inc(format_address(target_address), "breaker_open")
+            logger.warning(
+                "0x%02X failed %d times (last: %s); out of rotation, "
+                "probing every %.1fs",
+                target_address,
+                self.failure_threshold,
+                cause,
+                self.probe_interval,
+            )
+        for callback in listeners:
+            self._fire(callback, target_address)
+
+    @staticmethod
+    def _fire(callback: HealthListener, target_address: int) -> None:
+        try:
+            callback(target_address)
+        except Exception as e:
+            logger.exception("health listener failed for 0x%02X: %s", target_address, e)
+
+    def snapshot(self) -> Dict[int, Dict[str, Any]]:
+        with self._lock:
+            return {a: h.as_dict() for a, h in self._addresses.items()}
+
+
+class HealthGuard:
+    """
+    Wrapper-compatible guard that feeds a HealthTracker.
+    Reads of an address in backoff / with an open breaker return None at once
+    without touching the bus. Every transaction slower than `timeout` counts
+    as a failure; when the inner wrapper supports it (BusWorker) the caller
+    also stops waiting after `timeout`. Writes are always attempted, so a
+    brake command still reaches a device whose breaker is open, and a
+    successful write closes the breaker.
+
+    The SlicePoller picks up `guard.health` and reschedules skipped reads
+    instead of spending sweep time on them.
+    """
+
+    def __init__(
+        self,
+        crumbs_wrapper: Any,
+        health: Optional[HealthTracker] = None,
+        timeout: Optional[float] = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        :param crumbs_wrapper: The wrapper (or BusWorker) actually doing I/O.
+        :param health: Tracker to feed (a default one is created if None).
+        :param timeout: Transaction time budget (s); None disables it.
+        :param clock: Monotonic time source used for the timeout.
+        """
+        self.crumbs = crumbs_wrapper
+        self.health = health if health is not None else HealthTracker()
+        self.timeout = timeout
+        self._clock = clock
+        if timeout is not None and hasattr(crumbs_wrapper, "timeout"):
+            crumbs_wrapper.timeout = timeout
+
+    def _slow(self, started: float) -> bool:
+        return self.timeout is not None and self._clock() - started > self.timeout
+
+    def send_message(self, message: Any, target_address: int) -> Optional[Any]:
+        started = self._clock()
+        try:
+            queued = self.crumbs.send_message(message, target_address)
+        except Exception:
+            self.health.record_failure(target_address, "send_error")
+            raise
+        if queued is None:
+            self._record_write(target_address, started, None)
+        else:
+            # coalescing BusWorker: only queued, judge it once it has completed
+            queued.add_done_callback(
+                lambda future: self._record_write(target_address, started, future)
+            )
+        return queued
+
+    def _record_write(
+        self, target_address: int, started: float, future: Optional[Any]
+    ) -> None:
+        if future is not None and (
+            future.cancelled() or future.exception() is not None
+        ):
+            self.health.record_failure(target_address, "send_error")
+        elif self._slow(started):
+            self.health.record_failure(target_address, "timeout")
+        else:
+            self.health.record_success(target_address)
+
+    def request_message(self, target_address: int) -> Optional[Any]:
+        if not self.health.allow(target_address):
+            return None
+        started = self._clock()
+        try:
+            response = self.crumbs.request_message(target_address)
+        except Exception as e:
+            cause = "timeout" if self._slow(started) else "request_error"
+            self.health.record_failure(target_address, cause)
+            logger.debug("request_message: 0x%02X failed: %s", target_address, e)
+            return None
+        if response is None:
+            self.health.record_failure(target_address, "no_response")
+        elif self._slow(started):
+            self.health.record_failure(target_address, "timeout")
+        else:
+            self.health.record_success(target_address)
+        return response
+
+    def close(self) -> None:
+        self.crumbs.close()
@@ -0,0 +1,277 @@
+# src/loafware/bus_manager.py
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+from .bus_worker import BusWorker
+from .discovery import SCAN_RANGE, discover
+from .slice_base import Slice
+from .slice_poller import AdaptivePolicy, SlicePoller
+import logging
+
+logger = logging.getLogger("loafware.bus_manager")
+
+# (bus key, target address) - addresses are only unique per bus
+SliceKey = Tuple[Any, int]
+
+
+class _Bus:
+    __slots__ = ("key", "worker", "executor", "command_executor", "poller", "slices")
+
+    def __init__(self, key: Any, worker: BusWorker) -> None:
+        self.key = key
+        self.worker = worker
+        # runs the rack-wide status sweeps of this bus, in order
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="loafware-bus-%s" % key
+        )
+        # rack-wide commands get their own thread: they must not wait behind a
+        # sweep, their writes reach the BusWorker queue (and its priorities)
+        # while the sweep is still running
+        self.command_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="loafware-bus-%s-cmd" % key
+        )
+        self.poller: Optional[SlicePoller] = None
+        self.slices: Dict[int, Slice] = {}
+
+
+class BusManager:
+    """
+    Owns several CRUMBS buses (I2C buses or multiplexer channels) and the
+    slices on them. Every bus gets its own BusWorker, so transactions on
+    different buses run truly in parallel, plus an optional SlicePoller.
+    Rack-wide calls fan out to one thread per bus and walk that bus's slices
+    in address order, so total sweep time is that of the slowest bus.
+    """
+
+    def __init__(self, coalesce: bool = False) -> None:
+        """:param coalesce: Passed to every BusWorker (latest-wins setpoints)."""
+        self.coalesce = coalesce
+        self._buses: Dict[Any, _Bus] = {}
+
+    @classmethod
+    def from_bus_numbers(
+        cls, bus_numbers: Iterable[int], coalesce: bool = False
+    ) -> "BusManager":
+        """Open a PyCRUMBSWrapper for each Linux I2C bus number."""
+        from .pycrumbs_wrapper import PyCRUMBSWrapper
+
+        manager = cls(coalesce=coalesce)
+        for bus_number in bus_numbers:
+            manager.add_bus(bus_number, PyCRUMBSWrapper(bus_number))
+        return manager
+
+    # --- buses ------------------------------------------------------------
+
+    def add_bus(self, bus_key: Any, crumbs_wrapper: Any) -> BusWorker:
+        """
+        Take ownership of a bus wrapper and start its I/O worker.
+        :param bus_key: Name of the bus (e.g. its bus number).
+        :param crumbs_wrapper: The wrapper doing the bus I/O.
+        :return: The BusWorker slices on this bus must use.
+        """
+        if bus_key in self._buses:
+            raise ValueError("bus %r already added" % (bus_key,))
+        worker = BusWorker(crumbs_wrapper, coalesce=self.coalesce, name=str(bus_key))
+        self._buses[bus_key] = _Bus(bus_key, worker)
+        logger.info("BusManager: added bus %s", bus_key)
+        return worker
+
+    def bus(self, bus_key: Any) -> BusWorker:
+        return self._buses[bus_key].worker
+
+    @property
+    def bus_keys(self) -> List[Any]:
+        return list(self._buses)
+
+    # --- slices -----------------------------------------------------------
+
+    def create_slice(
+        self,
+        bus_key: Any,
+        slice_class: Type[Slice],
+        target_address: int,
+        period: Optional[float] = None,
+        adaptive: Optional[AdaptivePolicy] = None,
+    ) -> Slice:
+        """Instantiate slice_class on a bus and register it (see add_slice)."""
+        slice_obj = slice_class(target_address, self._buses[bus_key].worker)
+        self.add_slice(bus_key, slice_obj, period, adaptive)
+        return slice_obj
+
+    def add_slice(
+        self,
+        bus_key: Any,
+        slice_obj: Slice,
+        period: Optional[float] = None,
+        adaptive: Optional[AdaptivePolicy] = None,
+    ) -> bool:
+        """
+        Assign a slice to a bus. A slice built on the bus's raw wrapper is
+        rebound to the bus worker. With a period it is also scheduled on the
+        bus's SlicePoller.
+        """
+        bus = self._buses.get(bus_key)
+        if bus is None:
+            logger.error("add_slice: unknown bus %r", bus_key)
+            return False
+        if slice_obj.crumbs is bus.worker.crumbs:
+            slice_obj.crumbs = bus.worker
+        elif slice_obj.crumbs is not bus.worker:
+            logger.error(
+                "add_slice: slice 0x%02X belongs to another bus",
+                slice_obj.target_address,
+            )
+            return False
+        bus.slices[slice_obj.target_address] = slice_obj
+        if period is not None:
+            return self.poller(bus_key).add_slice(slice_obj, period, adaptive)
+        return True
+
+    def remove_slice(self, bus_key: Any, target_address: int) -> bool:
+        bus = self._buses.get(bus_key)
+        if bus is None or bus.slices.pop(target_address, None) is None:
+            return False
+        if bus.poller is not None:
+            bus.poller.remove_slice(target_address)
+        return True
+
+    def get(self, bus_key: Any, target_address: int) -> Optional[Slice]:
+        bus = self._buses.get(bus_key)
+        return None if bus is None else bus.slices.get(target_address)
+
+    def slices(self, slice_type: Optional[Type[Slice]] = None) -> Dict[SliceKey, Slice]:
+        """All registered slices as {(bus key, address): slice}."""
+        return {
+            (bus.key, address): s
+            for bus in self._buses.values()
+            for address, s in sorted(bus.slices.items())
+            if slice_type is None or isinstance(s, slice_type)
+        }
+
+    def discover(
+        self,
+        addresses: Iterable[int] = SCAN_RANGE,
+        cache_path: Optional[str] = None,
+        full_scan: bool = False,
+    ) -> Dict[SliceKey, Slice]:
+        """Discover the slices on every bus (in parallel) and register them."""
+        found = discover(
+            {key: bus.worker for key, bus in self._buses.items()},
+            addresses,
+            cache_path,
+            full_scan,
+        )
+        for bus_key, slices in found.items():
+            for slice_obj in slices.values():
+                self.add_slice(bus_key, slice_obj)
+        return {(k, a): s for k, slices in found.items() for a, s in slices.items()}
+
+    # --- rack-wide operations ---------------------------------------------
+
+    def _fan_out(
+        self,
+        fn: Callable[[Slice], Any],
+        slice_type: Optional[Type[Slice]] = None,
+        commands: bool = False,
+    ) -> Dict[SliceKey, Any]:
+        """
+        Run fn(slice) for every slice, buses in parallel, slices in order.
+        commands=True runs on the command threads, next to running sweeps.
+        """
+
+        def run_bus(bus: _Bus) -> Dict[SliceKey, Any]:
+            results = {}
+            for address, slice_obj in sorted(bus.slices.items()):
+                if slice_type is not None and not isinstance(slice_obj, slice_type):
+                    continue
+                try:
+                    results[(bus.key, address)] = fn(slice_obj)
+                except Exception as e:
+                    logger.exception(
+                        "bus %s: call on 0x%02X raised: %s", bus.key, address, e
+                    )
+                    results[(bus.key, address)] = None
+            return results
+
+        futures: List[Future] = [
+            (bus.command_executor if commands else bus.executor).submit(run_bus, bus)
+            for bus in self._buses.values()
+        ]
+        results: Dict[SliceKey, Any] = {}
+        for future in futures:
+            results.update(future.result())
+        return results
+
+    def request_status_all(
+        self, slice_type: Optional[Type[Slice]] = None
+    ) -> Dict[SliceKey, bool]:
+        """Read the status of every slice; {(bus, address): ok}."""
+        return {
+            key: response is not None
+            for key, response in self._fan_out(
+                lambda s: s.request_status(), slice_type
+            ).items()
+        }
+
+    def status_all(
+        self, slice_type: Optional[Type[Slice]] = None
+    ) -> Dict[SliceKey, Dict[str, Any]]:
+        """The mirrored status of every slice (no bus traffic)."""
+        return {
+            key: s.status_values() for key, s in self.slices(slice_type).items()
+        }
+
+    def call(self, bus_key: Any, target_address: int, method: str, *args: Any) -> Any:
+        """Call a slice method, e.g. call(1, 0x0A, "change_setpoints", 40, 50)."""
+        slice_obj = self.get(bus_key, target_address)
+        if slice_obj is None:
+            logger.error("call: no slice 0x%02X on bus %r", target_address, bus_key)
+            return None
+        return getattr(slice_obj, method)(*args)
+
+    def call_all(
+        self, method: str, *args: Any, slice_type: Optional[Type[Slice]] = None
+    ) -> Dict[SliceKey, Any]:
+        """
+        Call a slice method on every slice (of slice_type) rack-wide,
+        e.g. call_all("set_brakes", True, True, slice_type=MotorControllerSlice).
+        """
+        return self._fan_out(
+            lambda s: getattr(s, method)(*args), slice_type, commands=True
+        )
+
+    # --- polling ----------------------------------------------------------
+
+    def poller(self, bus_key: Any) -> SlicePoller:
+        """The SlicePoller of a bus (created on first use)."""
+        bus = self._buses[bus_key]
+        if bus.poller is None:
+            bus.poller = SlicePoller(bus.worker)
+        return bus.poller
+
+    def start(self) -> None:
+        """Start the poller of every bus that has scheduled slices."""
+        for bus in self._buses.values():
+            if bus.poller is not None:
+                bus.poller.start()
+
+    def stop(self) -> None:
+        for bus in self._buses.values():
+            if bus.poller is not None:
+                bus.poller.stop()
+
+    def poll_stats(self) -> Dict[SliceKey, Dict[str, float]]:
+        stats: Dict[SliceKey, Dict[str, float]] = {}
+        for bus in self._buses.values():
+            if bus.poller is not None:
+                for address, values in bus.poller.stats().items():
+                    stats[(bus.key, address)] = values
+        return stats
+
+    def close(self) -> None:
+        """Stop polling, finish queued work and close every bus."""
+        self.stop()
+        for bus in self._buses.values():
+            bus.executor.shutdown(wait=True)
+            bus.command_executor.shutdown(wait=True)
+            bus.worker.close()
+        self._buses.clear()
@@ -0,0 +1,287 @@
+# src/loafware/bus_worker.py
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+from . import motor_controller_slice as dcmt
+from . import relay_heater_slice as rlht
+from .metrics import METRICS, format_address
+from .tracing import TRACER
+import heapq
+import logging
+import threading
+import time
+
+logger = logging.getLogger("loafware.bus_worker")
+
+# Priority classes (lower value is served first)
+PRIORITY_SAFETY = 0  # brake / mode changes
+PRIORITY_SETPOINT = 1  # every other write
+PRIORITY_TELEMETRY = 2  # status reads
+
+PRIORITY_NAMES = {
+    PRIORITY_SAFETY: "safety",
+    PRIORITY_SETPOINT: "setpoint",
+    PRIORITY_TELEMETRY: "telemetry",
+}
+
+# Command types that are treated as safety commands, per device TYPE_ID
+SAFETY_COMMANDS: Dict[int, FrozenSet[int]] = {
+    rlht.DEVICE_TYPE_ID: rlht.SAFETY_COMMANDS,
+    dcmt.DEVICE_TYPE_ID: dcmt.SAFETY_COMMANDS,
+}
+
+
+def register_safety_commands(type_id: int, command_types: FrozenSet[int]) -> None:
+    """Declare which command types of a (new) device type preempt other traffic."""
+    SAFETY_COMMANDS[int(type_id)] = frozenset(int(c) for c in command_types)
+
+
+def classify_message(message: Any) -> int:
+    """Default priority of an outgoing CRUMBSMessage."""
+    type_id = int(getattr(message, "typeID", -1))
+    command_type = int(getattr(message, "commandType", -1))
+    if command_type in SAFETY_COMMANDS.get(type_id, ()):
+        return PRIORITY_SAFETY
+    return PRIORITY_SETPOINT
+
+
+class WaitStats:
+    """Queue wait time statistics for one priority class."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float) -> None:
+        self.count += 1
+        self.total_wait += wait
+        if wait > self.max_wait:
+            self.max_wait = wait
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_wait": self.total_wait / self.count if self.count else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+
+class _Transaction:
+    __slots__ = ("priority", "fn", "args", "future", "enqueued", "key")
+
+    def __init__(
+        self, priority: int, fn: Callable[..., Any], args: Any, enqueued: float
+    ) -> None:
+        self.priority = priority
+        self.fn = fn
+        self.args = args
+        self.future: Future = Future()
+        self.enqueued = enqueued
+        self.key: Optional[Tuple[int, int, int]] = None
+
+
+class BusWorker:
+    """
+    Single owner of one CRUMBS bus.
+    All transactions are queued and executed by one worker thread in priority
+    order: safety commands (brakes, mode changes) first, then setpoint writes,
+    then telemetry reads; FIFO within a class. A transaction already on the
+    bus is never interrupted, so the worst-case wait of a safety command is
+    one in-flight transaction rather than a whole poll sweep.
+
+    BusWorker exposes the same send_message / request_message / close
+    contract as PyCRUMBSWrapper, so slices and the SlicePoller can use it as
+    their crumbs wrapper directly.
+
+    With coalesce=True, setpoint-class writes are queued without waiting for
+    the bus and are latest-wins: a write replaces a still-queued write with the
+    same (address, typeID, commandType) instead of adding another transaction.
+    """
+
+    def __init__(
+        self,
+        crumbs_wrapper: Any,
+        classify: Callable[[Any], int] = classify_message,
+        coalesce: bool = False,
+        name: str = "bus",
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        :param crumbs_wrapper: The wrapper that owns the bus hardware.
+        :param classify: Maps an outgoing CRUMBSMessage to a priority class.
+        :param coalesce: Queue setpoint writes asynchronously, latest-wins.
+        :param name: Label of this queue in metrics.
+        :param clock: Monotonic time source used for wait time measurement.
+        """
+        self.crumbs = crumbs_wrapper
+        self.classify = classify
+        self.coalesce = coalesce
+        self.writes_coalesced = 0
+        # Longest wait for a status read (s); None waits for the bus
+        self.timeout: Optional[float] = None
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._queue: List[Any] = []  # heap of (priority, seq, transaction)
+        self._seq = 0
+        self._pending_writes: Dict[Tuple[int, int, int], _Transaction] = {}
+        self._running = True
+        self._wait_stats: Dict[int, WaitStats] = {
+            p: WaitStats() for p in PRIORITY_NAMES
+        }
+        self.name = name
+        METRICS.queue_depth.add_source(self._queue_depth_metrics)
+        self._thread = threading.Thread(
+            target=self._run, name="loafware-bus-worker-%s" % name, daemon=True
+        )
+        self._thread.start()
+
+    # --- queueing ---------------------------------------------------------
+
+    def submit(
+        self, fn: Callable[..., Any], *args: Any, priority: int = PRIORITY_TELEMETRY
+    ) -> Future:
+        """
+        Queue a blocking bus transaction (any callable) for the worker thread.
+        Returns a Future resolving to the callable's result.
+        """
+        txn = _Transaction(priority, fn, args, self._clock())
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("BusWorker is closed")
+            self._seq += 1
+            heapq.heappush(self._queue, (priority, self._seq, txn))
+            self._cond.notify()
+        return txn.future
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and self._running:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                _, _, txn = heapq.heappop(self._queue)
+                if txn.key is not None:
+                    del self._pending_writes[txn.key]
+                wait = self._clock() - txn.enqueued
+                self._wait_stats[txn.priority].record(wait)
+            if not txn.future.set_running_or_notify_cancel():
+                continue
+            started = time.perf_counter() if TRACER.enabled else None
+            try:
+                txn.future.set_result(txn.fn(*txn.args))
+            except BaseException as e:
+                txn.future.set_exception(e)
+            if started is not None:
+                self._trace(txn, wait, started)
+
+    def _trace(self, txn: _Transaction, wait: float, started: float) -> None:
+        args: Dict[str, Any] = {
+            "queue": self.name,
+            "priority": PRIORITY_NAMES[txn.priority],
+            "queue_wait_us": round(wait * 1e6, 1),
+        }
+        if len(txn.args) == 2 and isinstance(txn.args[1], int):
+            # send_message(message, address)
+            args["address"] = format_address(txn.args[1])
+            args["command"] = getattr(txn.args[0], "commandType", None)
+        elif len(txn.args) == 1 and isinstance(txn.args[0], int):
+            args["address"] = format_address(txn.args[0])
+        name = getattr(txn.fn, "__name__", "transaction")
+        TRACER.record(name, "bus_worker", started, time.perf_counter(), args)
+
+    # --- wrapper-compatible API -----------------------------------------
+
+    def _submit_coalesced(self, message: Any, target_address: int) -> Future:
+        key = (
+            int(target_address),
+            int(getattr(message, "typeID", -1)),
+            int(getattr(message, "commandType", -1)),
+        )
+        with self._cond:
+            txn = self._pending_writes.get(key)
+            if txn is not None:
+                # still queued: the newest payload wins, no extra bus write
+                txn.args = (message, target_address)
+                self.writes_coalesced += 1
+                return txn.future
+            txn = _Transaction(
+                PRIORITY_SETPOINT,
+                self.crumbs.send_message,
+                (message, target_address),
+                self._clock(),
+            )
+            txn.key = key
+            if not self._running:
+                raise RuntimeError("BusWorker is closed")
+            self._seq += 1
+            heapq.heappush(self._queue, (PRIORITY_SETPOINT, self._seq, txn))
+            self._pending_writes[key] = txn
+            self._cond.notify()
+        txn.future.add_done_callback(self._log_write_failure)
+        return txn.future
+
+    @staticmethod
+    def _log_write_failure(future: Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("coalesced write failed: %s", future.exception())
+
+    def send_message(self, message: Any, target_address: int) -> Optional[Future]:
+        """
+        Queue a write with its classified priority and wait for it.
+        Coalesced setpoint writes return as soon as they are queued; their
+        Future is returned so callers can learn whether the write succeeded.
+        """
+        priority = self.classify(message)
+        if self.coalesce and priority == PRIORITY_SETPOINT:
+            return self._submit_coalesced(message, target_address)
+        self.submit(
+            self.crumbs.send_message, message, target_address, priority=priority
+        ).result()
+
+    def request_message(self, target_address: int) -> Optional[Any]:
+        """
+        Queue a status read at telemetry priority and wait for the reply.
+        Raises concurrent.futures.TimeoutError after self.timeout seconds.
+        """
+        future = self.submit(
+            self.crumbs.request_message, target_address, priority=PRIORITY_TELEMETRY
+        )
+        try:
+            return future.result(self.timeout)
+        except FutureTimeout:
+            # nobody waits for it any more: drop it if it is still queued
+            future.cancel()
+            raise
+
+    def close(self) -> None:
+        """Drain the queue, stop the worker thread and close the bus."""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join()
+        METRICS.queue_depth.remove_source(self._queue_depth_metrics)
+        self.crumbs.close()
+        logger.info("BusWorker: closed")
+
+    # --- reporting --------------------------------------------------------
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Number of queued (not yet started) transactions per priority class."""
+        with self._cond:
+            depths = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _, _ in self._queue:
+                depths[PRIORITY_NAMES[priority]] += 1
+            return depths
+
+    def _queue_depth_metrics(self) -> Dict[Tuple[str, ...], float]:
+        return {(self.name, p): n for p, n in self.queue_depths().items()}
+
+    def wait_stats(self) -> Dict[str, Dict[str, float]]:
+        """Measured queue wait time per priority class."""
+        with self._cond:
+            return {
+                PRIORITY_NAMES[p]: s.as_dict() for p, s in self._wait_stats.items()
+            }
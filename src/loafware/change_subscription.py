@@ -0,0 +1,115 @@
+# src/loafware/change_subscription.py
+from queue import Full
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Union
+import logging
+
+logger = logging.getLogger("loafware.change_subscription")
+
+# callback(slice, monotonic timestamp, {field: new value}) for changed fields
+ChangeCallback = Callable[[Any, float, Dict[str, Any]], None]
+Deadband = Union[float, Mapping[str, float]]
+
+
+def _per_field(deadband: Deadband, fields: Sequence[str]) -> Dict[str, float]:
+    if isinstance(deadband, Mapping):
+        unknown = set(deadband) - set(fields)
+        if unknown:
+            raise ValueError("deadband for unsubscribed fields: %s" % sorted(unknown))
+        return {name: float(deadband.get(name, 0.0)) for name in fields}
+    return {name: float(deadband) for name in fields}
+
+
+class ChangeSubscription:
+    """
+    Change notifications for some status fields of one slice.
+
+    Float fields notify when they moved more than their deadband away from
+    the last value delivered to this subscriber; the deadband is
+    max(absolute, relative * |last delivered|), so a slow drift still
+    notifies once it adds up. Discrete fields (int / bool, e.g. mode,
+    error_flags, brakes) notify on any change. The first status always
+    notifies with every field, so subscribers start from the full state.
+
+    Changes are delivered to a callback (run on the polling thread, must be
+    quick) and/or put on a queue without blocking; if the queue is full the
+    notification is counted in `dropped`.
+    """
+
+    def __init__(
+        self,
+        fields: Sequence[str],
+        callback: Optional[ChangeCallback] = None,
+        queue: Optional[Any] = None,
+        absolute: Deadband = 0.0,
+        relative: Deadband = 0.0,
+    ) -> None:
+        """
+        :param fields: Status field names to watch.
+        :param callback: Called as callback(slice, timestamp, {field: value}).
+        :param queue: queue.Queue-like object receiving (slice, timestamp, changes).
+        :param absolute: Absolute deadband, for all fields or per field name.
+        :param relative: Relative deadband (fraction), for all or per field.
+        """
+        if callback is None and queue is None:
+            raise ValueError("need a callback or a queue")
+        self.fields = tuple(fields)
+        self.callback = callback
+        self.queue = queue
+        self.absolute = _per_field(absolute, self.fields)
+        self.relative = _per_field(relative, self.fields)
+        self._last: Dict[str, Any] = {}
+        self.notifications = 0
+        self.dropped = 0
+
+    def changes(self, slice_obj: Any) -> Dict[str, Any]:
+        """Fields of slice_obj that changed beyond their deadband (and mark them)."""
+        changed: Dict[str, Any] = {}
+        last = self._last
+        for name in self.fields:
+            value = getattr(slice_obj, name)
+            if name in last:
+                previous = last[name]
+                if type(value) is float:
+                    if value != value and previous != previous:
+                        continue  # still NaN
+                    band = max(self.absolute[name], self.relative[name] * abs(previous))
+                    if abs(value - previous) <= band:
+                        continue
+                elif value == previous:
+                    continue
+            last[name] = value
+            changed[name] = value
+        return changed
+
+    def notify(self, slice_obj: Any, timestamp: float) -> None:
+        """Deliver the fields that changed since the last notification, if any."""
+        changed = self.changes(slice_obj)
+        if not changed:
+            return
+        self.notifications += 1
+        if self.callback is not None:
+            try:
+                self.callback(slice_obj, timestamp, changed)
+            except Exception as e:
+                logger.exception(
+                    "change callback failed for 0x%02X: %s",
+                    slice_obj.target_address,
+                    e,
+                )
+        if self.queue is not None:
+            try:
+                self.queue.put_nowait((slice_obj, timestamp, changed))
+            except Full:
+                self.dropped += 1
+            except Exception as e:
+                # e.g. a closed multiprocessing queue: never break the poll
+                self.dropped += 1
+                logger.exception(
+                    "change queue failed for 0x%02X: %s",
+                    slice_obj.target_address,
+                    e,
+                )
+
+    def reset(self) -> None:
+        """Forget the delivered values: the next status notifies every field."""
+        self._last.clear()
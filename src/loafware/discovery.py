@@ -0,0 +1,203 @@
+# src/loafware/discovery.py
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Mapping, Optional, Set, Type
+from .slice_base import Slice
+from .relay_heater_slice import RelayHeaterSlice
+from .relay_heater_slice import DEVICE_TYPE_ID as RLHT_TYPE_ID
+from .motor_controller_slice import MotorControllerSlice
+from .motor_controller_slice import DEVICE_TYPE_ID as DCMT_TYPE_ID
+import json
+import logging
+import os
+
+logger = logging.getLogger("loafware.discovery")
+
+# Valid 7-bit target addresses (0x00-0x07 and 0x78-0x7F are reserved)
+SCAN_RANGE = range(0x08, 0x78)
+
+# Firmware typeID -> slice class built for it
+SLICE_TYPES: Dict[int, Type[Slice]] = {
+    RLHT_TYPE_ID: RelayHeaterSlice,
+    DCMT_TYPE_ID: MotorControllerSlice,
+}
+
+
+def register_slice_type(type_id: int, slice_class: Type[Slice]) -> None:
+    """Make discovery instantiate slice_class for devices reporting type_id."""
+    if not issubclass(slice_class, Slice):
+        raise TypeError("%r is not a Slice subclass" % (slice_class,))
+    existing = SLICE_TYPES.get(type_id)
+    if existing is not None and existing is not slice_class:
+        logger.warning(
+            "register_slice_type: typeID %d now maps to %s (was %s)",
+            type_id,
+            slice_class.__name__,
+            existing.__name__,
+        )
+    SLICE_TYPES[type_id] = slice_class
+
+
+def identify(crumbs_wrapper: Any, target_address: int) -> Optional[Any]:
+    """
+    Request one status reply from target_address.
+    Returns the CRUMBSMessage, or None if nothing answered.
+    """
+    try:
+        return crumbs_wrapper.request_message(target_address)
+    except Exception as e:
+        logger.debug("identify: 0x%02X did not answer: %s", target_address, e)
+        return None
+
+
+def scan_bus(
+    crumbs_wrapper: Any, addresses: Iterable[int] = SCAN_RANGE
+) -> Dict[int, Any]:
+    """Probe addresses in order; returns {address: status reply} of responders."""
+    found: Dict[int, Any] = {}
+    for address in addresses:
+        reply = identify(crumbs_wrapper, address)
+        if reply is not None:
+            found[address] = reply
+    return found
+
+
+def load_cache(path: str) -> Dict[str, Dict[int, int]]:
+    """Read a discovery cache as {bus key: {address: typeID}} ({} if unusable)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+        return {
+            str(bus): {int(addr, 0): int(type_id) for addr, type_id in devices.items()}
+            for bus, devices in raw.items()
+        }
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError, AttributeError, TypeError) as e:
+        logger.warning("load_cache: ignoring unreadable cache %s: %s", path, e)
+        return {}
+
+
+def save_cache(path: str, cache: Mapping[str, Mapping[int, int]]) -> bool:
+    """Atomically write {bus key: {address: typeID}} to path."""
+    raw = {
+        str(bus): {"0x%02X" % addr: type_id for addr, type_id in devices.items()}
+        for bus, devices in cache.items()
+    }
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(raw, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+        return True
+    except OSError as e:
+        logger.error("save_cache: cannot write %s: %s", path, e)
+        return False
+
+
+def _discover_bus(
+    bus_key: Any,
+    crumbs_wrapper: Any,
+    addresses: Iterable[int],
+    known: Optional[Mapping[int, int]],
+) -> Dict[int, Any]:
+    if known:
+        # warm start: only re-verify what answered last time
+        replies = scan_bus(crumbs_wrapper, sorted(known))
+        if replies:
+            lost = set(known) - set(replies)
+            if lost:
+                logger.warning(
+                    "discover: bus %s: cached %s no longer answer",
+                    bus_key,
+                    ", ".join("0x%02X" % a for a in sorted(lost)),
+                )
+            return replies
+        logger.warning(
+            "discover: bus %s: no cached device answered; rescanning", bus_key
+        )
+    return scan_bus(crumbs_wrapper, addresses)
+
+
+def _build_slices(
+    bus_key: Any, crumbs_wrapper: Any, replies: Mapping[int, Any]
+) -> Dict[int, Slice]:
+    slices: Dict[int, Slice] = {}
+    for address, reply in sorted(replies.items()):
+        type_id = int(getattr(reply, "typeID", -1))
+        slice_class = SLICE_TYPES.get(type_id)
+        if slice_class is None:
+            logger.warning(
+                "discover: bus %s: 0x%02X reports unknown typeID %d",
+                bus_key,
+                address,
+                type_id,
+            )
+            continue
+        slice_obj = slice_class(address, crumbs_wrapper)
+        # the identifying reply is a full status: seed the mirrored state
+        slice_obj.handle_message(reply)
+        slices[address] = slice_obj
+    return slices
+
+
+def discover(
+    buses: Mapping[Any, Any],
+    addresses: Iterable[int] = SCAN_RANGE,
+    cache_path: Optional[str] = None,
+    full_scan: bool = False,
+) -> Dict[Any, Dict[int, Slice]]:
+    """
+    Find the slices on one or more buses and return them ready to use.
+    Buses are scanned in parallel (one thread per bus); every responder is
+    identified by the typeID of its status reply and instantiated from
+    SLICE_TYPES. With a cache_path, a warm start only re-verifies the
+    addresses found last time, so startup time follows the number of
+    populated addresses instead of the address space. A bus falls back to a
+    full scan when none of its cached devices answer, or always with
+    full_scan=True (use it after adding hardware). The cache entry of a bus
+    is only replaced when its scan completes; a bus whose scan raised keeps
+    the devices remembered from earlier runs.
+
+    :param buses: {bus key (e.g. bus number): crumbs wrapper}.
+    :param addresses: Addresses probed by a full scan.
+    :param cache_path: JSON file remembering {bus: {address: typeID}}.
+    :param full_scan: Ignore the cache and probe every address.
+    :return: {bus key: {address: slice}}.
+    """
+    addresses = list(addresses)
+    previous = load_cache(cache_path) if cache_path else {}
+    cache = {} if full_scan else previous
+    result: Dict[Any, Dict[int, Slice]] = {}
+    failed: Set[Any] = set()
+    if not buses:
+        return result
+    with ThreadPoolExecutor(
+        max_workers=len(buses), thread_name_prefix="loafware-discovery"
+    ) as pool:
+        futures = {
+            bus_key: pool.submit(
+                _discover_bus, bus_key, wrapper, addresses, cache.get(str(bus_key))
+            )
+            for bus_key, wrapper in buses.items()
+        }
+        for bus_key, future in futures.items():
+            try:
+                replies = future.result()
+            except Exception as e:
+                logger.exception("discover: scan of bus %s failed: %s", bus_key, e)
+                failed.add(bus_key)
+                replies = {}
+            result[bus_key] = _build_slices(bus_key, buses[bus_key], replies)
+            logger.info(
+                "discover: bus %s: %d slices found", bus_key, len(result[bus_key])
+            )
+    if cache_path:
+        types = {cls: type_id for type_id, cls in SLICE_TYPES.items()}
+        updated = dict(previous)
+        for bus_key, slices in result.items():
+            if bus_key not in failed:
+                updated[str(bus_key)] = {
+                    addr: types[type(s)] for addr, s in slices.items()
+                }
+        save_cache(cache_path, updated)
+    return result
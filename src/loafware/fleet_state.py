@@ -0,0 +1,336 @@
+# src/loafware/fleet_state.py
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+from .slice_base import Slice
+import heapq
+import logging
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; FleetTable requires it
+    np = None
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8: no shared-memory backing
+    shared_memory = None
+
+logger = logging.getLogger("loafware.fleet_state")
+
+# Bookkeeping columns in front of the status fields
+_HEADER_COLUMNS = [
+    ("seq", "<u4"),  # odd while a row is being written (seqlock)
+    ("address", "u1"),
+    ("kind", "u1"),  # index into FleetTable.types
+    ("used", "?"),  # row assigned to a slice
+    ("valid", "?"),  # at least one status decoded
+    ("timestamp", "<f8"),  # time.monotonic() of the last status
+]
+
+
+class FleetTable:
+    """
+    The mirrored status of a whole fleet in one numpy structured array, one
+    row per slice and one column per status field (the union of the
+    STATUS_FIELDS of `types`; fields a slice type lacks stay NaN).
+
+    attach(slice) assigns a row and keeps it updated from the slice's status
+    listener, so rack-wide reads are single vectorized operations:
+    table.column("temperature1")[table.rows(RelayHeaterSlice)]. Rows freed
+    by detach() are cleared and reused by later attaches.
+
+    The slices stay the writers and keep their own attributes; the table is
+    a mirror of them. view(row) returns a thin __slots__ object reading one
+    row in place (view.temperature1), for code that wants per-slice access
+    without holding the slice, e.g. in another process.
+
+    With shared_name the array lives in a named shared-memory block that
+    other processes open with create=False and the same types/capacity.
+    Rows are written under a per-row seqlock; read_row() returns a
+    consistent copy even while the owning process updates it.
+    """
+
+    def __init__(
+        self,
+        types: Sequence[Type[Slice]],
+        capacity: int = 256,
+        shared_name: Optional[str] = None,
+        create: bool = True,
+    ) -> None:
+        """
+        :param types: Slice classes whose STATUS_FIELDS become columns.
+        :param capacity: Maximum number of rows (slices).
+        :param shared_name: Back the table by this shared-memory block.
+        :param create: Create the block (owner) or open an existing one.
+        """
+        if np is None:
+            raise ImportError("FleetTable requires numpy (pip install numpy)")
+        self.types: Tuple[Type[Slice], ...] = tuple(types)
+        self.capacity = int(capacity)
+        fields: List[str] = []
+        for cls in self.types:
+            for name in cls.STATUS_FIELDS:
+                if name not in fields:
+                    fields.append(name)
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self.dtype = np.dtype(_HEADER_COLUMNS + [(name, "<f8") for name in fields])
+        self._shm: Any = None
+        if shared_name is None:
+            self.array = np.zeros(self.capacity, dtype=self.dtype)
+        else:
+            if shared_memory is None:
+                raise ImportError("shared-memory tables need Python 3.8+")
+            size = self.capacity * self.dtype.itemsize
+            self._shm = shared_memory.SharedMemory(shared_name, create, size)
+            self.array = np.ndarray(
+                self.capacity, dtype=self.dtype, buffer=self._shm.buf
+            )
+        if create:
+            self.array[:] = np.zeros(1, dtype=self.dtype)[0]
+            for name in fields:
+                self.array[name] = np.nan
+        self._owner = create
+        self._lock = threading.Lock()
+        self._rows: Dict[int, int] = {}  # id(slice) -> row
+        self._slices: List[Optional[Slice]] = []  # by row; None for free rows
+        self._free: List[int] = []  # heap of detached rows, reused lowest first
+        self._views: Dict[type, type] = {}
+        # 2-D float64 view of the status columns: one fancy-indexed store per row
+        self._matrix = np.ndarray(
+            (self.capacity, len(fields)),
+            dtype="<f8",
+            buffer=self.array,
+            offset=self.dtype.fields[fields[0]][1] if fields else 0,
+            strides=(self.dtype.itemsize, 8),
+        )
+        self._seq = self.array["seq"]
+        self._timestamp = self.array["timestamp"]
+        self._valid = self.array["valid"]
+        # per slice class: (kind index, matrix columns, fields picked from its
+        # status_values(), or None when they map onto the columns in order)
+        self._layouts: Dict[type, Tuple[int, Any, Optional[List[str]]]] = {}
+        for i, cls in enumerate(self.types):
+            self._layouts.setdefault(cls, self._make_layout(i, cls))
+
+    def _make_layout(
+        self, kind: int, cls: type
+    ) -> Tuple[int, Any, Optional[List[str]]]:
+        picks = [name for name in cls.STATUS_FIELDS if name in self.fields]
+        columns = np.array([self.fields.index(n) for n in picks], dtype=int)
+        return kind, columns, None if picks == list(cls.STATUS_FIELDS) else picks
+
+    def _layout(self, cls: type) -> Optional[Tuple[int, Any, Optional[List[str]]]]:
+        layout = self._layouts.get(cls)
+        if layout is None:
+            # a subclass of a table type shares its kind (row mask, view class)
+            for base in cls.__mro__[1:]:
+                if base in self._layouts:
+                    kind = self._layouts[base][0]
+                    layout = self._layouts[cls] = self._make_layout(kind, cls)
+                    break
+        return layout
+
+    def __len__(self) -> int:
+        """Number of rows in use."""
+        return len(self._rows)
+
+    # --- owner side -------------------------------------------------------
+
+    def attach(self, slice_obj: Slice) -> int:
+        """
+        Give slice_obj a row, seeded from its current state; returns the row.
+        Subclasses of the table's types are accepted and share their rows()
+        mask and view class; their extra status fields are not mirrored.
+        """
+        layout = self._layout(type(slice_obj))
+        if layout is None:
+            raise TypeError("%s is not in this table" % type(slice_obj).__name__)
+        with self._lock:
+            row = self._rows.get(id(slice_obj))
+            if row is not None:
+                return row
+            if self._free:
+                row = heapq.heappop(self._free)
+                self._slices[row] = slice_obj
+            elif len(self._slices) < self.capacity:
+                row = len(self._slices)
+                self._slices.append(slice_obj)
+            else:
+                raise ValueError("fleet table is full (%d rows)" % self.capacity)
+            self._rows[id(slice_obj)] = row
+            self._seq[row] += 1
+            record = self.array[row]
+            record["address"] = slice_obj.target_address
+            record["kind"] = layout[0]
+            record["used"] = True
+            self._seq[row] += 1
+            self._store(row, slice_obj.status_values(), None)
+        slice_obj.add_status_listener(self._on_status)
+        return row
+
+    def detach(self, slice_obj: Slice) -> None:
+        """Stop updating the slice's row, clear it and free it for reuse."""
+        slice_obj.remove_status_listener(self._on_status)
+        with self._lock:
+            row = self._rows.pop(id(slice_obj), None)
+            if row is None:
+                return
+            self._slices[row] = None
+            self._seq[row] += 1
+            record = self.array[row]
+            record["used"] = False
+            record["valid"] = False
+            record["timestamp"] = 0.0
+            self._matrix[row] = np.nan
+            self._seq[row] += 1
+            heapq.heappush(self._free, row)
+
+    def _on_status(
+        self, slice_obj: Any, timestamp: float, values: Dict[str, Any]
+    ) -> None:
+        # under the lock: a concurrent detach may free (and reuse) the row
+        with self._lock:
+            row = self._rows.get(id(slice_obj))
+            if row is not None:
+                self._store(row, values, timestamp)
+
+    def _store(
+        self, row: int, values: Dict[str, Any], timestamp: Optional[float]
+    ) -> None:
+        # values come from status_values(), i.e. in STATUS_FIELDS order
+        _, columns, picks = self._layouts[type(self._slices[row])]
+        if picks is None:
+            data = list(values.values())
+        else:
+            data = [values[name] for name in picks]
+        seq = self._seq
+        seq[row] += 1  # odd: write in progress
+        self._matrix[row, columns] = data
+        if timestamp is not None:
+            self._timestamp[row] = timestamp
+            self._valid[row] = True
+        seq[row] += 1
+
+    # --- readers ----------------------------------------------------------
+
+    def _extent(self) -> int:
+        # readers in other processes do not know the row count: use them all
+        return len(self._slices) if self._owner else self.capacity
+
+    def column(self, name: str) -> Any:
+        """Zero-copy view of one field over the table's rows (see rows())."""
+        return self.array[name][: self._extent()]
+
+    def rows(self, slice_type: Optional[Type[Slice]] = None) -> Any:
+        """Boolean mask, aligned with column(), of used rows (of one type)."""
+        table = self.array[: self._extent()]
+        if slice_type is None:
+            return table["used"].copy()
+        return table["used"] & (table["kind"] == self.types.index(slice_type))
+
+    def row_of(self, slice_obj: Slice) -> Optional[int]:
+        return self._rows.get(id(slice_obj))
+
+    def view(self, row: int) -> "FleetRowView":
+        """
+        Attribute access to one used row, typed after its slice class
+        (RelayHeaterSliceView, ...). Works in reader processes too.
+        """
+        if not 0 <= row < self.capacity or not self.array["used"][row]:
+            raise KeyError("row %d is not in use" % row)
+        cls = self.types[int(self.array["kind"][row])]
+        view_cls = self._views.get(cls)
+        if view_cls is None:
+            view_cls = self._views[cls] = _view_class(cls)
+        return view_cls(self, row)
+
+    def read_row(self, row: int, retries: int = 100) -> Optional[Any]:
+        """
+        Consistent copy of one row (seqlock read); None if the writer kept it
+        busy for `retries` attempts.
+        """
+        record = self.array[row : row + 1]
+        for _ in range(retries):
+            before = int(record["seq"][0])
+            if before & 1:
+                continue
+            copy = record.copy()[0]
+            if int(record["seq"][0]) == before:
+                return copy
+        return None
+
+    def close(self) -> None:
+        """Release the shared-memory block (the owner also unlinks it)."""
+        for slice_obj in list(self._slices):
+            if slice_obj is not None:
+                self.detach(slice_obj)
+        if self._shm is not None:
+            # drop every view of the block before closing it
+            self.array = np.zeros(0, dtype=self.dtype)
+            self._matrix = self._seq = self._timestamp = self._valid = None
+            self._shm.close()
+            if self._owner:
+                self._shm.unlink()
+            self._shm = None
+
+
+class FleetRowView:
+    """
+    Thin view of one FleetTable row: status fields are properties reading
+    the table in place (as float64, NaN until first decoded), nothing is
+    copied. status_values() takes a consistent (seqlocked) snapshot.
+    """
+
+    __slots__ = ("_table", "_row")
+    STATUS_FIELDS: Tuple[str, ...] = ()
+
+    def __init__(self, table: FleetTable, row: int) -> None:
+        self._table = table
+        self._row = row
+
+    @property
+    def row(self) -> int:
+        return self._row
+
+    @property
+    def target_address(self) -> int:
+        return int(self._table.array["address"][self._row])
+
+    @property
+    def timestamp(self) -> Optional[float]:
+        """time.monotonic() of the last status, None before the first one."""
+        array = self._table.array
+        if not array["valid"][self._row]:
+            return None
+        return float(array["timestamp"][self._row])
+
+    def status_values(self) -> Optional[Dict[str, float]]:
+        """Consistent {field: value} copy; None if the writer kept it busy."""
+        record = self._table.read_row(self._row)
+        if record is None:
+            return None
+        return {name: float(record[name]) for name in self.STATUS_FIELDS}
+
+    def __repr__(self) -> str:
+        return "<%s row=%d address=0x%02X>" % (
+            type(self).__name__,
+            self._row,
+            self.target_address,
+        )
+
+
+def _field_property(name: str) -> property:
+    def get(self: FleetRowView) -> float:
+        return float(self._table.array[name][self._row])
+
+    return property(get)
+
+
+def _view_class(cls: Type[Slice]) -> type:
+    namespace: Dict[str, Any] = {
+        "__slots__": (),
+        "STATUS_FIELDS": tuple(cls.STATUS_FIELDS),
+    }
+    for name in cls.STATUS_FIELDS:
+        namespace[name] = _field_property(name)
+    return type(cls.__name__ + "View", (FleetRowView,), namespace)
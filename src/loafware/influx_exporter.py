@@ -0,0 +1,437 @@
+# src/loafware/influx_exporter.py
+from collections import deque
+from typing import Any, Deque, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+import http.client
+import logging
+import math
+import os
+import threading
+import time
+
+logger = logging.getLogger("loafware.influx_exporter")
+
+# Queue overflow policies
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+SPILL = "spill"
+
+# Outcomes of one write request
+_SENT = 0
+_REJECTED = 1  # the sink refused the data itself (4xx): retrying cannot help
+_FAILED = 2  # transport or server error: worth retrying later
+
+_KEY_ESCAPES = str.maketrans({"\\": "\\\\", ",": "\\,", "=": "\\=", " ": "\\ "})
+
+
+def _escape_key(value: str) -> str:
+    """Escape a measurement name, tag key/value or field key."""
+    return value.translate(_KEY_ESCAPES)
+
+
+def _format_field(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return "%di" % value
+    if isinstance(value, float):
+        return repr(value)
+    return '"%s"' % str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def to_line_protocol(
+    measurement: str,
+    tags: Mapping[str, str],
+    fields: Mapping[str, Any],
+    timestamp_ns: int,
+) -> str:
+    """
+    Serialize one sample as an InfluxDB line protocol line (no newline).
+    NaN and infinite fields are left out (line protocol cannot carry them);
+    returns "" if no field is left.
+    """
+    body = ",".join(
+        "%s=%s" % (_escape_key(k), _format_field(v))
+        for k, v in fields.items()
+        if not isinstance(v, float) or math.isfinite(v)
+    )
+    if not body:
+        return ""
+    head = _escape_key(measurement)
+    for key in sorted(tags):
+        head += ",%s=%s" % (_escape_key(key), _escape_key(str(tags[key])))
+    return "%s %s %d" % (head, body, timestamp_ns)
+
+
+class InfluxExporter:
+    """
+    Batched, back-pressured export of slice status samples to an
+    InfluxDB-compatible HTTP write endpoint.
+
+    attach(slice) registers a status listener that only enqueues the sample
+    (no formatting or I/O on the polling thread). A background thread
+    serializes queued samples to line protocol and POSTs them over one
+    persistent keep-alive connection whenever batch_size samples are queued
+    or flush_interval has passed. When the sink is slower than the poll loop
+    the bounded queue applies the overflow policy: drop_oldest, drop_newest,
+    or spill (append to spill_path and backfill once writes succeed again).
+    Batches the sink rejects as invalid (4xx other than 408 / 429) are
+    dropped rather than retried.
+    """
+
+    def __init__(
+        self,
+        url: str = "http://localhost:8086",
+        write_path: str = "/write?db=loafware&precision=ns",
+        headers: Optional[Mapping[str, str]] = None,
+        measurement: str = "slice_status",
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue: int = 50000,
+        overflow: str = DROP_OLDEST,
+        spill_path: Optional[str] = None,
+        timeout: float = 5.0,
+    ) -> None:
+        """
+        :param url: Base URL of the sink (http or https).
+        :param write_path: Path and query of the write endpoint
+            (InfluxDB 2.x: "/api/v2/write?org=..&bucket=..&precision=ns").
+        :param headers: Extra HTTP headers, e.g. {"Authorization": "Token ..."}.
+        :param measurement: Measurement name of the exported samples.
+        :param batch_size: Flush once this many samples are queued.
+        :param flush_interval: Flush at least this often (s).
+        :param max_queue: Maximum queued samples before the overflow policy applies.
+        :param overflow: DROP_OLDEST, DROP_NEWEST or SPILL.
+        :param spill_path: File used by the SPILL policy and for failed batches.
+        :param timeout: HTTP connect/read timeout (s).
+        """
+        if overflow not in (DROP_OLDEST, DROP_NEWEST, SPILL):
+            raise ValueError("unknown overflow policy %r" % overflow)
+        if overflow == SPILL and not spill_path:
+            raise ValueError("the spill policy needs a spill_path")
+        parts = urlsplit(url)
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname or "localhost"
+        self._port = parts.port
+        self.write_path = write_path
+        self.headers = {"Content-Type": "text/plain; charset=utf-8"}
+        self.headers.update(headers or {})
+        self.measurement = measurement
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.spill_path = spill_path
+        self.timeout = timeout
+        # status listeners get time.monotonic(); exported timestamps are wall clock
+        self._wall_offset_ns = time.time_ns() - int(time.monotonic() * 1e9)
+
+        self._queue: Deque[Tuple[Dict[str, str], Dict[str, Any], int]] = deque()
+        self._overflow: List[Tuple[Dict[str, str], Dict[str, Any], int]] = []
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._attached: List[Any] = []
+
+        # statistics
+        self.samples_queued = 0
+        self.samples_sent = 0
+        self.samples_dropped = 0
+        self.samples_spilled = 0
+        self.batches_sent = 0
+        self.batches_failed = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.flush_latency_total = 0.0
+        self.max_flush_latency = 0.0
+
+    # --- producer side ----------------------------------------------------
+
+    def attach(self, slice_obj: Any) -> None:
+        """Export every decoded status of slice_obj."""
+        slice_obj.add_status_listener(self.on_status)
+        self._attached.append(slice_obj)
+
+    def detach(self, slice_obj: Any) -> None:
+        slice_obj.remove_status_listener(self.on_status)
+        if slice_obj in self._attached:
+            self._attached.remove(slice_obj)
+
+    def on_status(
+        self, slice_obj: Any, timestamp: float, values: Dict[str, Any]
+    ) -> None:
+        """
+        Status listener queueing one sample (also usable behind a stage). The
+        sample is stamped with its own (monotonic) timestamp, so windows and
+        downsampled points keep their time instead of the time they arrive.
+        """
+        tags = {
+            "address": "0x%02X" % slice_obj.target_address,
+            "slice": type(slice_obj).__name__,
+        }
+        self.record(tags, values, int(timestamp * 1e9) + self._wall_offset_ns)
+
+    def record(
+        self,
+        tags: Mapping[str, str],
+        fields: Mapping[str, Any],
+        timestamp_ns: Optional[int] = None,
+    ) -> bool:
+        """
+        Queue one sample. Returns False if it was dropped by the overflow policy.
+        """
+        if timestamp_ns is None:
+            timestamp_ns = time.time_ns()
+        item = (dict(tags), dict(fields), timestamp_ns)
+        with self._cond:
+            self.samples_queued += 1
+            if len(self._queue) >= self.max_queue:
+                if self.overflow == DROP_NEWEST:
+                    self.samples_dropped += 1
+                    return False
+                oldest = self._queue.popleft()
+                if self.overflow == SPILL and len(self._overflow) < self.max_queue:
+                    # written to disk by the flush thread, never on this one
+                    self._overflow.append(oldest)
+                else:
+                    self.samples_dropped += 1
+            self._queue.append(item)
+            if len(self._queue) >= self.batch_size or self._overflow:
+                self._cond.notify()
+        return True
+
+    # --- consumer side ----------------------------------------------------
+
+    def start(self) -> None:
+        """Start the background flush thread."""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="loafware-influx-exporter", daemon=True
+        )
+        self._thread.start()
+        logger.info("InfluxExporter: exporting to %s%s", self._host, self.write_path)
+
+    def stop(self, flush: bool = True) -> None:
+        """Stop the flush thread, optionally sending what is still queued."""
+        for slice_obj in list(self._attached):
+            self.detach(slice_obj)
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._cond:
+            overflow, self._overflow = self._overflow, []
+        if overflow:
+            self._spill(self._format_all(overflow))
+        if flush:
+            self.drain()
+        self._close_connection()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if (
+                    self._running
+                    and len(self._queue) < self.batch_size
+                    and not self._overflow
+                ):
+                    self._cond.wait(self.flush_interval)
+                if not self._running:
+                    return
+                overflow, self._overflow = self._overflow, []
+            if overflow:
+                self._spill(self._format_all(overflow))
+            self.flush()
+
+    def _format_all(
+        self, items: List[Tuple[Dict[str, str], Dict[str, Any], int]]
+    ) -> List[str]:
+        lines = []
+        for tags, fields, timestamp_ns in items:
+            line = to_line_protocol(self.measurement, tags, fields, timestamp_ns)
+            if line:
+                lines.append(line)
+        if len(lines) < len(items):
+            with self._cond:
+                # nothing left to export (every field NaN / infinite)
+                self.samples_dropped += len(items) - len(lines)
+        return lines
+
+    def flush(self) -> int:
+        """
+        Send up to batch_size queued samples now. Returns the number of
+        samples taken off the queue, whether they were sent, spilled or
+        dropped (stats() tells which), so 0 means the queue is empty.
+        """
+        return self._flush()[0]
+
+    def drain(self) -> int:
+        """
+        Flush until the queue is empty; returns the number of samples sent.
+        Once a write fails, the rest of the queue is spilled (or dropped) at
+        once instead of waiting for the sink batch by batch.
+        """
+        sent = 0
+        while True:
+            consumed, delivered, outcome = self._flush()
+            sent += delivered
+            if not consumed:
+                return sent
+            if outcome == _FAILED:
+                with self._cond:
+                    items = list(self._queue)
+                    self._queue.clear()
+                self._give_up(self._format_all(items))
+                return sent
+
+    def _flush(self) -> Tuple[int, int, int]:
+        """One batch: (samples consumed, samples sent, write outcome)."""
+        with self._cond:
+            count = min(len(self._queue), self.batch_size)
+            items = [self._queue.popleft() for _ in range(count)]
+        if not items:
+            return 0, 0, _SENT
+        lines = self._format_all(items)
+        if not lines:
+            return len(items), 0, _SENT
+        outcome = self._write(lines)
+        if outcome == _SENT:
+            self._backfill()
+            return len(items), len(lines), outcome
+        if outcome == _FAILED:
+            self._give_up(lines)
+        return len(items), 0, outcome
+
+    def _give_up(self, lines: List[str]) -> None:
+        """Keep lines the sink could not take in the spill file, or drop them."""
+        if not lines:
+            return
+        if self.spill_path:
+            self._spill(lines)
+        else:
+            with self._cond:
+                self.samples_dropped += len(lines)
+
+    # --- transport --------------------------------------------------------
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            if self._https:
+                cls = http.client.HTTPSConnection
+            else:
+                cls = http.client.HTTPConnection
+            self._conn = cls(self._host, self._port, timeout=self.timeout)
+        return self._conn
+
+    def _close_connection(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _write(self, lines: List[str]) -> int:
+        """POST one batch; returns _SENT, _REJECTED (dropped) or _FAILED."""
+        body = ("\n".join(lines) + "\n").encode("utf-8")
+        started = time.monotonic()
+        try:
+            conn = self._connection()
+            conn.request("POST", self.write_path, body=body, headers=self.headers)
+            response = conn.getresponse()
+            detail = response.read()
+            status = response.status
+            if status < 300:
+                outcome = _SENT
+            elif 400 <= status < 500 and status not in (408, 429):
+                logger.error(
+                    "_write: sink rejected %d samples (%d), dropping them: %s",
+                    len(lines),
+                    status,
+                    detail[:200].decode("utf-8", "replace"),
+                )
+                outcome = _REJECTED
+            else:
+                logger.error(
+                    "_write: sink returned %d: %s",
+                    status,
+                    detail[:200].decode("utf-8", "replace"),
+                )
+                outcome = _FAILED
+            if response.getheader("Connection", "").lower() == "close":
+                self._close_connection()
+        except (OSError, http.client.HTTPException) as e:
+            logger.error("_write: failed to write %d samples: %s", len(lines), e)
+            self._close_connection()
+            outcome = _FAILED
+        latency = time.monotonic() - started
+        with self._cond:
+            if outcome == _SENT:
+                self.batches_sent += 1
+                self.samples_sent += len(lines)
+                self.last_batch_size = len(lines)
+                self.max_batch_size = max(self.max_batch_size, len(lines))
+                self.flush_latency_total += latency
+                self.max_flush_latency = max(self.max_flush_latency, latency)
+            else:
+                self.batches_failed += 1
+                if outcome == _REJECTED:
+                    self.samples_dropped += len(lines)
+        return outcome
+
+    def _spill(self, lines: List[str]) -> None:
+        if not lines:
+            return
+        try:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            with self._cond:
+                self.samples_spilled += len(lines)
+        except (OSError, TypeError) as e:
+            logger.error("_spill: cannot spill %d samples: %s", len(lines), e)
+            with self._cond:
+                self.samples_dropped += len(lines)
+
+    def _backfill(self) -> None:
+        """Send spilled samples once the sink accepts writes again."""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        pending = self.spill_path + ".sending"
+        try:
+            os.replace(self.spill_path, pending)
+            with open(pending, encoding="utf-8") as f:
+                lines = [line.rstrip("\n") for line in f if line.strip()]
+        except OSError as e:
+            logger.error("_backfill: cannot read spill file: %s", e)
+            return
+        for i in range(0, len(lines), self.batch_size):
+            chunk = lines[i : i + self.batch_size]
+            if self._write(chunk) == _FAILED:
+                self._spill(lines[i:])
+                break
+        os.remove(pending)
+
+    # --- reporting --------------------------------------------------------
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            return {
+                "queue_depth": len(self._queue),
+                "samples_queued": self.samples_queued,
+                "samples_sent": self.samples_sent,
+                "samples_dropped": self.samples_dropped,
+                "samples_spilled": self.samples_spilled,
+                "batches_sent": self.batches_sent,
+                "batches_failed": self.batches_failed,
+                "last_batch_size": self.last_batch_size,
+                "max_batch_size": self.max_batch_size,
+                "mean_flush_latency": (
+                    self.flush_latency_total / self.batches_sent
+                    if self.batches_sent
+                    else 0.0
+                ),
+                "max_flush_latency": self.max_flush_latency,
+            }
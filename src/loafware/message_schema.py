@@ -0,0 +1,298 @@
+# src/loafware/message_schema.py
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+import logging
+import struct
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only batched decode needs it
+    np = None
+
+logger = logging.getLogger("loafware.message_schema")
+
+# Number of float slots in every CRUMBS payload
+DATA_SLOTS = 6
+
+# Host-side record of one CRUMBS message (capture files, simulated bus):
+# typeID (u8), commandType (u8), 6 x float32 data, errorFlags (u8)
+FRAME = struct.Struct("<BB6fB")
+FRAME_SIZE = FRAME.size
+_DATA_OFFSET = 2
+
+_ZERO_PAYLOAD = (0.0,) * DATA_SLOTS
+
+
+def _to_bool(value: Any) -> bool:
+    # firmware flags are sent as 0.0 / 1.0; truncate like the C side would
+    return bool(int(value))
+
+
+# Field kind -> converter applied to the raw float slot
+_KINDS: Dict[str, Callable[[Any], Any]] = {"float": float, "int": int, "bool": _to_bool}
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("batched decoding requires numpy (pip install numpy)")
+
+
+def pack_frame(
+    type_id: int, command_type: int, data: Sequence[float], error_flags: int = 0
+) -> bytes:
+    """Encode one message as a FRAME record."""
+    return FRAME.pack(type_id, command_type, *data, error_flags & 0xFF)
+
+
+def pack_frame_into(
+    buffer: Any,
+    offset: int,
+    type_id: int,
+    command_type: int,
+    data: Sequence[float],
+    error_flags: int = 0,
+) -> None:
+    """Encode one message as a FRAME record into a reusable writable buffer."""
+    FRAME.pack_into(buffer, offset, type_id, command_type, *data, error_flags & 0xFF)
+
+
+def unpack_frame(buffer: Any, offset: int = 0) -> Tuple[Any, ...]:
+    """Decode one FRAME record: (typeID, commandType, d0..d5, errorFlags)."""
+    return FRAME.unpack_from(buffer, offset)
+
+
+def normalize_payload(data: Sequence[float]) -> List[float]:
+    """Return data as exactly DATA_SLOTS floats (padded with zeros / truncated)."""
+    payload = [float(x) for x in data[:DATA_SLOTS]]
+    if len(payload) < DATA_SLOTS:
+        payload.extend(_ZERO_PAYLOAD[len(payload) :])
+    return payload
+
+
+def frame_dtype() -> Any:
+    """numpy dtype matching FRAME (packed, no alignment)."""
+    _require_numpy()
+    return np.dtype(
+        [
+            ("type_id", "u1"),
+            ("command_type", "u1"),
+            ("data", "<f4", (DATA_SLOTS,)),
+            ("error_flags", "u1"),
+        ]
+    )
+
+
+def decode_frames(buffer: Any) -> Any:
+    """
+    View a buffer of consecutive FRAME records as a numpy structured array
+    (zero-copy; the buffer must outlive the returned array).
+    """
+    _require_numpy()
+    return np.frombuffer(buffer, dtype=frame_dtype())
+
+
+def _compile_decoder(
+    fields: Sequence["Field"], defaults: Mapping[str, Any]
+) -> Callable[[Sequence[float], Any], None]:
+    """
+    Generate a straight-line decoder `f(data, obj)` that assigns every field
+    (and default) as a plain attribute store, with no loops or lookups.
+    """
+    namespace: Dict[str, Any] = {"_" + kind: conv for kind, conv in _KINDS.items()}
+    lines = ["def decode_into(data, obj):"]
+    for i, (name, value) in enumerate(defaults.items()):
+        if not name.isidentifier():
+            raise ValueError("invalid attribute name %r" % name)
+        namespace["_default%d" % i] = value
+        lines.append("    obj.%s = _default%d" % (name, i))
+    for f in fields:
+        for target in f.targets:
+            if not target.isidentifier():
+                raise ValueError("invalid attribute name %r" % target)
+            lines.append("    obj.%s = _%s(data[%d])" % (target, f.kind, f.slot))
+    if len(lines) == 1:
+        lines.append("    pass")
+    exec("\n".join(lines), namespace)
+    return namespace["decode_into"]
+
+
+def _batch_dtype(fields: Sequence["Field"]) -> Any:
+    """numpy dtype exposing the data slots of FRAME records as named columns."""
+    _require_numpy()
+    return np.dtype(
+        {
+            "names": [f.name for f in fields],
+            "formats": ["<f4"] * len(fields),
+            "offsets": [_DATA_OFFSET + 4 * f.slot for f in fields],
+            "itemsize": FRAME_SIZE,
+        }
+    )
+
+
+class Field:
+    """
+    One decoded value of a message payload.
+    :param name: Attribute name the value is stored under.
+    :param slot: Index into the 6 data slots.
+    :param kind: "float", "int" or "bool".
+    :param targets: Attribute names to set (defaults to (name,)).
+    """
+
+    __slots__ = ("name", "slot", "kind", "convert", "targets")
+
+    def __init__(
+        self,
+        name: str,
+        slot: int,
+        kind: str = "float",
+        targets: Optional[Sequence[str]] = None,
+    ) -> None:
+        if not 0 <= slot < DATA_SLOTS:
+            raise ValueError("slot must be in 0..%d" % (DATA_SLOTS - 1))
+        if kind not in _KINDS:
+            raise ValueError("unknown field kind %r" % kind)
+        self.name = name
+        self.slot = slot
+        self.kind = kind
+        self.convert = _KINDS[kind]
+        self.targets = tuple(targets) if targets else (name,)
+
+
+class MessageSchema:
+    """
+    Declarative layout of a payload, compiled once into a generated decoder
+    (one attribute store per field) so decoding does no per-call lookups.
+    """
+
+    def __init__(
+        self,
+        type_id: int,
+        fields: Sequence[Field],
+        defaults: Optional[Mapping[str, Any]] = None,
+    ) -> None:
+        """
+        :param type_id: Device TYPE_ID the schema belongs to.
+        :param fields: Payload fields.
+        :param defaults: Attributes reset to fixed values on every decode.
+        """
+        self.type_id = type_id
+        self.fields = tuple(fields)
+        self.defaults = dict(defaults or {})
+        self._steps = tuple(
+            (target, f.slot, f.convert) for f in self.fields for target in f.targets
+        )
+        self.field_names: Tuple[str, ...] = tuple(
+            t for f in self.fields for t in f.targets
+        )
+        self._decode_into = _compile_decoder(self.fields, self.defaults)
+
+    def decode(self, data: Sequence[float]) -> Dict[str, Any]:
+        """Decode a payload into {attribute: value}."""
+        if len(data) < DATA_SLOTS:
+            data = normalize_payload(data)
+        values = dict(self.defaults)
+        for target, slot, convert in self._steps:
+            values[target] = convert(data[slot])
+        return values
+
+    def decode_into(self, data: Sequence[float], obj: Any) -> None:
+        """Decode a payload directly onto the attributes of obj."""
+        if len(data) < DATA_SLOTS:
+            data = normalize_payload(data)
+        self._decode_into(data, obj)
+
+    def encode(self, values: Mapping[str, Any]) -> List[float]:
+        """Build a 6-slot payload from {field name: value}; missing fields are 0."""
+        payload = list(_ZERO_PAYLOAD)
+        for f in self.fields:
+            if f.name in values:
+                payload[f.slot] = float(values[f.name])
+        return payload
+
+    def batch_dtype(self) -> Any:
+        """numpy dtype viewing FRAME records with this schema's named fields."""
+        return _batch_dtype(self.fields)
+
+    def decode_batch(self, frames: Any) -> Any:
+        """
+        Decode many FRAME records at once. Accepts a bytes-like buffer or the
+        result of decode_frames(); returns a zero-copy structured view with
+        one named float32 column per field.
+        """
+        _require_numpy()
+        if not isinstance(frames, np.ndarray):
+            frames = decode_frames(frames)
+        return frames.view(self.batch_dtype())
+
+
+class ModalSchema:
+    """
+    Payload whose layout depends on a selector slot (e.g. DCMT mode in data[0]).
+    :param selector: Field holding the layout key.
+    :param layouts: Layout per selector value.
+    :param common: Fields present in every layout.
+    """
+
+    def __init__(
+        self,
+        type_id: int,
+        selector: Field,
+        layouts: Mapping[int, MessageSchema],
+        common: Sequence[Field] = (),
+    ) -> None:
+        self.type_id = type_id
+        self.selector = selector
+        self.layouts = dict(layouts)
+        self.common = MessageSchema(type_id, common)
+        names: List[str] = list(selector.targets)
+        for layout in self.layouts.values():
+            for name in layout.field_names + tuple(layout.defaults):
+                if name not in names:
+                    names.append(name)
+        names.extend(n for n in self.common.field_names if n not in names)
+        self.field_names: Tuple[str, ...] = tuple(names)
+        # one straight-line decoder per layout, selector and common fields included
+        self._decoders = {
+            key: (
+                _compile_decoder(
+                    (selector,) + layout.fields + self.common.fields, layout.defaults
+                ),
+                layout,
+            )
+            for key, layout in self.layouts.items()
+        }
+        self._fallback = (
+            _compile_decoder((selector,) + self.common.fields, {}),
+            None,
+        )
+        self._select_slot = selector.slot
+        self._select_convert = selector.convert
+
+    def decode_into(self, data: Sequence[float], obj: Any) -> Optional[MessageSchema]:
+        """
+        Decode a payload onto obj. Returns the layout used, or None when the
+        selector value is unknown (only selector and common fields are set).
+        """
+        if len(data) < DATA_SLOTS:
+            data = normalize_payload(data)
+        decode, layout = self._decoders.get(
+            self._select_convert(data[self._select_slot]), self._fallback
+        )
+        decode(data, obj)
+        return layout
+
+    def decode_batch(self, frames: Any) -> Dict[int, Any]:
+        """
+        Decode many FRAME records at once, grouped by selector value.
+        Returns {selector value: structured array of that layout's fields}.
+        """
+        _require_numpy()
+        if not isinstance(frames, np.ndarray):
+            frames = decode_frames(frames)
+        keys = frames["data"][:, self.selector.slot].astype("<i4")
+        out: Dict[int, Any] = {}
+        for key, layout in self.layouts.items():
+            rows = frames[keys == key]
+            if len(rows):
+                fields = (self.selector,) + layout.fields + self.common.fields
+                out[key] = rows.view(_batch_dtype(fields))
+        return out
@@ -0,0 +1,279 @@
+# src/loafware/metrics.py
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+import threading
+
+logger = logging.getLogger("loafware.metrics")
+
+# Latency histogram bucket upper bounds (seconds): 20 us .. 1 s
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.00002,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        pairs.append('%s="%s"' % (name, escaped.replace("\n", "\\n")))
+    return "{%s}" % ",".join(pairs)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(
+        self, name: str, help_text: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: Any, amount: float = 1.0) -> None:
+        key = tuple(str(v) for v in labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def snapshot(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def prometheus(self) -> List[str]:
+        return [
+            "%s%s %s"
+            % (self.name, _format_labels(self.labelnames, key), _format_value(value))
+            for key, value in sorted(self.snapshot().items())
+        ]
+
+
+class Gauge:
+    """
+    Gauge whose values are read from registered source callables at export
+    time, so producers (e.g. queues) pay nothing between scrapes.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self, name: str, help_text: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._sources: List[Callable[[], Dict[LabelValues, float]]] = []
+        self._lock = threading.Lock()
+
+    def add_source(self, source: Callable[[], Dict[LabelValues, float]]) -> None:
+        with self._lock:
+            self._sources.append(source)
+
+    def remove_source(self, source: Callable[[], Dict[LabelValues, float]]) -> None:
+        with self._lock:
+            if source in self._sources:
+                self._sources.remove(source)
+
+    def snapshot(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            sources = list(self._sources)
+        values: Dict[LabelValues, float] = {}
+        for source in sources:
+            try:
+                values.update(source())
+            except Exception as e:
+                logger.exception("gauge %s: source failed: %s", self.name, e)
+        return values
+
+    def reset(self) -> None:
+        pass
+
+    def prometheus(self) -> List[str]:
+        return [
+            "%s%s %s"
+            % (self.name, _format_labels(self.labelnames, key), _format_value(value))
+            for key, value in sorted(self.snapshot().items())
+        ]
+
+
+class Histogram:
+    """Fixed-bucket histogram with optional labels (Prometheus semantics)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: Any) -> None:
+        key = tuple(str(v) for v in labelvalues)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = ([0] * (len(self.buckets) + 1), [0.0])
+                self._values[key] = entry
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def snapshot(self) -> Dict[LabelValues, Dict[str, Any]]:
+        """{labels: {"count", "sum", "buckets": {upper bound: cumulative count}}}."""
+        with self._lock:
+            items = [(k, list(c), s[0]) for k, (c, s) in self._values.items()]
+        out: Dict[LabelValues, Dict[str, Any]] = {}
+        for key, counts, total in items:
+            cumulative = 0
+            buckets: Dict[float, int] = {}
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                buckets[bound] = cumulative
+            out[key] = {"count": cumulative, "sum": total, "buckets": buckets}
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def prometheus(self) -> List[str]:
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, data in sorted(self.snapshot().items()):
+            for bound, count in data["buckets"].items():
+                labels = _format_labels(names, key + (_format_value(bound),))
+                lines.append("%s_bucket%s %d" % (self.name, labels, count))
+            labels = _format_labels(self.labelnames, key)
+            total = _format_value(data["sum"])
+            lines.append("%s_sum%s %s" % (self.name, labels, total))
+            lines.append("%s_count%s %d" % (self.name, labels, data["count"]))
+        return lines
+
+
+class MetricsRegistry:
+    """A named collection of metrics exportable as Prometheus text or a dict."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        # Global switch checked by the instrumentation hooks
+        self.enabled = True
+
+    def register(self, metric: Any) -> Any:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError("metric %s already registered" % metric.name)
+            self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[Any]:
+        return self._metrics.get(name)
+
+    def reset(self) -> None:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """{metric name: {"type", "labels", "values": {label tuple: value}}}."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            m.name: {"type": m.kind, "labels": m.labelnames, "values": m.snapshot()}
+            for m in metrics
+        }
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for m in metrics:
+            lines.append("# HELP %s %s" % (m.name, m.help))
+            lines.append("# TYPE %s %s" % (m.name, m.kind))
+            lines.extend(m.prometheus())
+        return "\n".join(lines) + "\n"
+
+
+class BusMetrics(MetricsRegistry):
+    """The metrics recorded by the wrapper, slice and queue hooks."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.transactions = self.register(
+            Counter(
+                "loafware_bus_transactions_total",
+                "Bus transactions by address, operation and command type.",
+                ("address", "op", "command"),
+            )
+        )
+        self.latency = self.register(
+            Histogram(
+                "loafware_latency_seconds",
+                "Latency of bus send/request and slice request_status/parse.",
+                ("op",),
+            )
+        )
+        self.errors = self.register(
+            Counter(
+                "loafware_errors_total",
+                "Failures by address and cause.",
+                ("address", "cause"),
+            )
+        )
+        self.queue_depth = self.register(
+            Gauge(
+                "loafware_queue_depth",
+                "Queued (not yet started) bus transactions.",
+                ("queue", "priority"),
+            )
+        )
+
+
+# Process-wide default registry used by all hooks
+METRICS = BusMetrics()
+
+
+def format_address(target_address: int) -> str:
+    return "0x%02X" % target_address
@@ -1,7 +1,8 @@
 # src/loafware/motor_controller_slice.py
 from typing import Any, Optional, List, Tuple
 from pyCRUMBS import CRUMBSMessage
-from .slice_base import Slice
+from .slice_base import NOT_FRESH, Slice
+from .message_schema import Field, MessageSchema, ModalSchema
 import logging
 
 logger = logging.getLogger("loafware.motor_controller_slice")
@@ -19,9 +20,51 @@ CMD_PID = 3
 CMD_BRAKE = 4
 CMD_WRITE_PWM = 6
 
+# Commands that take precedence over queued bus traffic
+SAFETY_COMMANDS = frozenset({CMD_MODE, CMD_BRAKE})
+
 # Device TYPE_ID (must match config.h on the device)
 DEVICE_TYPE_ID = 2  # DCMT firmware defines TYPE_ID 2
 
+# Status reply layout (handleRequest); data[0] selects the per-mode layout
+STATUS_SCHEMA = ModalSchema(
+    DEVICE_TYPE_ID,
+    selector=Field("mode", 0, "int"),
+    layouts={
+        OPEN_LOOP: MessageSchema(
+            DEVICE_TYPE_ID,
+            [Field("motor1_pwm", 1), Field("motor2_pwm", 2)],
+            defaults={
+                "motor1_pos": 0.0,
+                "motor2_pos": 0.0,
+                "motor1_speed": 0.0,
+                "motor2_speed": 0.0,
+            },
+        ),
+        CLOSED_LOOP_POSITION: MessageSchema(
+            DEVICE_TYPE_ID,
+            [
+                Field("motor1_pos_sp", 1),
+                Field("motor2_pos_sp", 2),
+                Field("motor1_pos", 3),
+                Field("motor2_pos", 4),
+            ],
+        ),
+        CLOSED_LOOP_SPEED: MessageSchema(
+            DEVICE_TYPE_ID,
+            [
+                Field("motor1_speed_sp", 1),
+                Field("motor2_speed_sp", 2),
+                Field("motor1_speed", 3),
+                Field("motor2_speed", 4),
+            ],
+        ),
+    },
+    # firmware sets brakeFlag = motor1Brake || motor2Brake; we can't separate
+    # the two, so keep the conservative interpretation and mirror it to both
+    common=[Field("brake", 5, "bool", targets=("motor1_brake", "motor2_brake"))],
+)
+
 
 class MotorControllerSlice(Slice):
     """
@@ -29,6 +72,16 @@ class MotorControllerSlice(Slice):
     for the DCMT firmware. All payloads use 6 float slots; unused slots are zero.
     """
 
+    STATUS_FIELDS = STATUS_SCHEMA.field_names
+    REMOTE_METHODS = (
+        "change_mode",
+        "set_position_setpoints",
+        "set_speed_setpoints",
+        "change_pid_tunings",
+        "set_brakes",
+        "write_pwm",
+    )
+
     def __init__(self, target_address: int, crumbs_wrapper: Any) -> None:
         super().__init__(target_address, crumbs_wrapper)
         # runtime state (mirrors firmware data fields)
@@ -81,46 +134,14 @@ class MotorControllerSlice(Slice):
                 )
                 # continue parsing anyway (be forgiving), but note mismatch
 
-            mode = int(message.data[0])
-            self.mode = mode
-
-            # parse depending on mode
-            if mode == OPEN_LOOP:
-                self.motor1_pwm = float(message.data[1])
-                self.motor2_pwm = float(message.data[2])
-                self.motor1_pos = 0.0
-                self.motor2_pos = 0.0
-                self.motor1_speed = 0.0
-                self.motor2_speed = 0.0
-            elif mode == CLOSED_LOOP_POSITION:
-                self.motor1_pos_sp = float(message.data[1])
-                self.motor2_pos_sp = float(message.data[2])
-                self.motor1_pos = float(message.data[3])
-                self.motor2_pos = float(message.data[4])
-            elif mode == CLOSED_LOOP_SPEED:
-                self.motor1_speed_sp = float(message.data[1])
-                self.motor2_speed_sp = float(message.data[2])
-                self.motor1_speed = float(message.data[3])
-                self.motor2_speed = float(message.data[4])
-            else:
+            # parse depending on mode (see STATUS_SCHEMA)
+            if STATUS_SCHEMA.decode_into(message.data, self) is None:
                 logger.warning(
                     "handle_message: unknown mode %s from device 0x%02X",
-                    mode,
+                    self.mode,
                     self.target_address,
                 )
 
-            brake_flag = int(message.data[5])
-            # firmware sets brakeFlag = motor1Brake || motor2Brake
-            # we keep a simple interpretation: if brake flag set, mark both as true only if mode is OPEN_LOOP
-            if brake_flag:
-                # We can't precisely separate motor1 vs motor2 brake from single flag;
-                # keep conservative approach: set both True (firmware uses combined flag).
-                self.motor1_brake = True
-                self.motor2_brake = True
-            else:
-                self.motor1_brake = False
-                self.motor2_brake = False
-
             logger.info(
                 "Parsed status 0x%02X: mode=%d pwm=(%.1f,%.1f) pos_sp=(%.2f,%.2f) pos=(%.2f,%.2f) speed_sp=(%.2f,%.2f) speed=(%.2f,%.2f) brakes=(%s,%s)",
                 self.target_address,
@@ -138,6 +159,7 @@ class MotorControllerSlice(Slice):
                 self.motor1_brake,
                 self.motor2_brake,
             )
+            self._publish_status()
         except Exception as e:
             logger.exception(
                 "handle_message: failed to parse message from 0x%02X: %s",
@@ -158,6 +180,9 @@ class MotorControllerSlice(Slice):
             response: Optional[CRUMBSMessage] = self.crumbs.request_message(
                 self.target_address
             )
+            if response is NOT_FRESH:
+                # no new frame since the last call (BusDaemon): mirror is current
+                return self._last_response
             if response is None:
                 logger.error(
                     "request_status: no response from 0x%02X", self.target_address
@@ -165,6 +190,7 @@ class MotorControllerSlice(Slice):
                 return None
             # verify length and decode: the wrapper already decodes; pass to handler
             self.handle_message(response)
+            self._last_response = response
             return response
         except Exception as e:
             logger.exception(
@@ -189,7 +215,9 @@ class MotorControllerSlice(Slice):
             # ensure floats
             msg.data = [float(x) for x in data]
             msg.errorFlags = 0
-            self.crumbs.send_message(msg, self.target_address)
+            # a coalescing BusWorker returns the Future of the queued write
+            queued = self.crumbs.send_message(msg, self.target_address)
+            self._watch_write(int(command_type), queued)
             logger.debug(
                 "send_command: sent cmd=%d to 0x%02X data=%s",
                 command_type,
@@ -219,17 +247,27 @@ class MotorControllerSlice(Slice):
 
     def set_position_setpoints(self, sp1: float, sp2: float) -> bool:
         """Set position setpoints (valid when in CLOSED_LOOP_POSITION)."""
-        self.motor1_pos_sp = float(sp1)
-        self.motor2_pos_sp = float(sp2)
+        requested = (float(sp1), float(sp2))
+        mirrored = (self.motor1_pos_sp, self.motor2_pos_sp)
+        if self._suppress_write(CMD_SETPOINT, requested, mirrored):
+            return True
+        self.motor1_pos_sp, self.motor2_pos_sp = requested
         payload = [float(sp1), float(sp2), 0.0, 0.0, 0.0, 0.0]
-        return self.send_command(CMD_SETPOINT, payload)
+        return self._track_write(
+            CMD_SETPOINT, self.send_command(CMD_SETPOINT, payload)
+        )
 
     def set_speed_setpoints(self, sp1: float, sp2: float) -> bool:
         """Set speed setpoints (valid when in CLOSED_LOOP_SPEED)."""
-        self.motor1_speed_sp = float(sp1)
-        self.motor2_speed_sp = float(sp2)
+        requested = (float(sp1), float(sp2))
+        mirrored = (self.motor1_speed_sp, self.motor2_speed_sp)
+        if self._suppress_write(CMD_SETPOINT, requested, mirrored):
+            return True
+        self.motor1_speed_sp, self.motor2_speed_sp = requested
         payload = [float(sp1), float(sp2), 0.0, 0.0, 0.0, 0.0]
-        return self.send_command(CMD_SETPOINT, payload)
+        return self._track_write(
+            CMD_SETPOINT, self.send_command(CMD_SETPOINT, payload)
+        )
 
     def change_pid_tunings(
         self, pid1: Tuple[float, float, float], pid2: Tuple[float, float, float]
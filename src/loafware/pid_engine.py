@@ -0,0 +1,333 @@
+# src/loafware/pid_engine.py
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .slice_base import Slice
+from .relay_heater_slice import RelayHeaterSlice
+from .motor_controller_slice import MotorControllerSlice
+import logging
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; PIDEngine requires it
+    np = None
+
+logger = logging.getLogger("loafware.pid_engine")
+
+# Slice type -> (host output method taking both channels, default output range).
+# write_pwm() reads values in [0, 1] as a fraction, so DCMT outputs stay there.
+OUTPUT_METHODS: Dict[type, Tuple[str, Tuple[float, float]]] = {
+    RelayHeaterSlice: ("write_relays", (0.0, 100.0)),
+    MotorControllerSlice: ("write_pwm", (0.0, 1.0)),
+}
+
+
+class LoopStats:
+    """Timing of a fixed-rate control loop."""
+
+    def __init__(self, period: float) -> None:
+        self.period = period
+        self.ticks = 0
+        self.overruns = 0  # ticks that finished after the next tick was due
+        self.skipped = 0  # whole periods dropped to get back on the grid
+        self.max_lateness = 0.0
+        self.compute_total = 0.0
+        self.max_compute = 0.0
+        self.writes = 0
+        self.write_failures = 0
+        self.stale = 0  # channel updates held because the sample was too old
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "period": self.period,
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "max_lateness": self.max_lateness,
+            "mean_compute": self.compute_total / self.ticks if self.ticks else 0.0,
+            "max_compute": self.max_compute,
+            "writes": self.writes,
+            "write_failures": self.write_failures,
+            "stale": self.stale,
+        }
+
+
+class PIDEngine:
+    """
+    Host-side PID for many channels at once (slices in RLHT WRITE or DCMT
+    OPEN_LOOP mode). Each tick reads the latest mirrored measurement of every
+    channel (kept fresh by a SlicePoller), evaluates all PIDs as numpy array
+    operations and sends one output write per slice (both channels in one
+    command), skipping writes whose value did not change.
+
+    The PID is positional with derivative on measurement (no setpoint kick),
+    output clamping and conditional-integration anti-windup: the integral is
+    frozen while the output is saturated in the direction of the error, and
+    never leaves the output range.
+
+    A channel whose last decoded status is older than max_age (the slice
+    stopped answering or is no longer polled) is held: its output and
+    integral keep their values until fresh samples arrive again.
+    """
+
+    def __init__(
+        self,
+        period: float = 0.02,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        max_age: Optional[float] = None,
+    ) -> None:
+        """
+        :param period: Control period (s), e.g. 0.01-0.02 for 50-100 Hz.
+        :param clock: Monotonic time source.
+        :param sleep: Sleep function (injectable for simulation).
+        :param max_age: Hold channels whose sample is older than this (s);
+            default 3 periods. Raise it if slices are polled less often.
+        """
+        if np is None:
+            raise ImportError("PIDEngine requires numpy (pip install numpy)")
+        if period <= 0:
+            raise ValueError("period must be positive")
+        self.period = float(period)
+        self.max_age = 3 * self.period if max_age is None else float(max_age)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = LoopStats(self.period)
+
+        # per channel
+        self._channels: List[Tuple[Slice, str, int]] = []
+        self.setpoint = np.zeros(0)
+        self.kp = np.zeros(0)
+        self.ki = np.zeros(0)
+        self.kd = np.zeros(0)
+        self.out_min = np.zeros(0)
+        self.out_max = np.zeros(0)
+        self.integral = np.zeros(0)
+        self.output = np.zeros(0)
+        self._last_measurement = np.zeros(0)
+        self._primed = np.zeros(0, dtype=bool)
+        self.enabled = np.zeros(0, dtype=bool)
+        self.sampled = np.zeros(0)  # clock() when the measurement was decoded
+        # per slice: [slice, output method, [channel index per output slot]]
+        self._writers: Dict[int, List[Any]] = {}
+        self._last_written: Dict[int, Tuple[float, ...]] = {}
+
+    def add_channel(
+        self,
+        slice_obj: Slice,
+        measurement: str,
+        output: int,
+        setpoint: float,
+        kp: float,
+        ki: float = 0.0,
+        kd: float = 0.0,
+        out_min: Optional[float] = None,
+        out_max: Optional[float] = None,
+    ) -> int:
+        """
+        Control output slot `output` (0 or 1) of slice_obj from its mirrored
+        `measurement` attribute (e.g. "temperature1", "motor1_speed").
+        Returns the channel index used by set_setpoint() / set_gains().
+        """
+        method, (lo, hi) = OUTPUT_METHODS[self._slice_type(slice_obj)]
+        if output not in (0, 1):
+            raise ValueError("output must be 0 or 1")
+        lo = lo if out_min is None else float(out_min)
+        hi = hi if out_max is None else float(out_max)
+        if lo >= hi:
+            raise ValueError("need out_min < out_max")
+        with self._lock:
+            index = len(self._channels)
+            self._channels.append((slice_obj, measurement, output))
+            self.setpoint = np.append(self.setpoint, float(setpoint))
+            self.kp = np.append(self.kp, float(kp))
+            self.ki = np.append(self.ki, float(ki))
+            self.kd = np.append(self.kd, float(kd))
+            self.out_min = np.append(self.out_min, lo)
+            self.out_max = np.append(self.out_max, hi)
+            self.integral = np.append(self.integral, 0.0)
+            self.output = np.append(self.output, lo)
+            self._last_measurement = np.append(self._last_measurement, 0.0)
+            self._primed = np.append(self._primed, False)
+            self.enabled = np.append(self.enabled, True)
+            self.sampled = np.append(self.sampled, -np.inf)
+            writer = self._writers.get(id(slice_obj))
+            new = writer is None
+            if new:
+                writer = [slice_obj, getattr(slice_obj, method), [None, None]]
+                self._writers[id(slice_obj)] = writer
+            writer[2][output] = index
+        if new:
+            slice_obj.add_status_listener(self._on_status)
+        return index
+
+    def _on_status(
+        self, slice_obj: Any, timestamp: float, values: Dict[str, Any]
+    ) -> None:
+        now = self._clock()
+        with self._lock:
+            writer = self._writers.get(id(slice_obj))
+            if writer is not None:
+                for index in writer[2]:
+                    if index is not None:
+                        self.sampled[index] = now
+
+    @staticmethod
+    def _slice_type(slice_obj: Slice) -> type:
+        for cls in type(slice_obj).__mro__:
+            if cls in OUTPUT_METHODS:
+                return cls
+        raise TypeError("no host output method for %s" % type(slice_obj).__name__)
+
+    def set_setpoint(self, index: int, value: float) -> None:
+        self.setpoint[index] = value
+
+    def set_gains(self, index: int, kp: float, ki: float, kd: float) -> None:
+        with self._lock:
+            self.kp[index], self.ki[index], self.kd[index] = kp, ki, kd
+
+    def reset(self, index: Optional[int] = None) -> None:
+        """Clear the integral and derivative state (of one channel or all)."""
+        with self._lock:
+            if index is None:
+                self.integral[:] = 0.0
+                self._primed[:] = False
+            else:
+                self.integral[index] = 0.0
+                self._primed[index] = False
+
+    # --- control ----------------------------------------------------------
+
+    def measurements(self) -> Any:
+        """The latest mirrored measurement of every channel."""
+        return np.fromiter(
+            (getattr(s, name) for s, name, _ in self._channels),
+            dtype=float,
+            count=len(self._channels),
+        )
+
+    def compute(self, measurement: Any, dt: float, fresh: Any = True) -> Any:
+        """
+        One vectorized PID update for every channel; returns the outputs.
+        Channels where `fresh` is False are held (output, integral, state).
+        """
+        error = self.setpoint - measurement
+        derivative = np.where(
+            self._primed, (measurement - self._last_measurement) / dt, 0.0
+        )
+        integral = self.integral + self.ki * error * dt
+        raw = self.kp * error + integral - self.kd * derivative
+        output = np.clip(raw, self.out_min, self.out_max)
+        # anti-windup: keep the old integral while pushing further into a limit
+        windup = ((raw > self.out_max) & (error > 0)) | (
+            (raw < self.out_min) & (error < 0)
+        )
+        integral = np.where(windup, self.integral, integral)
+        active = self.enabled & fresh
+        self.integral = np.where(
+            active, np.clip(integral, self.out_min, self.out_max), self.integral
+        )
+        self.output = np.where(active, output, self.output)
+        self._last_measurement = np.where(active, measurement, self._last_measurement)
+        # a held channel restarts its derivative from its next fresh sample
+        self._primed = np.where(fresh, self._primed | active, False)
+        return self.output
+
+    def write_outputs(self) -> int:
+        """Send one write per slice whose outputs changed; returns the count."""
+        writes = 0
+        output = self.output.tolist()
+        for key, (slice_obj, method, slots) in self._writers.items():
+            values = tuple(output[i] if i is not None else 0.0 for i in slots)
+            if self._last_written.get(key) == values:
+                continue
+            ok = False
+            try:
+                ok = bool(method(*values))
+            except Exception as e:
+                logger.exception(
+                    "write_outputs: write to 0x%02X raised: %s",
+                    slice_obj.target_address,
+                    e,
+                )
+            writes += 1
+            if ok:
+                self._last_written[key] = values
+            else:
+                self.stats.write_failures += 1
+        self.stats.writes += writes
+        return writes
+
+    def tick(self, dt: Optional[float] = None) -> None:
+        """Read measurements, update every PID and write the outputs once."""
+        with self._lock:
+            if not self._channels:
+                return
+            fresh = self._clock() - self.sampled <= self.max_age
+            self.stats.stale += int(np.count_nonzero(~fresh & self.enabled))
+            self.compute(
+                self.measurements(), self.period if dt is None else dt, fresh
+            )
+        self.write_outputs()
+
+    # --- fixed-rate loop --------------------------------------------------
+
+    def run(self, duration: Optional[float] = None) -> None:
+        """Run the loop in the calling thread until stop() or duration elapses."""
+        self._stop.clear()
+        self._run_loop(duration)
+
+    def _run_loop(self, duration: Optional[float] = None) -> None:
+        start = self._clock()
+        end = None if duration is None else start + duration
+        deadline = start
+        last = None
+        while not self._stop.is_set():
+            now = self._clock()
+            # the next tick would fall after the end: do not sleep into it
+            if end is not None and max(now, deadline) >= end:
+                break
+            if now < deadline:
+                self._sleep(deadline - now)
+                now = self._clock()
+            stats = self.stats
+            lateness = now - deadline
+            if lateness > stats.max_lateness:
+                stats.max_lateness = lateness
+            self.tick(None if last is None else now - last)
+            last = now
+            finished = self._clock()
+            compute = finished - now
+            stats.ticks += 1
+            stats.compute_total += compute
+            if compute > stats.max_compute:
+                stats.max_compute = compute
+            deadline += self.period
+            if finished > deadline:
+                stats.overruns += 1
+                # stay on the grid: drop the periods that are already over
+                missed = int((finished - deadline) // self.period)
+                stats.skipped += missed
+                deadline += missed * self.period
+
+    def start(self) -> None:
+        """Run the loop in a background daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run_loop, name="loafware-pid-engine", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            "PIDEngine: %d channels at %.0f Hz", len(self._channels), 1 / self.period
+        )
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -1,27 +1,113 @@
 from typing import Optional
 from pyCRUMBS import CRUMBS, CRUMBSMessage
+from .metrics import METRICS, format_address
+from .tracing import TRACER
 import logging
+import threading
+import time
 
 logger = logging.getLogger("loafware.pycrumbs_wrapper")
 
 
 class PyCRUMBSWrapper:
-    """Wrapper for the pyCRUMBS CRUMBS I2C communication library."""
+    """
+    Wrapper for the pyCRUMBS CRUMBS I2C communication library.
+    Calls are serialized with a lock so a write and a read from different
+    threads never interleave on the bus; use BusWorker for prioritized access.
+    """
 
     def __init__(self, bus_number: int = 1) -> None:
         """Initialize the CRUMBS I2C master on the given bus number."""
+        self._lock = threading.RLock()
         self.crumbs = CRUMBS(bus_number)
         self.crumbs.begin()
         logger.info("pyCRUMBSWrapper: I2C bus %d opened as master.", bus_number)
 
     def send_message(self, message: CRUMBSMessage, target_address: int) -> None:
         """Send a CRUMBSMessage to the specified target address."""
-        self.crumbs.send_message(message, target_address)
+        tracer = TRACER
+        if not tracer.enabled:
+            return self._send_message(message, target_address)
+        started = time.perf_counter()
+        ok = False
+        try:
+            self._send_message(message, target_address)
+            ok = True
+        finally:
+            tracer.record(
+                "bus_send",
+                "bus",
+                started,
+                time.perf_counter(),
+                {
+                    "address": format_address(target_address),
+                    "command": getattr(message, "commandType", None),
+                    "ok": ok,
+                },
+            )
+
+    def _send_message(self, message: CRUMBSMessage, target_address: int) -> None:
+        metrics = METRICS
+        with self._lock:
+            if not metrics.enabled:
+                self.crumbs.send_message(message, target_address)
+                return
+            started = time.perf_counter()
+            try:
+                self.crumbs.send_message(message, target_address)
+            except Exception:
+                metrics.errors.inc(format_address(target_address), "bus_error")
+                raise
+            finally:
+                metrics.latency.observe(time.perf_counter() - started, "bus_send")
+        metrics.transactions.inc(
+            format_address(target_address),
+            "send",
+            getattr(message, "commandType", ""),
+        )
 
     def request_message(self, target_address: int) -> Optional[CRUMBSMessage]:
         """Request a CRUMBSMessage from the specified target address."""
-        return self.crumbs.request_message(target_address)
+        tracer = TRACER
+        if not tracer.enabled:
+            return self._request_message(target_address)
+        started = time.perf_counter()
+        response = None
+        try:
+            response = self._request_message(target_address)
+        finally:
+            tracer.record(
+                "bus_request",
+                "bus",
+                started,
+                time.perf_counter(),
+                {
+                    "address": format_address(target_address),
+                    "ok": response is not None,
+                },
+            )
+        return response
+
+    def _request_message(self, target_address: int) -> Optional[CRUMBSMessage]:
+        metrics = METRICS
+        with self._lock:
+            if not metrics.enabled:
+                return self.crumbs.request_message(target_address)
+            started = time.perf_counter()
+            try:
+                response = self.crumbs.request_message(target_address)
+            except Exception:
+                metrics.errors.inc(format_address(target_address), "bus_error")
+                raise
+            finally:
+                metrics.latency.observe(time.perf_counter() - started, "bus_request")
+        address = format_address(target_address)
+        metrics.transactions.inc(address, "request", 0)
+        if response is None:
+            metrics.errors.inc(address, "no_response")
+        return response
 
     def close(self) -> None:
         """Close the CRUMBS I2C connection."""
-        self.crumbs.close()
+        with self._lock:
+            self.crumbs.close()
@@ -1,7 +1,8 @@
 # src/loafware/relay_heater_slice.py
 from typing import Any, Optional, Tuple, List
 from pyCRUMBS import CRUMBSMessage
-from .slice_base import Slice
+from .slice_base import NOT_FRESH, Slice
+from .message_schema import Field, MessageSchema, normalize_payload
 import logging
 
 logger = logging.getLogger("loafware.relay_heater_slice")
@@ -13,6 +14,22 @@ DEVICE_TYPE_ID = 1  # RLHT firmware TYPE_ID
 CONTROL = 0
 WRITE = 1
 
+# Status reply layout (commandType 0)
+STATUS_SCHEMA = MessageSchema(
+    DEVICE_TYPE_ID,
+    [
+        Field("temperature1", 0),
+        Field("temperature2", 1),
+        Field("setpoint1", 2),
+        Field("setpoint2", 3),
+        Field("relay_on_time1", 4),
+        Field("relay_on_time2", 5),
+    ],
+)
+
+# Commands that take precedence over queued bus traffic (change_mode)
+SAFETY_COMMANDS = frozenset({1})
+
 
 class RelayHeaterSlice(Slice):
     """
@@ -21,6 +38,16 @@ class RelayHeaterSlice(Slice):
     - send_command(...) returns True if the message was written to the bus (not a remote success guarantee).
     """
 
+    STATUS_FIELDS = STATUS_SCHEMA.field_names + ("error_flags",)
+    REMOTE_METHODS = (
+        "change_mode",
+        "change_setpoints",
+        "change_pid_tuning",
+        "change_relay_periods",
+        "change_thermo_select",
+        "write_relays",
+    )
+
     def __init__(self, target_address: int, crumbs_wrapper: Any) -> None:
         super().__init__(target_address, crumbs_wrapper)
         # Mirror firmware state fields
@@ -58,20 +85,8 @@ class RelayHeaterSlice(Slice):
                     self.target_address,
                 )
 
-            # Parse fields (be defensive about length)
-            d = list(message.data) if hasattr(message, "data") else [0.0] * 6
-            # pad/truncate to 6
-            if len(d) < 6:
-                d = d + [0.0] * (6 - len(d))
-            else:
-                d = d[:6]
-
-            self.temperature1 = float(d[0])
-            self.temperature2 = float(d[1])
-            self.setpoint1 = float(d[2])
-            self.setpoint2 = float(d[3])
-            self.relay_on_time1 = float(d[4])
-            self.relay_on_time2 = float(d[5])
+            # Parse fields (schema pads short payloads with zeros)
+            STATUS_SCHEMA.decode_into(getattr(message, "data", ()), self)
             self.error_flags = int(getattr(message, "errorFlags", 0))
 
             logger.info(
@@ -85,6 +100,7 @@ class RelayHeaterSlice(Slice):
                 self.relay_on_time2,
                 self.error_flags,
             )
+            self._publish_status()
         except Exception as e:
             logger.exception(
                 "handle_message: failed to parse message from 0x%02X: %s",
@@ -104,6 +120,9 @@ class RelayHeaterSlice(Slice):
             response: Optional[CRUMBSMessage] = self.crumbs.request_message(
                 self.target_address
             )
+            if response is NOT_FRESH:
+                # no new frame since the last call (BusDaemon): mirror is current
+                return self._last_response
             if response is None:
                 logger.error(
                     "request_status: no response from 0x%02X", self.target_address
@@ -111,6 +130,7 @@ class RelayHeaterSlice(Slice):
                 return None
             # Let handler parse and update local state
             self.handle_message(response)
+            self._last_response = response
             return response
         except Exception as e:
             logger.exception(
@@ -130,11 +150,7 @@ class RelayHeaterSlice(Slice):
             if not isinstance(data, (list, tuple)):
                 logger.error("send_command: payload must be list/tuple of floats")
                 return False
-            payload = [float(x) for x in data]
-            if len(payload) < 6:
-                payload += [0.0] * (6 - len(payload))
-            elif len(payload) > 6:
-                payload = payload[:6]
+            payload = normalize_payload(data)
 
             msg = CRUMBSMessage()
             msg.typeID = DEVICE_TYPE_ID
@@ -142,7 +158,9 @@ class RelayHeaterSlice(Slice):
             msg.data = payload
             msg.errorFlags = 0
 
-            self.crumbs.send_message(msg, self.target_address)
+            # a coalescing BusWorker returns the Future of the queued write
+            queued = self.crumbs.send_message(msg, self.target_address)
+            self._watch_write(int(command_type), queued)
             logger.debug(
                 "send_command: sent cmd=%d to 0x%02X data=%s",
                 command_type,
@@ -168,9 +186,13 @@ class RelayHeaterSlice(Slice):
 
     def change_setpoints(self, setpoint1: float, setpoint2: float) -> bool:
         """Change setpoints for heater 1 and heater 2 (commandType 2)."""
-        self.setpoint1 = float(setpoint1)
-        self.setpoint2 = float(setpoint2)
-        return self.send_command(2, [self.setpoint1, self.setpoint2] + [0.0] * 4)
+        requested = (float(setpoint1), float(setpoint2))
+        if self._suppress_write(2, requested, (self.setpoint1, self.setpoint2)):
+            return True
+        self.setpoint1, self.setpoint2 = requested
+        return self._track_write(
+            2, self.send_command(2, [self.setpoint1, self.setpoint2] + [0.0] * 4)
+        )
 
     def change_pid_tuning(
         self, pid1: Tuple[float, float, float], pid2: Tuple[float, float, float]
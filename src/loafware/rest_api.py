@@ -0,0 +1,438 @@
+# src/loafware/rest_api.py
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from .stream_hub import StreamHub, sse_keepalive
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger("loafware.rest_api")
+
+# (bus key, target address), as used by BusManager.slices()
+SliceKey = Tuple[Any, int]
+
+# Upper bound of a long-poll wait (s)
+MAX_WAIT = 30.0
+# Number of finished commands whose result stays retrievable
+COMMAND_HISTORY = 1000
+# Idle time after which a stream sends a keepalive comment (s)
+KEEPALIVE_INTERVAL = 15.0
+# A stream client that does not accept data for this long is disconnected (s)
+STREAM_WRITE_TIMEOUT = 10.0
+
+
+def _entity_tags(header: str) -> List[str]:
+    """Tags listed in an If-None-Match header, without W/ and quotes ("*" kept)."""
+    tags = []
+    for item in header.split(","):
+        item = item.strip()
+        if item.startswith("W/"):
+            item = item[2:]
+        if len(item) >= 2 and item[0] == item[-1] == '"':
+            item = item[1:-1]
+        if item:
+            tags.append(item)
+    return tags
+
+
+class StateCache:
+    """
+    Latest decoded state of a set of slices, fed by their status listeners.
+    Readers never cause bus traffic. Every update bumps a global sequence
+    number (the rack ETag) and the slice's own one; JSON bodies are encoded
+    once per version no matter how many clients read them.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._entries: Dict[SliceKey, Dict[str, Any]] = {}
+        self._keys: Dict[int, SliceKey] = {}  # id(slice) -> key
+        self._encoded: Dict[Any, Tuple[int, bytes]] = {}
+
+    def add(self, key: SliceKey, slice_obj: Any) -> None:
+        """Track slice_obj under key, starting from its current mirrored state."""
+        with self._cond:
+            self._keys[id(slice_obj)] = key
+            self._seq += 1
+            self._entries[key] = {
+                "bus": key[0],
+                "address": key[1],
+                "type": type(slice_obj).__name__,
+                "seq": self._seq,
+                "timestamp": None,
+                "values": slice_obj.status_values(),
+            }
+        slice_obj.add_status_listener(self._on_status)
+
+    def remove(self, key: SliceKey, slice_obj: Any) -> None:
+        slice_obj.remove_status_listener(self._on_status)
+        with self._cond:
+            self._keys.pop(id(slice_obj), None)
+            self._entries.pop(key, None)
+            self._seq += 1
+            self._cond.notify_all()
+
+    def _on_status(
+        self, slice_obj: Any, timestamp: float, values: Dict[str, Any]
+    ) -> None:
+        with self._cond:
+            key = self._keys.get(id(slice_obj))
+            if key is None:
+                return
+            self._seq += 1
+            entry = self._entries[key]
+            entry["seq"] = self._seq
+            entry["timestamp"] = timestamp
+            entry["values"] = values
+            self._cond.notify_all()
+
+    def version(self, key: Optional[SliceKey] = None) -> int:
+        """Sequence number of the rack (key=None) or of one slice (-1 if unknown)."""
+        with self._cond:
+            if key is None:
+                return self._seq
+            entry = self._entries.get(key)
+            return -1 if entry is None else entry["seq"]
+
+    def wait_newer(
+        self, since: int, timeout: float, key: Optional[SliceKey] = None
+    ) -> int:
+        """Block until the version differs from since (or timeout); return it."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if key is None:
+                    version = self._seq
+                else:
+                    entry = self._entries.get(key)
+                    version = -1 if entry is None else entry["seq"]
+                remaining = deadline - time.monotonic()
+                if version != since or remaining <= 0:
+                    return version
+                self._cond.wait(remaining)
+
+    def encoded(self, key: Optional[SliceKey] = None) -> Optional[Tuple[int, bytes]]:
+        """(version, JSON body) of the rack or of one slice; None if unknown."""
+        with self._cond:
+            if key is None:
+                version = self._seq
+            elif key in self._entries:
+                version = self._entries[key]["seq"]
+            else:
+                return None
+            cached = self._encoded.get(key)
+            if cached is not None and cached[0] == version:
+                return cached
+            if key is None:
+                doc: Any = {
+                    "seq": version,
+                    "slices": [
+                        self._entries[k] for k in sorted(self._entries, key=str)
+                    ],
+                }
+            else:
+                doc = self._entries[key]
+            body = json.dumps(doc, default=str).encode("utf-8")
+            self._encoded[key] = (version, body)
+            return version, body
+
+
+class RestServer:
+    """
+    HTTP service over a set of slices (e.g. BusManager.slices()).
+
+    GET  /slices                         latest state of every slice
+    GET  /slices/<bus>/<address>         latest state of one slice
+    POST /slices/<bus>/<address>/<method> queue a call of a REMOTE_METHODS
+                                         method; body: JSON list of positional
+                                         or object of keyword arguments
+    GET  /commands/<id>                  status / result of a queued call
+    GET  /stream                         Server-Sent Events push of every
+                                         decoded status; ?slices=1/0x0A,..
+                                         &fields=a,b&rate=<samples/s per slice>
+
+    GETs are answered from a StateCache and never touch the bus; polling is
+    done elsewhere (SlicePoller / BusManager). Responses carry an ETag; with
+    If-None-Match a client gets 304, and adding ?wait=<s> turns it into a
+    long poll that returns as soon as a newer sample arrives. Commands run
+    in order on one dispatcher thread and the POST returns 202 immediately.
+    Stream clients that fall behind are dropped by the StreamHub.
+
+    There is no authentication: anyone who can connect can actuate the
+    slices, so the server listens on localhost unless told otherwise.
+    """
+
+    def __init__(
+        self,
+        slices: Mapping[SliceKey, Any],
+        host: str = "127.0.0.1",
+        port: int = 8080,
+    ) -> None:
+        """
+        :param slices: {(bus key, address): slice} to expose.
+        :param host: Interface to listen on ("0.0.0.0" for every interface).
+        :param port: TCP port (0 picks a free one, see self.port).
+        """
+        self.cache = StateCache()
+        self.stream = StreamHub()
+        self._slices: Dict[Tuple[str, int], Tuple[SliceKey, Any]] = {}
+        for key, slice_obj in slices.items():
+            self._slices[(str(key[0]), key[1])] = (key, slice_obj)
+            self.cache.add(key, slice_obj)
+            self.stream.add(key, slice_obj)
+        self._dispatcher = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="loafware-rest-commands"
+        )
+        self._commands: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._command_lock = threading.Lock()
+        self._next_command = 0
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.app = self  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    def start(self) -> None:
+        """Serve in a background daemon thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            name="loafware-rest-api",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info("RestServer: listening on port %d", self.port)
+
+    def stop(self) -> None:
+        """Stop serving, finish queued commands and detach from the slices."""
+        self.stream.close()
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+        self._dispatcher.shutdown(wait=True)
+        for key, slice_obj in self._slices.values():
+            self.cache.remove(key, slice_obj)
+            self.stream.remove(key, slice_obj)
+        logger.info("RestServer: stopped")
+
+    # --- commands ---------------------------------------------------------
+
+    def lookup(self, bus: str, address: int) -> Optional[Tuple[SliceKey, Any]]:
+        return self._slices.get((bus, address))
+
+    def submit_command(
+        self, slice_obj: Any, method: str, args: List[Any], kwargs: Dict[str, Any]
+    ) -> int:
+        """Queue slice_obj.method(*args, **kwargs); returns the command id."""
+        with self._command_lock:
+            self._next_command += 1
+            command_id = self._next_command
+            record = {
+                "id": command_id,
+                "address": slice_obj.target_address,
+                "method": method,
+                "state": "queued",
+                "result": None,
+                "error": None,
+            }
+            self._commands[command_id] = record
+            while len(self._commands) > COMMAND_HISTORY:
+                self._commands.popitem(last=False)
+        self._dispatcher.submit(self._run_command, record, slice_obj, args, kwargs)
+        return command_id
+
+    def _run_command(
+        self,
+        record: Dict[str, Any],
+        slice_obj: Any,
+        args: List[Any],
+        kwargs: Dict[str, Any],
+    ) -> None:
+        try:
+            result = getattr(slice_obj, record["method"])(*args, **kwargs)
+            state, error = "done", None
+        except Exception as e:
+            logger.error(
+                "command %s on 0x%02X failed: %s",
+                record["method"],
+                slice_obj.target_address,
+                e,
+            )
+            result, state, error = None, "failed", str(e)
+        with self._command_lock:
+            record["result"] = result
+            record["state"] = state
+            record["error"] = error
+
+    def command(self, command_id: int) -> Optional[Dict[str, Any]]:
+        with self._command_lock:
+            record = self._commands.get(command_id)
+            return None if record is None else dict(record)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "loafware"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s " + format, self.address_string(), *args)
+
+    def _send(
+        self, status: int, body: bytes = b"", etag: Optional[str] = None
+    ) -> None:
+        self.send_response(status)
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        if body:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_json(self, status: int, doc: Any) -> None:
+        self._send(status, json.dumps(doc, default=str).encode("utf-8"))
+
+    def _error(self, status: int, message: str) -> None:
+        self._send_json(status, {"error": message})
+
+    def _route(self) -> Tuple[List[str], Dict[str, List[str]]]:
+        parts = urlsplit(self.path)
+        return [p for p in parts.path.split("/") if p], parse_qs(parts.query)
+
+    def _slice_key(self, bus: str, address: str) -> Optional[Tuple[SliceKey, Any]]:
+        try:
+            return self.server.app.lookup(bus, int(address, 0))  # type: ignore
+        except ValueError:
+            return None
+
+    def do_GET(self) -> None:
+        app: RestServer = self.server.app  # type: ignore[attr-defined]
+        path, query = self._route()
+        if path == ["slices"]:
+            key = None
+        elif len(path) == 3 and path[0] == "slices":
+            found = self._slice_key(path[1], path[2])
+            if found is None:
+                return self._error(404, "unknown slice")
+            key = found[0]
+        elif len(path) == 2 and path[0] == "commands" and path[1].isdigit():
+            record = app.command(int(path[1]))
+            if record is None:
+                return self._error(404, "unknown command")
+            return self._send_json(200, record)
+        elif path == ["stream"]:
+            return self._stream(app, query)
+        else:
+            return self._error(404, "not found")
+
+        cache = app.cache
+        tags = _entity_tags(self.headers.get("If-None-Match", ""))
+        known = [int(t) for t in tags if t.lstrip("-").isdigit()]
+        if known and "*" not in tags and "wait" in query:
+            try:
+                wait = min(max(float(query["wait"][0]), 0.0), MAX_WAIT)
+            except ValueError:
+                return self._error(400, "bad wait")
+            # versions only grow: wait for one newer than the client's newest
+            cache.wait_newer(max(known), wait, key)
+        encoded = cache.encoded(key)
+        if encoded is None:
+            return self._error(404, "unknown slice")
+        version, body = encoded
+        etag = '"%d"' % version
+        if "*" in tags or str(version) in tags:
+            return self._send(304, etag=etag)
+        self._send(200, body, etag)
+
+    def do_HEAD(self) -> None:
+        path, _ = self._route()
+        if path == ["stream"]:
+            # headers only; never enter the event loop
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return
+        self.do_GET()
+
+    def _stream(self, app: "RestServer", query: Dict[str, List[str]]) -> None:
+        slices = None
+        try:
+            if "slices" in query:
+                slices = []
+                for item in ",".join(query["slices"]).split(","):
+                    bus, _, address = item.partition("/")
+                    found = app.lookup(bus, int(address, 0))
+                    if found is None:
+                        return self._error(404, "unknown slice %s" % item)
+                    slices.append(found[0])
+            rate = float(query["rate"][0]) if "rate" in query else None
+        except ValueError:
+            return self._error(400, "bad slices or rate")
+        fields = None
+        if "fields" in query:
+            fields = [f for f in ",".join(query["fields"]).split(",") if f]
+        subscription = app.stream.subscribe(slices, fields, rate)
+        self.close_connection = True
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.connection.settimeout(STREAM_WRITE_TIMEOUT)
+            while True:
+                event = subscription.get(KEEPALIVE_INTERVAL)
+                if event is not None:
+                    self.wfile.write(event.sse(subscription.fields))
+                elif subscription.closed:
+                    break
+                else:
+                    self.wfile.write(sse_keepalive())
+                self.wfile.flush()
+        except OSError as e:
+            logger.debug("stream client %s gone: %s", self.address_string(), e)
+        finally:
+            subscription.close()
+
+    def do_POST(self) -> None:
+        app: RestServer = self.server.app  # type: ignore[attr-defined]
+        path, _ = self._route()
+        if len(path) != 4 or path[0] != "slices":
+            return self._error(404, "not found")
+        found = self._slice_key(path[1], path[2])
+        if found is None:
+            return self._error(404, "unknown slice")
+        slice_obj = found[1]
+        method = path[3]
+        if method not in getattr(slice_obj, "REMOTE_METHODS", ()):
+            return self._error(403, "%s is not a remote method" % method)
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            doc = json.loads(raw.decode("utf-8")) if raw.strip() else []
+        except (ValueError, UnicodeDecodeError):
+            return self._error(400, "body must be JSON")
+        if isinstance(doc, list):
+            args, kwargs = doc, {}
+        elif isinstance(doc, dict):
+            args, kwargs = [], doc
+        else:
+            return self._error(400, "body must be a JSON list or object")
+        command_id = app.submit_command(slice_obj, method, args, kwargs)
+        self._send_json(
+            202, {"id": command_id, "status": "/commands/%d" % command_id}
+        )
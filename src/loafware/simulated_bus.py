@@ -0,0 +1,319 @@
+# src/loafware/simulated_bus.py
+from typing import Callable, Dict, List, Optional
+from pyCRUMBS import CRUMBSMessage
+from .message_schema import FRAME
+from . import motor_controller_slice as dcmt
+from . import relay_heater_slice as rlht
+import abc
+import errno
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger("loafware.simulated_bus")
+
+# Largest integration step of the device models (seconds)
+_MAX_STEP = 0.001
+# Longest gap that is integrated at once; beyond this the model just settles
+_MAX_ELAPSED = 10.0
+
+
+class _PID:
+    """Minimal positional PID used by the firmware models."""
+
+    def __init__(self, kp: float, ki: float, kd: float) -> None:
+        self.kp, self.ki, self.kd = kp, ki, kd
+        self.integral = 0.0
+        self.last_error: Optional[float] = None
+
+    def update(self, error: float, dt: float, lo: float, hi: float) -> float:
+        derivative = 0.0
+        if self.last_error is not None and dt > 0:
+            derivative = (error - self.last_error) / dt
+        self.last_error = error
+        out = self.kp * error + self.ki * (self.integral + error * dt)
+        out += self.kd * derivative
+        # conditional integration as anti-windup
+        if lo < out < hi:
+            self.integral += error * dt
+        return max(lo, min(hi, out))
+
+
+class SimulatedDevice(abc.ABC):
+    """A virtual CRUMBS peripheral hosted on a SimulatedCrumbsBus."""
+
+    TYPE_ID = 0
+
+    def __init__(self) -> None:
+        self.error_flags = 0
+
+    @abc.abstractmethod
+    def step(self, dt: float) -> None:
+        """Advance the device model by dt seconds."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def handle_command(self, command_type: int, data: List[float]) -> None:
+        """Apply a received command (firmware receiveMessage)."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def status(self) -> List[float]:
+        """Return the 6 data slots of the status reply (firmware handleRequest)."""
+        raise NotImplementedError
+
+
+class SimulatedRLHT(SimulatedDevice):
+    """
+    RLHT firmware model: two heaters with first-order thermal plants driven by
+    time-proportioned relays. In CONTROL mode an on-device PID computes the
+    relay duty from the setpoint; in WRITE mode the host writes the duty.
+    """
+
+    TYPE_ID = rlht.DEVICE_TYPE_ID
+
+    def __init__(
+        self,
+        ambient: float = 22.0,
+        heater_power: float = 40.0,
+        heat_capacity: float = 200.0,
+        loss_coefficient: float = 0.5,
+    ) -> None:
+        """
+        :param ambient: Ambient temperature (C).
+        :param heater_power: Heater power at 100% duty (W).
+        :param heat_capacity: Thermal mass (J/C).
+        :param loss_coefficient: Heat loss to ambient (W/C).
+        """
+        super().__init__()
+        self.ambient = ambient
+        self.heater_power = heater_power
+        self.heat_capacity = heat_capacity
+        self.loss_coefficient = loss_coefficient
+        self.mode = rlht.CONTROL
+        self.temperatures = [ambient, ambient]
+        self.setpoints = [0.0, 0.0]
+        self.duty = [0.0, 0.0]  # percent
+        self.relay_periods = [1000, 1000]  # ms
+        self.pids = [_PID(1.0, 0.0, 0.0), _PID(1.0, 0.0, 0.0)]
+
+    def step(self, dt: float) -> None:
+        for i in range(2):
+            if self.mode == rlht.CONTROL:
+                error = self.setpoints[i] - self.temperatures[i]
+                self.duty[i] = self.pids[i].update(error, dt, 0.0, 100.0)
+            power = self.heater_power * self.duty[i] / 100.0
+            loss = self.loss_coefficient * (self.temperatures[i] - self.ambient)
+            self.temperatures[i] += (power - loss) * dt / self.heat_capacity
+
+    def handle_command(self, command_type: int, data: List[float]) -> None:
+        if command_type == 1:
+            self.mode = rlht.WRITE if int(data[0]) == rlht.WRITE else rlht.CONTROL
+        elif command_type == 2:
+            self.setpoints = [data[0], data[1]]
+        elif command_type == 3:
+            self.pids = [_PID(*data[0:3]), _PID(*data[3:6])]
+        elif command_type == 4:
+            self.relay_periods = [int(data[0]), int(data[1])]
+        elif command_type == 6 and self.mode == rlht.WRITE:
+            self.duty = [max(0.0, min(100.0, d)) for d in data[0:2]]
+
+    def status(self) -> List[float]:
+        on_times = [self.duty[i] / 100.0 * self.relay_periods[i] for i in range(2)]
+        return [
+            self.temperatures[0],
+            self.temperatures[1],
+            self.setpoints[0],
+            self.setpoints[1],
+            on_times[0],
+            on_times[1],
+        ]
+
+
+class SimulatedDCMT(SimulatedDevice):
+    """
+    DCMT firmware model: two DC motors with first-order speed response and
+    integrated position, driven by PWM directly (OPEN_LOOP) or by an
+    on-device PID on position or speed.
+    """
+
+    TYPE_ID = dcmt.DEVICE_TYPE_ID
+
+    def __init__(self, max_speed: float = 100.0, time_constant: float = 0.05) -> None:
+        """
+        :param max_speed: Steady-state speed at PWM 255 (units/s).
+        :param time_constant: Mechanical time constant (s).
+        """
+        super().__init__()
+        self.max_speed = max_speed
+        self.time_constant = time_constant
+        self.mode = dcmt.OPEN_LOOP
+        self.pwm = [0.0, 0.0]  # -255..255
+        self.positions = [0.0, 0.0]
+        self.speeds = [0.0, 0.0]
+        self.position_setpoints = [0.0, 0.0]
+        self.speed_setpoints = [0.0, 0.0]
+        self.brakes = [False, False]
+        self.pids = [_PID(2.0, 0.0, 0.0), _PID(2.0, 0.0, 0.0)]
+
+    def step(self, dt: float) -> None:
+        for i in range(2):
+            if self.mode == dcmt.CLOSED_LOOP_POSITION:
+                error = self.position_setpoints[i] - self.positions[i]
+                self.pwm[i] = self.pids[i].update(error, dt, -255.0, 255.0)
+            elif self.mode == dcmt.CLOSED_LOOP_SPEED:
+                error = self.speed_setpoints[i] - self.speeds[i]
+                self.pwm[i] = self.pids[i].update(error, dt, -255.0, 255.0)
+            if self.brakes[i]:
+                self.speeds[i] = 0.0
+                continue
+            target = self.max_speed * self.pwm[i] / 255.0
+            self.speeds[i] += (target - self.speeds[i]) * dt / self.time_constant
+            self.positions[i] += self.speeds[i] * dt
+
+    def handle_command(self, command_type: int, data: List[float]) -> None:
+        if command_type == dcmt.CMD_MODE:
+            mode = int(data[0])
+            modes = (dcmt.CLOSED_LOOP_POSITION, dcmt.CLOSED_LOOP_SPEED, dcmt.OPEN_LOOP)
+            if mode in modes:
+                self.mode = mode
+                self.pids = [_PID(p.kp, p.ki, p.kd) for p in self.pids]
+        elif command_type == dcmt.CMD_SETPOINT:
+            if self.mode == dcmt.CLOSED_LOOP_POSITION:
+                self.position_setpoints = [data[0], data[1]]
+            elif self.mode == dcmt.CLOSED_LOOP_SPEED:
+                self.speed_setpoints = [data[0], data[1]]
+        elif command_type == dcmt.CMD_PID:
+            self.pids = [_PID(*data[0:3]), _PID(*data[3:6])]
+        elif command_type == dcmt.CMD_BRAKE:
+            self.brakes = [bool(data[0]), bool(data[1])]
+        elif command_type == dcmt.CMD_WRITE_PWM and self.mode == dcmt.OPEN_LOOP:
+            self.pwm = [max(-255.0, min(255.0, p)) for p in data[0:2]]
+
+    def status(self) -> List[float]:
+        brake = 1.0 if (self.brakes[0] or self.brakes[1]) else 0.0
+        if self.mode == dcmt.OPEN_LOOP:
+            return [float(self.mode), self.pwm[0], self.pwm[1], 0.0, 0.0, brake]
+        if self.mode == dcmt.CLOSED_LOOP_POSITION:
+            sp, pv = self.position_setpoints, self.positions
+        else:
+            sp, pv = self.speed_setpoints, self.speeds
+        return [float(self.mode), sp[0], sp[1], pv[0], pv[1], brake]
+
+
+class SimulatedCrumbsBus:
+    """
+    In-process stand-in for PyCRUMBSWrapper hosting virtual devices.
+    Implements the same send_message / request_message / close contract and
+    can inject per-transaction latency, NACKs (send raises OSError, request
+    returns None, as for an absent address) and corrupted frames (random bit
+    flips in the encoded reply).
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        nack_rate: float = 0.0,
+        corrupt_rate: float = 0.0,
+        seed: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        :param latency: Fixed time per transaction (s).
+        :param latency_jitter: Extra uniformly distributed time per transaction (s).
+        :param nack_rate: Probability that a transaction is not acknowledged.
+        :param corrupt_rate: Probability that a status reply is corrupted.
+        :param seed: Seed of the fault/latency random generator.
+        :param clock: Time source driving the device models.
+        :param sleep: Used to spend the simulated transaction latency.
+        """
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.nack_rate = nack_rate
+        self.corrupt_rate = corrupt_rate
+        self._random = random.Random(seed)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.devices: Dict[int, SimulatedDevice] = {}
+        self._last_step: Dict[int, float] = {}
+        self.transactions = 0
+        self.nacks = 0
+        self.corrupted = 0
+
+    def add_device(self, target_address: int, device: SimulatedDevice) -> None:
+        """Attach a virtual device at target_address."""
+        with self._lock:
+            self.devices[target_address] = device
+            self._last_step[target_address] = self._clock()
+
+    def remove_device(self, target_address: int) -> None:
+        """Detach (unplug) the device at target_address."""
+        with self._lock:
+            self.devices.pop(target_address, None)
+            self._last_step.pop(target_address, None)
+
+    def _advance(self, target_address: int, device: SimulatedDevice) -> None:
+        now = self._clock()
+        elapsed = min(now - self._last_step[target_address], _MAX_ELAPSED)
+        self._last_step[target_address] = now
+        while elapsed > 0:
+            dt = min(elapsed, _MAX_STEP)
+            device.step(dt)
+            elapsed -= dt
+
+    def _transaction(self, target_address: int) -> Optional[SimulatedDevice]:
+        """Spend bus latency and decide on a NACK; return the addressed device."""
+        self.transactions += 1
+        delay = self.latency
+        if self.latency_jitter:
+            delay += self._random.uniform(0.0, self.latency_jitter)
+        if delay > 0:
+            self._sleep(delay)
+        device = self.devices.get(target_address)
+        nack = self.nack_rate and self._random.random() < self.nack_rate
+        if device is None or nack:
+            self.nacks += 1
+            return None
+        self._advance(target_address, device)
+        return device
+
+    def send_message(self, message: CRUMBSMessage, target_address: int) -> None:
+        """Deliver a CRUMBSMessage to the virtual device at target_address."""
+        with self._lock:
+            device = self._transaction(target_address)
+            if device is None:
+                raise OSError(errno.EIO, "NACK from 0x%02X" % target_address)
+            data = [float(x) for x in list(message.data)[:6]]
+            data += [0.0] * (6 - len(data))
+            device.handle_command(int(message.commandType), data)
+
+    def request_message(self, target_address: int) -> Optional[CRUMBSMessage]:
+        """Read a status reply from the virtual device at target_address."""
+        with self._lock:
+            device = self._transaction(target_address)
+            if device is None:
+                return None
+            frame = FRAME.pack(
+                device.TYPE_ID, 0, *device.status(), device.error_flags & 0xFF
+            )
+            if self.corrupt_rate and self._random.random() < self.corrupt_rate:
+                self.corrupted += 1
+                raw = bytearray(frame)
+                bit = self._random.randrange(len(raw) * 8)
+                raw[bit // 8] ^= 1 << (bit % 8)
+                frame = bytes(raw)
+        fields = FRAME.unpack(frame)
+        msg = CRUMBSMessage()
+        msg.typeID = fields[0]
+        msg.commandType = fields[1]
+        msg.data = list(fields[2:8])
+        msg.errorFlags = fields[8]
+        return msg
+
+    def close(self) -> None:
+        """Nothing to release; present for wrapper compatibility."""
+        logger.debug("SimulatedCrumbsBus: closed")
@@ -1,14 +1,183 @@
 # src/loafware/slice_base.py
-from typing import Any, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from .async_pycrumbs_wrapper import AsyncPyCRUMBSWrapper
+from .change_subscription import ChangeCallback, ChangeSubscription, Deadband
+from .telemetry_history import TelemetryHistory
+from .metrics import METRICS, format_address
+from .tracing import TRACER
 import abc
+import functools
+import logging
+import time
+import weakref
+
+logger = logging.getLogger("loafware.slice_base")
+
+# callback(slice, monotonic timestamp, {field: value}) after each decoded status
+StatusListener = Callable[[Any, float, Dict[str, Any]], None]
+# callback(slice, command_type, ok) after each send_command
+CommandListener = Callable[[Any, int, bool], None]
+
+
+class _NotFresh:
+    """
+    What request_message() of a wrapper serving polled frames from a cache
+    (DaemonProxy) returns when the device answers but no new frame arrived
+    since the previous call. Not a failure: slices keep their mirrored state
+    and return their previous response without publishing it again.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "NOT_FRESH"
+
+
+NOT_FRESH = _NotFresh()
+
+
+def _instrument_request_status(fn: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(fn)
+    def request_status(self: "Slice") -> Optional[Any]:
+        metrics = METRICS
+        if not metrics.enabled:
+            return fn(self)
+        started = time.perf_counter()
+        response = fn(self)
+        metrics.latency.observe(time.perf_counter() - started, "request_status")
+        if response is None:
+            metrics.errors.inc(format_address(self.target_address), "request_failed")
+        return response
+
+    return request_status
+
+
+def _instrument_send_command(fn: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(fn)
+    def send_command(self: "Slice", command_type: int, data: List[float]) -> bool:
+        metrics = METRICS
+        if not metrics.enabled:
+            ok = fn(self, command_type, data)
+        else:
+            started = time.perf_counter()
+            ok = fn(self, command_type, data)
+            metrics.latency.observe(time.perf_counter() - started, "send_command")
+            address = format_address(self.target_address)
+            metrics.transactions.inc(address, "send_command", command_type)
+            if not ok:
+                metrics.errors.inc(address, "send_failed")
+        if self._command_listeners:
+            self._notify_command(command_type, ok)
+        return ok
+
+    return send_command
+
+
+def _instrument_handle_message(fn: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(fn)
+    def handle_message(self: "Slice", message: Any) -> None:
+        metrics = METRICS
+        if not metrics.enabled:
+            return fn(self, message)
+        self._parsed = False
+        started = time.perf_counter()
+        fn(self, message)
+        metrics.latency.observe(time.perf_counter() - started, "parse")
+        if not self._parsed:
+            metrics.errors.inc(format_address(self.target_address), "parse_error")
+
+    return handle_message
+
+
+# Slice methods wrapped with metrics hooks in every subclass
+_INSTRUMENTED = {
+    "request_status": _instrument_request_status,
+    "send_command": _instrument_send_command,
+    "handle_message": _instrument_handle_message,
+}
+
+
+def _span_args(slice_obj: "Slice", name: str, args: Tuple[Any, ...]) -> Dict[str, Any]:
+    span_args: Dict[str, Any] = {"address": format_address(slice_obj.target_address)}
+    if name == "send_command" and args:
+        span_args["command"] = args[0]
+    elif name == "handle_message" and args:
+        span_args["command"] = getattr(args[0], "commandType", None)
+    return span_args
+
+
+def _trace(fn: Callable[..., Any]) -> Callable[..., Any]:
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def traced(self: "Slice", *args: Any, **kwargs: Any) -> Any:
+        tracer = TRACER
+        if not tracer.enabled:
+            return fn(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return fn(self, *args, **kwargs)
+        finally:
+            span_args = _span_args(self, name, args)
+            tracer.record(name, "slice", started, time.perf_counter(), span_args)
+
+    return traced
+
+
+# Slice class -> {name: untraced method}; _trace wrappers are only installed
+# while TRACER is enabled, so the disabled path costs no extra call frame
+_TRACEABLE: "weakref.WeakKeyDictionary[type, Dict[str, Callable[..., Any]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _set_tracing(enabled: bool) -> None:
+    for cls, methods in list(_TRACEABLE.items()):
+        for name, fn in methods.items():
+            setattr(cls, name, _trace(fn) if enabled else fn)
+
+
+TRACER.add_toggle(_set_tracing)
+
+
+def _write_succeeded(future: Any) -> bool:
+    return not future.cancelled() and future.exception() is None
 
 
 class Slice(abc.ABC):
     """
     Abstract base class representing a BREAD slice.
     Subclasses must implement the message handling and command mapping.
+    After a status message has been parsed, subclasses call _publish_status()
+    so history and status listeners see every decoded sample.
     """
 
+    # Names of the attributes a status message updates (set by subclasses)
+    STATUS_FIELDS: Tuple[str, ...] = ()
+    # Convenience methods that may be invoked remotely (e.g. by the REST API)
+    REMOTE_METHODS: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        # Every slice type gets the metrics hooks on its core methods
+        super().__init_subclass__(**kwargs)
+        for name, instrument in _INSTRUMENTED.items():
+            fn = cls.__dict__.get(name)
+            if fn is not None and not getattr(fn, "__isabstractmethod__", False):
+                setattr(cls, name, instrument(fn))
+        # ... and span tracing (while enabled) on those and on its remotely
+        # callable wrappers
+        remote = cls.__dict__.get("REMOTE_METHODS", ())
+        traceable = {}
+        for name in tuple(_INSTRUMENTED) + tuple(remote):
+            fn = cls.__dict__.get(name)
+            if fn is not None and not getattr(fn, "__isabstractmethod__", False):
+                traceable[name] = fn
+        if traceable:
+            _TRACEABLE[cls] = traceable
+            if TRACER.enabled:
+                for name, fn in traceable.items():
+                    setattr(cls, name, _trace(fn))
+
     def __init__(self, target_address: int, crumbs_wrapper: Any) -> None:
         """
         Initialize the slice with a target address and crumbs wrapper.
@@ -17,6 +186,20 @@ class Slice(abc.ABC):
         """
         self.target_address = target_address
         self.crumbs = crumbs_wrapper
+        # Skip setpoint writes that match the mirrored device state (opt-in)
+        self.suppress_redundant_writes: bool = False
+        self.writes_suppressed: int = 0
+        self._unconfirmed_commands: Set[int] = set()
+        # command type -> Future of its latest queued (not yet sent) write
+        self._queued_writes: Dict[int, Any] = {}
+        # Opt-in telemetry history and status listeners
+        self.history: Optional[TelemetryHistory] = None
+        self._status_listeners: List[StatusListener] = []
+        self._command_listeners: List[CommandListener] = []
+        self._subscriptions: List[ChangeSubscription] = []
+        self._parsed = False
+        # returned again when the wrapper has no fresh frame (NOT_FRESH)
+        self._last_response: Optional[Any] = None
 
     @abc.abstractmethod
     def handle_message(self, message: Any) -> None:
@@ -43,3 +226,176 @@ class Slice(abc.ABC):
         :return: True if the send was issued (doesn't guarantee remote success).
         """
         raise NotImplementedError
+
+    async def request_status_async(self) -> Optional[Any]:
+        """
+        Awaitable request_status(). Runs on the I/O thread of this slice's bus,
+        so concurrent calls for slices on the same bus are serialized.
+        """
+        bus = AsyncPyCRUMBSWrapper.for_wrapper(self.crumbs)
+        return await bus.run(self.request_status)
+
+    async def send_command_async(self, command_type: int, data: List[float]) -> bool:
+        """Awaitable send_command(), serialized with other traffic on this bus."""
+        bus = AsyncPyCRUMBSWrapper.for_wrapper(self.crumbs)
+        return await bus.run(self.send_command, command_type, data)
+
+    def _suppress_write(
+        self, command_type: int, requested: Tuple[Any, ...], mirrored: Tuple[Any, ...]
+    ) -> bool:
+        """
+        Return True (and count it) if a write can be skipped because the
+        requested values equal the mirrored state and the last write of this
+        command type did not fail.
+        """
+        if not self.suppress_redundant_writes:
+            return False
+        if command_type in self._unconfirmed_commands or requested != mirrored:
+            return False
+        self.writes_suppressed += 1
+        logger.debug(
+            "suppressed redundant cmd=%d to 0x%02X", command_type, self.target_address
+        )
+        return True
+
+    def _track_write(self, command_type: int, ok: bool) -> bool:
+        """Remember failed writes so they are never suppressed on retry."""
+        queued = self._queued_writes.get(command_type)
+        confirmed = ok
+        if ok and queued is not None:
+            # only queued: unconfirmed until the write has reached the bus
+            confirmed = queued.done() and _write_succeeded(queued)
+        if confirmed:
+            self._unconfirmed_commands.discard(command_type)
+        else:
+            self._unconfirmed_commands.add(command_type)
+        return ok
+
+    def _watch_write(self, command_type: int, queued: Optional[Any]) -> None:
+        """
+        Called by send_command() with the wrapper's send_message() result.
+        A Future means the write was only queued (coalescing BusWorker): the
+        command stays unconfirmed until it reaches the bus, and becomes
+        unconfirmed again if it fails there.
+        """
+        if queued is None:
+            self._queued_writes.pop(command_type, None)
+            return
+        self._queued_writes[command_type] = queued
+
+        def done(future: Any) -> None:
+            if self._queued_writes.get(command_type) is not future:
+                return  # a newer write decides
+            if _write_succeeded(future):
+                self._unconfirmed_commands.discard(command_type)
+            else:
+                self._unconfirmed_commands.add(command_type)
+
+        queued.add_done_callback(done)
+
+    # --- status fan-out ---------------------------------------------------
+
+    def status_values(self) -> Dict[str, Any]:
+        """The mirrored status fields as {name: value}."""
+        return {name: getattr(self, name) for name in self.STATUS_FIELDS}
+
+    def enable_history(self, capacity: int = 3600) -> TelemetryHistory:
+        """
+        Record every decoded status (monotonic timestamp + STATUS_FIELDS) in a
+        fixed-size ring buffer, available as self.history.
+        """
+        self.history = TelemetryHistory(self.STATUS_FIELDS, capacity)
+        return self.history
+
+    def disable_history(self) -> None:
+        self.history = None
+
+    def add_status_listener(self, callback: StatusListener) -> None:
+        """
+        Call callback(slice, timestamp, values) after every decoded status.
+        timestamp is time.monotonic(); values is status_values().
+        Callbacks run on the polling thread and must be quick.
+        """
+        if callback not in self._status_listeners:
+            self._status_listeners.append(callback)
+
+    def remove_status_listener(self, callback: StatusListener) -> None:
+        if callback in self._status_listeners:
+            self._status_listeners.remove(callback)
+
+    def add_command_listener(self, callback: CommandListener) -> None:
+        """Call callback(slice, command_type, ok) after every send_command()."""
+        if callback not in self._command_listeners:
+            self._command_listeners.append(callback)
+
+    def remove_command_listener(self, callback: CommandListener) -> None:
+        if callback in self._command_listeners:
+            self._command_listeners.remove(callback)
+
+    def subscribe(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        callback: Optional[ChangeCallback] = None,
+        queue: Optional[Any] = None,
+        absolute: Deadband = 0.0,
+        relative: Deadband = 0.0,
+    ) -> ChangeSubscription:
+        """
+        Get notified only when fields change meaningfully (see
+        ChangeSubscription), instead of re-reading them after every poll.
+        :param fields: Status fields to watch (default: all STATUS_FIELDS).
+        :param callback: Called as callback(slice, timestamp, {field: value}).
+        :param queue: Receives (slice, timestamp, {field: value}) tuples.
+        :param absolute: Absolute deadband of float fields (or per field).
+        :param relative: Relative deadband of float fields (or per field).
+        """
+        fields = self.STATUS_FIELDS if fields is None else tuple(fields)
+        unknown = [name for name in fields if name not in self.STATUS_FIELDS]
+        if unknown:
+            raise ValueError(
+                "%s has no status fields %s" % (type(self).__name__, unknown)
+            )
+        subscription = ChangeSubscription(fields, callback, queue, absolute, relative)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ChangeSubscription) -> None:
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+
+    def _notify_command(self, command_type: int, ok: bool) -> None:
+        for callback in list(self._command_listeners):
+            try:
+                callback(self, command_type, ok)
+            except Exception as e:
+                logger.exception(
+                    "command listener failed for 0x%02X: %s", self.target_address, e
+                )
+
+    def _publish_status(self) -> None:
+        """Feed the just-decoded status to the history and listeners."""
+        self._parsed = True
+        history = self.history
+        listeners = self._status_listeners
+        subscriptions = self._subscriptions
+        if history is None and not listeners and not subscriptions:
+            return
+        timestamp = time.monotonic()
+        if history is not None:
+            history.append_from(timestamp, self)
+        if listeners:
+            values = self.status_values()
+            for callback in list(listeners):
+                try:
+                    callback(self, timestamp, values)
+                except Exception as e:
+                    logger.exception(
+                        "status listener failed for 0x%02X: %s", self.target_address, e
+                    )
+        for subscription in list(subscriptions):
+            try:
+                subscription.notify(self, timestamp)
+            except Exception as e:
+                logger.exception(
+                    "change subscription failed for 0x%02X: %s", self.target_address, e
+                )
@@ -0,0 +1,419 @@
+# src/loafware/slice_poller.py
+from typing import Any, Callable, Dict, List, Mapping, Optional
+from .bus_health import HealthTracker
+from .slice_base import Slice
+import heapq
+import logging
+import threading
+import time
+
+logger = logging.getLogger("loafware.slice_poller")
+
+
+class PollStats:
+    """
+    Scheduling statistics for one polled slice.
+    Jitter is the delay between a poll's release time and the moment it was
+    actually issued; a deadline is missed when a poll completes after
+    release + period (or when a whole period is skipped).
+    """
+
+    def __init__(self, period: float) -> None:
+        self.period = period
+        self.polls = 0
+        self.failures = 0
+        self.missed_deadlines = 0
+        self.first_poll: Optional[float] = None
+        self.last_poll: Optional[float] = None
+        self.jitter_total = 0.0
+        self.max_jitter = 0.0
+
+    def record(self, jitter: float, started: float, ok: bool) -> None:
+        self.polls += 1
+        if not ok:
+            self.failures += 1
+        if self.first_poll is None:
+            self.first_poll = started
+        self.last_poll = started
+        self.jitter_total += jitter
+        if jitter > self.max_jitter:
+            self.max_jitter = jitter
+
+    @property
+    def achieved_rate(self) -> float:
+        """Polls per second between the first and the most recent poll."""
+        if self.polls < 2 or self.first_poll is None or self.last_poll is None:
+            return 0.0
+        elapsed = self.last_poll - self.first_poll
+        return (self.polls - 1) / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def mean_jitter(self) -> float:
+        return self.jitter_total / self.polls if self.polls else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "period": self.period,
+            "target_rate": 1.0 / self.period,
+            "achieved_rate": self.achieved_rate,
+            "polls": self.polls,
+            "failures": self.failures,
+            "missed_deadlines": self.missed_deadlines,
+            "mean_jitter": self.mean_jitter,
+            "max_jitter": self.max_jitter,
+        }
+
+
+class AdaptivePolicy:
+    """
+    Adapts a slice's poll period to how fast its fields change.
+    After every poll the rate of change of each watched field is estimated
+    from the previous sample; the ideal period is the time the fastest field
+    needs to move by its deadband. The period shrinks to that immediately but
+    grows by at most `growth` per poll, always within [min_period, max_period].
+    Any command sent to the slice snaps it back to min_period.
+    """
+
+    def __init__(
+        self,
+        min_period: float,
+        max_period: float,
+        deadbands: Mapping[str, float],
+        growth: float = 1.5,
+    ) -> None:
+        """
+        :param min_period: Fastest allowed poll period (s).
+        :param max_period: Slowest allowed poll period (s).
+        :param deadbands: Field name -> change considered significant; 0 makes
+            any change of that field (e.g. mode, brake flags) force min_period.
+        :param growth: Largest factor the period may grow by per poll (> 1).
+        """
+        if not 0 < min_period <= max_period:
+            raise ValueError("need 0 < min_period <= max_period")
+        if growth <= 1.0:
+            raise ValueError("growth must be > 1")
+        self.min_period = float(min_period)
+        self.max_period = float(max_period)
+        self.deadbands = dict(deadbands)
+        self.growth = float(growth)
+
+    def next_period(
+        self,
+        period: float,
+        elapsed: float,
+        previous: Mapping[str, Any],
+        current: Mapping[str, Any],
+    ) -> float:
+        """Period to use after a poll that was `elapsed` s after the previous one."""
+        ideal = self.max_period
+        for name, deadband in self.deadbands.items():
+            if name not in previous or name not in current:
+                continue
+            delta = abs(float(current[name]) - float(previous[name]))
+            if delta == 0.0:
+                continue
+            if deadband <= 0.0 or elapsed <= 0.0:
+                return self.min_period
+            ideal = min(ideal, deadband * elapsed / delta)
+        return max(self.min_period, min(ideal, period * self.growth, self.max_period))
+
+
+class _PollEntry:
+    __slots__ = (
+        "slice",
+        "period",
+        "release",
+        "stats",
+        "active",
+        "policy",
+        "last_values",
+        "last_sample",
+    )
+
+    def __init__(
+        self,
+        slice_obj: Slice,
+        period: float,
+        release: float,
+        policy: Optional[AdaptivePolicy] = None,
+    ) -> None:
+        self.slice = slice_obj
+        self.period = period
+        self.release = release
+        self.stats = PollStats(period)
+        self.active = True
+        self.policy = policy
+        self.last_values: Optional[Dict[str, Any]] = None
+        self.last_sample = 0.0
+
+    @property
+    def deadline(self) -> float:
+        return self.release + self.period
+
+
+class SlicePoller:
+    """
+    Earliest-deadline-first status poller for the slices sharing one CRUMBS bus.
+    Each slice is polled with its own target period (implicit deadline = next
+    release). Among the slices whose release time has passed, the one with the
+    earliest deadline is polled first, so fast slices (e.g. DCMT at 10 ms) are
+    not starved behind slow ones (e.g. RLHT at 1 s).
+
+    With a HealthTracker (taken from a HealthGuard wrapper by default), slices
+    in backoff or with an open circuit breaker are deferred until their next
+    allowed attempt, so dead devices do not cost sweep time.
+    """
+
+    def __init__(
+        self,
+        crumbs_wrapper: Any,
+        clock: Callable[[], float] = time.monotonic,
+        health: Optional[HealthTracker] = None,
+    ) -> None:
+        """
+        :param crumbs_wrapper: The wrapper of the bus all polled slices live on.
+        :param clock: Monotonic time source (seconds).
+        :param health: Address health to honour; defaults to crumbs_wrapper.health.
+        """
+        self.crumbs = crumbs_wrapper
+        if health is None:
+            health = getattr(crumbs_wrapper, "health", None)
+        self.health = health
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._entries: Dict[int, _PollEntry] = {}
+        self._pending: List[Any] = []  # heap of (release, seq, entry)
+        self._ready: List[Any] = []  # heap of (deadline, seq, entry)
+        self._seq = 0
+
+    # --- registration -----------------------------------------------------
+
+    def add_slice(
+        self,
+        slice_obj: Slice,
+        period: float,
+        adaptive: Optional[AdaptivePolicy] = None,
+    ) -> bool:
+        """
+        Schedule a slice for periodic status polling.
+        :param slice_obj: The slice to poll; it must use this poller's wrapper.
+        :param period: Target (initial, if adaptive) poll period in seconds.
+        :param adaptive: Optional policy that adapts the period to field activity.
+        :return: True if the slice was scheduled.
+        """
+        if period <= 0:
+            logger.error("add_slice: period must be positive, got %s", period)
+            return False
+        if slice_obj.crumbs is not self.crumbs:
+            logger.error(
+                "add_slice: slice 0x%02X is not on this poller's bus",
+                slice_obj.target_address,
+            )
+            return False
+        with self._lock:
+            old = self._entries.get(slice_obj.target_address)
+            if old is not None:
+                old.active = False
+            entry = _PollEntry(slice_obj, float(period), self._clock(), adaptive)
+            self._entries[slice_obj.target_address] = entry
+            self._push_pending(entry)
+        if adaptive is not None:
+            slice_obj.add_command_listener(self._on_command)
+        self._wakeup.set()
+        logger.debug(
+            "add_slice: polling 0x%02X every %.4fs", slice_obj.target_address, period
+        )
+        return True
+
+    def remove_slice(self, target_address: int) -> bool:
+        """Stop polling the slice at target_address. Returns False if unknown."""
+        with self._lock:
+            entry = self._entries.pop(target_address, None)
+        if entry is None:
+            return False
+        # lazily dropped from the heaps
+        entry.active = False
+        entry.slice.remove_command_listener(self._on_command)
+        return True
+
+    def _on_command(self, slice_obj: Slice, command_type: int, ok: bool) -> None:
+        """A command was sent to an adaptive slice: poll it fast, starting now."""
+        with self._lock:
+            entry = self._entries.get(slice_obj.target_address)
+            if entry is None or entry.policy is None or entry.slice is not slice_obj:
+                return
+            entry.period = entry.stats.period = entry.policy.min_period
+            now = self._clock()
+            if entry.release > now:
+                # re-queue at the new release; the stale heap item is skipped
+                entry.active = False
+                entry = self._replace_entry(entry, now)
+        self._wakeup.set()
+
+    def _replace_entry(self, entry: _PollEntry, release: float) -> _PollEntry:
+        fresh = _PollEntry(entry.slice, entry.period, release, entry.policy)
+        fresh.stats = entry.stats
+        fresh.last_values = entry.last_values
+        fresh.last_sample = entry.last_sample
+        self._entries[entry.slice.target_address] = fresh
+        self._push_pending(fresh)
+        return fresh
+
+    def set_period(self, target_address: int, period: float) -> bool:
+        """Change the target period of an already scheduled slice."""
+        if period <= 0:
+            logger.error("set_period: period must be positive, got %s", period)
+            return False
+        with self._lock:
+            entry = self._entries.get(target_address)
+            if entry is None:
+                return False
+            entry.period = float(period)
+            entry.stats.period = float(period)
+        self._wakeup.set()
+        return True
+
+    # --- scheduling -------------------------------------------------------
+
+    def _push_pending(self, entry: _PollEntry) -> None:
+        self._seq += 1
+        heapq.heappush(self._pending, (entry.release, self._seq, entry))
+
+    def _next_ready(self, now: float) -> Optional[_PollEntry]:
+        """Release every due entry, then pop the one with the earliest deadline."""
+        while self._pending and self._pending[0][0] <= now:
+            _, seq, entry = heapq.heappop(self._pending)
+            if entry.active:
+                heapq.heappush(self._ready, (entry.deadline, seq, entry))
+        while self._ready:
+            _, _, entry = heapq.heappop(self._ready)
+            if not entry.active:
+                continue
+            if self.health is not None:
+                retry = self.health.next_attempt(entry.slice.target_address)
+                if retry > now:
+                    # backing off / breaker open: out of rotation until then
+                    entry.release = retry
+                    self._push_pending(entry)
+                    continue
+            return entry
+        return None
+
+    def time_until_next(self) -> Optional[float]:
+        """Seconds until the next poll is due (0 if one is ready), None if idle."""
+        with self._lock:
+            if any(e.active for _, _, e in self._ready):
+                return 0.0
+            while self._pending and not self._pending[0][2].active:
+                heapq.heappop(self._pending)
+            if not self._pending:
+                return None
+            return max(0.0, self._pending[0][0] - self._clock())
+
+    def run_once(self) -> Optional[Slice]:
+        """
+        Poll the most urgent due slice, if any, without sleeping.
+        Returns the slice that was polled or None if nothing was due.
+        """
+        with self._lock:
+            entry = self._next_ready(self._clock())
+        if entry is None:
+            return None
+
+        started = self._clock()
+        try:
+            ok = entry.slice.request_status() is not None
+        except Exception as e:
+            logger.exception(
+                "run_once: poll of 0x%02X raised: %s", entry.slice.target_address, e
+            )
+            ok = False
+        finished = self._clock()
+
+        with self._lock:
+            stats = entry.stats
+            stats.record(max(0.0, started - entry.release), started, ok)
+            # this poll is judged and rescheduled with the period it ran under
+            if finished > entry.deadline:
+                stats.missed_deadlines += 1
+            # next release; skip (and count) whole periods that already elapsed
+            release = entry.release + entry.period
+            if release + entry.period <= finished:
+                skipped = int((finished - release) // entry.period)
+                stats.missed_deadlines += skipped
+                release += skipped * entry.period
+            if not ok and self.health is not None:
+                retry = self.health.next_attempt(entry.slice.target_address)
+                release = max(release, retry)
+            entry.release = release
+            if ok and entry.policy is not None:
+                self._adapt(entry, started)  # applies from the next release on
+            if entry.active:
+                self._push_pending(entry)
+        return entry.slice
+
+    def _adapt(self, entry: _PollEntry, sampled: float) -> None:
+        values = entry.slice.status_values()
+        if entry.last_values is not None:
+            entry.period = entry.stats.period = entry.policy.next_period(
+                entry.period, sampled - entry.last_sample, entry.last_values, values
+            )
+        entry.last_values = values
+        entry.last_sample = sampled
+
+    def run(self, duration: Optional[float] = None) -> None:
+        """
+        Run the schedule in the calling thread until stop() is called or
+        duration seconds have elapsed.
+        """
+        self._stop.clear()
+        self._run_loop(duration)
+
+    def _run_loop(self, duration: Optional[float] = None) -> None:
+        end = None if duration is None else self._clock() + duration
+        while not self._stop.is_set():
+            if end is not None and self._clock() >= end:
+                break
+            if self.run_once() is not None:
+                continue
+            delay = self.time_until_next()
+            if end is not None:
+                remaining = max(0.0, end - self._clock())
+                delay = remaining if delay is None else min(delay, remaining)
+            self._wakeup.wait(delay)
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        """Run the schedule in a background daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run_loop, name="loafware-slice-poller", daemon=True
+        )
+        self._thread.start()
+        logger.info("SlicePoller: started with %d slices", len(self._entries))
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the background thread (if any) and wait for it to exit."""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        logger.info("SlicePoller: stopped")
+
+    # --- reporting --------------------------------------------------------
+
+    def stats(self) -> Dict[int, Dict[str, float]]:
+        """Per-address schedule statistics (achieved rate, misses, jitter)."""
+        with self._lock:
+            return {addr: e.stats.as_dict() for addr, e in self._entries.items()}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for entry in self._entries.values():
+                entry.stats = PollStats(entry.period)
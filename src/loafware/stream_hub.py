@@ -0,0 +1,206 @@
+# src/loafware/stream_hub.py
+from collections import deque
+from typing import Any, Collection, Deque, Dict, List, Optional, Tuple
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger("loafware.stream_hub")
+
+# (bus key, target address), as used by BusManager.slices()
+SliceKey = Tuple[Any, int]
+
+
+class StreamEvent:
+    """One decoded status sample, serialized lazily and at most once per filter."""
+
+    __slots__ = ("key", "type", "timestamp", "values", "_encoded")
+
+    def __init__(
+        self, key: SliceKey, type_name: str, timestamp: float, values: Dict[str, Any]
+    ) -> None:
+        self.key = key
+        self.type = type_name
+        self.timestamp = timestamp
+        self.values = values
+        self._encoded: Dict[Optional[Tuple[str, ...]], bytes] = {}
+
+    def as_dict(self, fields: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+        values = self.values
+        if fields is not None:
+            values = {k: v for k, v in values.items() if k in fields}
+        return {
+            "bus": self.key[0],
+            "address": self.key[1],
+            "type": self.type,
+            "timestamp": self.timestamp,
+            "values": values,
+        }
+
+    def sse(self, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+        """The event as a Server-Sent Events frame, shared by equal filters."""
+        frame = self._encoded.get(fields)
+        if frame is None:
+            data = json.dumps(self.as_dict(fields), default=str)
+            frame = ("event: status\ndata: %s\n\n" % data).encode("utf-8")
+            self._encoded[fields] = frame
+        return frame
+
+
+class Subscription:
+    """
+    A subscriber's view of the hub: slice / field filters, an optional rate
+    limit per slice and a bounded queue. If the queue overflows the consumer
+    is too slow and the subscription is closed (dropped) rather than ever
+    blocking the producer.
+    """
+
+    def __init__(
+        self,
+        hub: "StreamHub",
+        slices: Optional[Collection[SliceKey]] = None,
+        fields: Optional[Collection[str]] = None,
+        max_rate: Optional[float] = None,
+        max_queue: int = 256,
+    ) -> None:
+        self._hub = hub
+        self.slices = None if slices is None else frozenset(slices)
+        self.fields = None if fields is None else tuple(sorted(fields))
+        self.min_interval = 1.0 / max_rate if max_rate else 0.0
+        self.max_queue = max_queue
+        self.closed = False
+        self.dropped = False
+        self.delivered = 0
+        self.decimated = 0
+        self._queue: Deque[StreamEvent] = deque()
+        self._cond = threading.Condition()
+        self._due: Dict[SliceKey, float] = {}
+
+    def _offer(self, event: StreamEvent) -> bool:
+        """Producer side; returns False once the subscriber is gone."""
+        if self.slices is not None and event.key not in self.slices:
+            return True
+        if self.min_interval:
+            # keep a fixed delivery grid so poll jitter does not lower the rate
+            due = self._due.get(event.key)
+            if due is not None and event.timestamp < due:
+                self.decimated += 1
+                return True
+            due = (event.timestamp if due is None else due) + self.min_interval
+            if due <= event.timestamp:
+                due = event.timestamp + self.min_interval
+            self._due[event.key] = due
+        with self._cond:
+            if self.closed:
+                return False
+            if len(self._queue) >= self.max_queue:
+                self.closed = self.dropped = True
+                self._queue.clear()
+                self._cond.notify_all()
+                return False
+            self._queue.append(event)
+            self._cond.notify()
+        return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[StreamEvent]:
+        """Next event, or None on timeout / when the subscription is closed."""
+        with self._cond:
+            if not self._queue and not self.closed:
+                self._cond.wait(timeout)
+            if not self._queue:
+                return None
+            self.delivered += 1
+            return self._queue.popleft()
+
+    def close(self) -> None:
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        self._hub.unsubscribe(self)
+
+
+class StreamHub:
+    """
+    Push fan-out of decoded slice status to many subscribers.
+    The status listener only filters and appends a shared StreamEvent to each
+    subscriber's queue, so the poll loop's cost does not depend on how slow
+    the consumers are; serialization happens on the consumer side, once per
+    sample and field filter, however many subscribers share it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._keys: Dict[int, Tuple[SliceKey, str]] = {}  # id(slice) -> key, type
+        self._subscribers: List[Subscription] = []
+        self.events = 0
+        self.subscribers_dropped = 0
+
+    def add(self, key: SliceKey, slice_obj: Any) -> None:
+        """Stream the status of slice_obj under key."""
+        with self._lock:
+            self._keys[id(slice_obj)] = (key, type(slice_obj).__name__)
+        slice_obj.add_status_listener(self._on_status)
+
+    def remove(self, key: SliceKey, slice_obj: Any) -> None:
+        slice_obj.remove_status_listener(self._on_status)
+        with self._lock:
+            self._keys.pop(id(slice_obj), None)
+
+    def subscribe(
+        self,
+        slices: Optional[Collection[SliceKey]] = None,
+        fields: Optional[Collection[str]] = None,
+        max_rate: Optional[float] = None,
+        max_queue: int = 256,
+    ) -> Subscription:
+        """
+        :param slices: Only these (bus, address) keys (default: all).
+        :param fields: Only these status fields (default: all).
+        :param max_rate: Deliver at most this many samples/s per slice.
+        :param max_queue: Undelivered events before the subscriber is dropped.
+        """
+        subscription = Subscription(self, slices, fields, max_rate, max_queue)
+        with self._lock:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def _on_status(
+        self, slice_obj: Any, timestamp: float, values: Dict[str, Any]
+    ) -> None:
+        with self._lock:
+            known = self._keys.get(id(slice_obj))
+            subscribers = list(self._subscribers)
+        if known is None or not subscribers:
+            return
+        event = StreamEvent(known[0], known[1], timestamp, values)
+        self.events += 1
+        gone = [s for s in subscribers if not s._offer(event)]
+        for subscription in gone:
+            if subscription.dropped:
+                self.subscribers_dropped += 1
+                logger.warning("StreamHub: dropped a subscriber that fell behind")
+            self.unsubscribe(subscription)
+
+    def close(self) -> None:
+        """Close every subscription (their consumers see end of stream)."""
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for subscription in subscribers:
+            with subscription._cond:
+                subscription.closed = True
+                subscription._cond.notify_all()
+
+
+def sse_keepalive() -> bytes:
+    """An SSE comment line that keeps idle connections (and proxies) open."""
+    return (": keepalive %d\n\n" % int(time.time())).encode("ascii")
@@ -0,0 +1,308 @@
+# src/loafware/telemetry_aggregation.py
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+import math
+import threading
+
+logger = logging.getLogger("loafware.telemetry_aggregation")
+
+# callback(slice, monotonic timestamp, {field: value}), as for status listeners
+SampleListener = Callable[[Any, float, Dict[str, Any]], None]
+
+
+class _Stage:
+    """
+    A processing stage between slices and sinks. Its input, on_status(), is
+    a status listener; its output goes to listeners with the same signature,
+    so stages chain and any sink with a status-listener callback (e.g.
+    InfluxExporter.on_status) plugs in behind them.
+    """
+
+    def __init__(self, fields: Optional[Sequence[str]]) -> None:
+        self.fields: Optional[Tuple[str, ...]] = (
+            tuple(fields) if fields is not None else None
+        )
+        self._listeners: List[SampleListener] = []
+        self._attached: List[Any] = []
+        self._lock = threading.Lock()
+        self.samples_in = 0
+        self.samples_out = 0
+
+    def add_listener(self, callback: SampleListener) -> None:
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: SampleListener) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def attach(self, slice_obj: Any) -> None:
+        """Feed every decoded status of slice_obj into this stage."""
+        slice_obj.add_status_listener(self.on_status)
+        self._attached.append(slice_obj)
+
+    def detach(self, slice_obj: Any) -> None:
+        slice_obj.remove_status_listener(self.on_status)
+        if slice_obj in self._attached:
+            self._attached.remove(slice_obj)
+
+    def on_status(
+        self, slice_obj: Any, timestamp: float, values: Dict[str, Any]
+    ) -> None:
+        raise NotImplementedError
+
+    def _emit(self, slice_obj: Any, timestamp: float, values: Dict[str, Any]) -> None:
+        self.samples_out += 1
+        for callback in list(self._listeners):
+            try:
+                callback(slice_obj, timestamp, values)
+            except Exception as e:
+                logger.exception(
+                    "%s listener failed for 0x%02X: %s",
+                    type(self).__name__,
+                    slice_obj.target_address,
+                    e,
+                )
+
+    def stats(self) -> Dict[str, float]:
+        samples_in, samples_out = self.samples_in, self.samples_out
+        return {
+            "samples_in": samples_in,
+            "samples_out": samples_out,
+            "reduction": samples_in / samples_out if samples_out else 0.0,
+        }
+
+
+class _Window:
+    """Running statistics of one slice over the current window."""
+
+    __slots__ = (
+        "slice",
+        "names",
+        "numeric",
+        "index",
+        "count",
+        "mins",
+        "maxs",
+        "sums",
+        "lasts",
+    )
+
+    def __init__(self, slice_obj: Any, names: Sequence[str], values: Any) -> None:
+        self.slice = slice_obj
+        self.names = tuple(names)
+        self.numeric = [type(values[name]) is float for name in self.names]
+        self.index = 0
+        self.count = 0
+        self.mins: List[float] = []
+        self.maxs: List[float] = []
+        self.sums: List[float] = []
+        self.lasts: List[Any] = []
+
+    def start(self, index: int, values: Dict[str, Any]) -> None:
+        self.index = index
+        self.count = 1
+        lasts = [values[name] for name in self.names]
+        self.lasts = lasts
+        self.mins = list(lasts)
+        self.maxs = list(lasts)
+        self.sums = [v if n else 0.0 for v, n in zip(lasts, self.numeric)]
+
+    def add(self, values: Dict[str, Any]) -> None:
+        self.count += 1
+        mins, maxs, sums, lasts = self.mins, self.maxs, self.sums, self.lasts
+        for i, name in enumerate(self.names):
+            value = values[name]
+            lasts[i] = value
+            if self.numeric[i]:
+                sums[i] += value
+                if value < mins[i]:
+                    mins[i] = value
+                elif value > maxs[i]:
+                    maxs[i] = value
+
+    def result(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for i, name in enumerate(self.names):
+            if self.numeric[i]:
+                out[name + "_min"] = self.mins[i]
+                out[name + "_max"] = self.maxs[i]
+                out[name + "_mean"] = self.sums[i] / self.count
+            out[name + "_last"] = self.lasts[i]
+        out["count"] = self.count
+        return out
+
+
+class WindowAggregator(_Stage):
+    """
+    Reduces each slice's status stream to one sample per fixed window
+    (aligned to multiples of `window` on the monotonic clock): min, max,
+    mean and last of every float field, last of discrete fields (mode,
+    error_flags, brakes), and the sample count. Min/max keep excursions that
+    plain decimation would lose. Memory is a few numbers per field per slice.
+
+    A window is emitted, stamped with its end time, when the first sample of
+    a later window arrives; flush() emits the windows still open.
+    """
+
+    def __init__(
+        self, window: float = 1.0, fields: Optional[Sequence[str]] = None
+    ) -> None:
+        """
+        :param window: Window length (s).
+        :param fields: Fields to aggregate (default: every status field).
+        """
+        if window <= 0:
+            raise ValueError("window must be positive")
+        super().__init__(fields)
+        self.window = float(window)
+        self._series: Dict[int, _Window] = {}
+
+    def on_status(
+        self, slice_obj: Any, timestamp: float, values: Dict[str, Any]
+    ) -> None:
+        index = math.floor(timestamp / self.window)
+        done = None
+        with self._lock:
+            self.samples_in += 1
+            series = self._series.get(id(slice_obj))
+            if series is None:
+                names = self.fields if self.fields is not None else tuple(values)
+                series = self._series[id(slice_obj)] = _Window(slice_obj, names, values)
+                series.start(index, values)
+            elif index != series.index:
+                done = (series.index, series.result())
+                series.start(index, values)
+            else:
+                series.add(values)
+        if done is not None:
+            self._emit(slice_obj, (done[0] + 1) * self.window, done[1])
+
+    def flush(self) -> int:
+        """Emit every open window (e.g. before shutdown); returns the count."""
+        with self._lock:
+            series, self._series = list(self._series.values()), {}
+        for s in series:
+            self._emit(s.slice, (s.index + 1) * self.window, s.result())
+        return len(series)
+
+
+class _Bucket:
+    """LTTB state of one (slice, field) series."""
+
+    __slots__ = ("anchor", "pending", "current", "index")
+
+    def __init__(self) -> None:
+        self.anchor: Optional[Tuple[float, float]] = None  # last selected point
+        self.pending: List[Tuple[float, float]] = []  # bucket to select from
+        self.current: List[Tuple[float, float]] = []  # bucket being filled
+        self.index = 0
+
+
+def _select(
+    anchor: Tuple[float, float],
+    points: Sequence[Tuple[float, float]],
+    target: Tuple[float, float],
+) -> Tuple[float, float]:
+    """The point of `points` forming the largest triangle with anchor and target."""
+    ax, ay = anchor
+    cx, cy = target
+    best, best_area = points[0], -1.0
+    for point in points:
+        px, py = point
+        area = abs((ax - cx) * (py - ay) - (ax - px) * (cy - ay))
+        if area > best_area:
+            best, best_area = point, area
+    return best
+
+
+def _average(points: Sequence[Tuple[float, float]]) -> Tuple[float, float]:
+    n = len(points)
+    return (sum(p[0] for p in points) / n, sum(p[1] for p in points) / n)
+
+
+class LTTBDownsampler(_Stage):
+    """
+    Streaming Largest-Triangle-Three-Buckets downsampling for charts: per
+    slice and float field, one sample per `bucket` seconds is kept, chosen
+    as the one forming the largest triangle with the previously kept sample
+    and the average of the following bucket, so peaks and steps survive.
+
+    Selection for a bucket happens once the next bucket is complete, so
+    memory per series is two buckets of samples (bounded by the poll rate)
+    and output lags input by up to two buckets. Each kept sample is emitted
+    on its own, as {field: value} at the sample's timestamp; the first
+    sample of a series is always kept. flush() emits the open buckets.
+    """
+
+    def __init__(
+        self, bucket: float = 0.1, fields: Optional[Sequence[str]] = None
+    ) -> None:
+        """
+        :param bucket: Bucket length (s); output rate is 1 / bucket per field.
+        :param fields: Float fields to downsample (default: all float fields).
+        """
+        if bucket <= 0:
+            raise ValueError("bucket must be positive")
+        super().__init__(fields)
+        self.bucket = float(bucket)
+        self._series: Dict[Tuple[int, str], _Bucket] = {}
+        self._slices: Dict[int, Any] = {}
+
+    def on_status(
+        self, slice_obj: Any, timestamp: float, values: Dict[str, Any]
+    ) -> None:
+        index = math.floor(timestamp / self.bucket)
+        names = self.fields if self.fields is not None else values
+        out: List[Tuple[str, float, float]] = []
+        with self._lock:
+            self.samples_in += 1
+            key = id(slice_obj)
+            self._slices[key] = slice_obj
+            for name in names:
+                value = values[name]
+                if type(value) is not float:
+                    continue
+                series = self._series.get((key, name))
+                if series is None:
+                    series = self._series[(key, name)] = _Bucket()
+                    series.anchor = (timestamp, value)
+                    series.index = index
+                    out.append((name, timestamp, value))
+                    continue
+                if index != series.index:
+                    self._advance(series, name, out)
+                    series.index = index
+                series.current.append((timestamp, value))
+        for name, t, value in out:
+            self._emit(slice_obj, t, {name: value})
+
+    @staticmethod
+    def _advance(series: _Bucket, name: str, out: List[Any]) -> None:
+        # the current bucket is complete: select from the one before it
+        if series.pending and series.current:
+            anchor = series.anchor if series.anchor is not None else series.pending[0]
+            point = _select(anchor, series.pending, _average(series.current))
+            series.anchor = point
+            out.append((name, point[0], point[1]))
+        if series.current:
+            series.pending, series.current = series.current, []
+
+    def flush(self) -> int:
+        """Emit the open buckets of every series; returns the samples emitted."""
+        emitted: List[Tuple[Any, str, float, float]] = []
+        with self._lock:
+            for (key, name), series in self._series.items():
+                out: List[Tuple[str, float, float]] = []
+                self._advance(series, name, out)
+                if series.pending:
+                    # the last sample of a series is always kept
+                    last = series.pending[-1]
+                    if last != series.anchor:
+                        out.append((name, last[0], last[1]))
+                    series.anchor, series.pending = last, []
+                slice_obj = self._slices[key]
+                emitted.extend((slice_obj, n, t, v) for n, t, v in out)
+        for slice_obj, name, t, value in emitted:
+            self._emit(slice_obj, t, {name: value})
+        return len(emitted)
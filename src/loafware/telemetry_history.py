@@ -0,0 +1,120 @@
+# src/loafware/telemetry_history.py
+from typing import Any, Dict, Optional, Sequence, Tuple
+import logging
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; TelemetryHistory requires it
+    np = None
+
+logger = logging.getLogger("loafware.telemetry_history")
+
+
+class TelemetryHistory:
+    """
+    Fixed-memory ring buffer of status samples: a monotonic timestamp plus one
+    float64 column per field.
+
+    Every sample is written twice, at i and i + capacity, so the most recent
+    N samples are always one contiguous block and can be returned as a
+    zero-copy numpy view. Appends are O(1) and memory is bounded at
+    2 * capacity * (1 + len(fields)) * 8 bytes.
+
+    Views alias the live buffer and are overwritten as new samples arrive;
+    copy them (np.array(view)) if they must be kept.
+    """
+
+    def __init__(self, fields: Sequence[str], capacity: int = 3600) -> None:
+        """
+        :param fields: Names of the recorded fields, in column order.
+        :param capacity: Number of samples retained.
+        """
+        if np is None:
+            raise ImportError("TelemetryHistory requires numpy (pip install numpy)")
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self.capacity = int(capacity)
+        self._columns = {name: i + 1 for i, name in enumerate(self.fields)}
+        self._buffer = np.zeros((2 * self.capacity, 1 + len(self.fields)))
+        self._next = 0  # slot of the next write, 0..capacity-1
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, values: Sequence[float]) -> None:
+        """Record one sample; values are in `fields` order."""
+        with self._lock:
+            i = self._next
+            row = self._buffer[i]
+            row[0] = timestamp
+            row[1:] = values
+            self._buffer[i + self.capacity] = row
+            self._next = i + 1 if i + 1 < self.capacity else 0
+            if self._count < self.capacity:
+                self._count += 1
+
+    def append_from(self, timestamp: float, obj: Any) -> None:
+        """Record one sample read from the attributes of obj (e.g. a slice)."""
+        self.append(timestamp, [getattr(obj, name) for name in self.fields])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._next = 0
+            self._count = 0
+
+    def _window(self, n: Optional[int]) -> Any:
+        """View of the last n (default: all retained) samples, oldest first."""
+        count = self._count if n is None else max(0, min(int(n), self._count))
+        end = self._next + self.capacity if self._count == self.capacity else self._next
+        return self._buffer[end - count : end]
+
+    def last(self, n: Optional[int] = None) -> Any:
+        """
+        Zero-copy view of the last n samples as an (n, 1 + len(fields)) array;
+        column 0 is the timestamp.
+        """
+        with self._lock:
+            return self._window(n)
+
+    def timestamps(self, n: Optional[int] = None) -> Any:
+        """Zero-copy view of the last n timestamps."""
+        return self.last(n)[:, 0]
+
+    def column(self, name: str, n: Optional[int] = None) -> Any:
+        """Zero-copy view of the last n values of one field."""
+        return self.last(n)[:, self._columns[name]]
+
+    def latest(self) -> Optional[Dict[str, float]]:
+        """The most recent sample as {"timestamp": t, field: value, ...}."""
+        with self._lock:
+            if not self._count:
+                return None
+            row = self._window(1)[0]
+            sample = {"timestamp": float(row[0])}
+            for name, i in self._columns.items():
+                sample[name] = float(row[i])
+            return sample
+
+    def between(self, start: float, end: float) -> Any:
+        """
+        Zero-copy view of the samples with start <= timestamp < end.
+        Timestamps are monotonic, so this is a binary search.
+        """
+        with self._lock:
+            window = self._window(None)
+            ts = window[:, 0]
+            lo = int(np.searchsorted(ts, start, side="left"))
+            hi = int(np.searchsorted(ts, end, side="left"))
+            return window[lo:hi]
+
+    def as_dict(self, n: Optional[int] = None) -> Dict[str, Any]:
+        """{"timestamp": view, field: view, ...} for the last n samples."""
+        window = self.last(n)
+        out = {"timestamp": window[:, 0]}
+        for name, i in self._columns.items():
+            out[name] = window[:, i]
+        return out
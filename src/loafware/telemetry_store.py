@@ -0,0 +1,564 @@
+# src/loafware/telemetry_store.py
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import json
+import logging
+import math
+import os
+import shutil
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; TelemetryStore requires it
+    np = None
+
+logger = logging.getLogger("loafware.telemetry_store")
+
+TIMESTAMP = "timestamp"  # wall-clock seconds, first column of every series
+SCHEMA_FILE = "schema.json"
+INDEX_FILE = "timestamp.idx"
+_KINDS = {"float": float, "int": int, "bool": bool}
+
+
+def series_name(slice_obj: Any) -> str:
+    """Store name of a slice's series, e.g. "RelayHeaterSlice_0x0A"."""
+    return "%s_0x%02X" % (type(slice_obj).__name__, slice_obj.target_address)
+
+
+def _kind(value: Any) -> str:
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    return "float"
+
+
+class _Segment:
+    """One directory of equally long float64 column files plus a sparse index."""
+
+    def __init__(self, path: str, columns: Sequence[str], index_every: int) -> None:
+        self.path = path
+        self.columns = tuple(columns)
+        self.index_every = index_every
+        sizes = [self._size(name) for name in self.columns]
+        # a crash mid-append can leave columns of different lengths
+        self.rows = min(sizes) // 8 if sizes else 0
+        self._repair(sizes)
+
+    def _repair(self, sizes: Sequence[int]) -> None:
+        """
+        Cut every column back to self.rows and the index to its expected
+        length (rebuilding missing entries), so later appends line up again.
+        """
+        for name, size in zip(self.columns, sizes):
+            if size > self.rows * 8:
+                logger.warning(
+                    "%s: dropping %d bytes of a partial append",
+                    self._file(name),
+                    size - self.rows * 8,
+                )
+                os.truncate(self._file(name), self.rows * 8)
+        path = os.path.join(self.path, INDEX_FILE)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        expected = -(-self.rows // self.index_every)
+        count = min(size // 8, expected)
+        if size > count * 8:
+            os.truncate(path, count * 8)
+        if count < expected:
+            marks = self.column(TIMESTAMP)[count * self.index_every :: self.index_every]
+            with open(path, "ab") as f:
+                f.write(np.ascontiguousarray(marks).tobytes())
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name + ".f8")
+
+    def _size(self, name: str) -> int:
+        try:
+            return os.path.getsize(self._file(name))
+        except OSError:
+            return 0
+
+    def bytes(self) -> int:
+        total = 0
+        for entry in os.scandir(self.path):
+            total += entry.stat().st_size
+        return total
+
+    def append(self, chunk: Any) -> None:
+        """Append rows (a 2-D array in column order); one write per column."""
+        for j, name in enumerate(self.columns[1:], 1):
+            with open(self._file(name), "ab") as f:
+                f.write(np.ascontiguousarray(chunk[:, j]).tobytes())
+        # timestamps last: readers never see a timestamp without its values
+        with open(self._file(TIMESTAMP), "ab") as f:
+            f.write(np.ascontiguousarray(chunk[:, 0]).tobytes())
+        k = self.index_every
+        first = -(-self.rows // k) * k  # first indexed row in this chunk
+        marks = chunk[first - self.rows :: k, 0]
+        if len(marks):
+            with open(os.path.join(self.path, INDEX_FILE), "ab") as f:
+                f.write(np.ascontiguousarray(marks).tobytes())
+        self.rows += len(chunk)
+
+    def column(self, name: str) -> Any:
+        """Memory-mapped column (rows as of now)."""
+        if self.rows == 0:
+            return np.zeros(0)
+        return np.memmap(self._file(name), dtype="<f8", mode="r", shape=(self.rows,))
+
+    def _index(self, timestamps: Any) -> Any:
+        expected = -(-self.rows // self.index_every)
+        path = os.path.join(self.path, INDEX_FILE)
+        try:
+            count = os.path.getsize(path) // 8
+        except OSError:
+            count = 0
+        if count >= expected and expected:
+            return np.memmap(path, dtype="<f8", mode="r", shape=(expected,))
+        return timestamps[:: self.index_every]  # incomplete index: derive it
+
+    def row_range(
+        self, start: Optional[float], end: Optional[float]
+    ) -> Tuple[int, int]:
+        """Rows with start <= timestamp < end, located through the sparse index."""
+        if self.rows == 0:
+            return 0, 0
+        timestamps = self.column(TIMESTAMP)
+        index = self._index(timestamps)
+        k = self.index_every
+
+        def locate(t: Optional[float], default: int) -> int:
+            if t is None:
+                return default
+            block = int(np.searchsorted(index, t, "left"))
+            lo = max(block - 1, 0) * k
+            hi = min(block * k, self.rows)
+            return lo + int(np.searchsorted(timestamps[lo:hi], t, "left"))
+
+        return locate(start, 0), locate(end, self.rows)
+
+    def time_span(self) -> Tuple[float, float]:
+        if self.rows == 0:
+            return math.inf, -math.inf
+        timestamps = self.column(TIMESTAMP)
+        return float(timestamps[0]), float(timestamps[-1])
+
+
+class _Series:
+    def __init__(
+        self,
+        path: str,
+        fields: Sequence[str],
+        kinds: Sequence[str],
+        tags: Dict[str, str],
+    ) -> None:
+        self.path = path
+        self.fields = tuple(fields)
+        self.kinds = tuple(kinds)
+        self.tags = tags
+        self.columns = (TIMESTAMP,) + self.fields
+        self.segments: List[_Segment] = []
+        self.buffer: List[List[float]] = []
+
+
+class TelemetryStore:
+    """
+    Local append-only store of slice telemetry, for when there is no network
+    or database (and as a source to backfill one later).
+
+    Every slice is a series: a directory of segments, each holding one
+    float64 file per column (wall-clock timestamp plus the status fields)
+    and a sparse index with the timestamp of every index_every-th row.
+    Samples are buffered in memory and appended by a background thread in
+    large chunks (one write per column file), which suits SD cards. A
+    segment is closed after segment_rows rows; closed segments are deleted
+    once they are older than max_age or the store exceeds max_bytes.
+
+    query() memory-maps the column files and finds the requested time range
+    through the sparse index, so "the last hour of temperature1 of 0x0A"
+    touches only the pages holding that hour. Timestamps are expected to
+    increase within a series (a wall-clock step back is not handled).
+    """
+
+    def __init__(
+        self,
+        root: str,
+        chunk_rows: int = 4096,
+        flush_interval: float = 10.0,
+        segment_rows: int = 1 << 20,
+        index_every: int = 1024,
+        max_age: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        :param root: Directory of the store (created if missing).
+        :param chunk_rows: Write a series once this many samples are buffered.
+        :param flush_interval: Write buffered samples at least this often (s).
+        :param segment_rows: Rows per segment before a new one is started.
+        :param index_every: Rows between sparse index entries.
+        :param max_age: Delete closed segments older than this (s).
+        :param max_bytes: Delete the oldest closed segments above this size.
+        """
+        if np is None:
+            raise ImportError("TelemetryStore requires numpy (pip install numpy)")
+        if segment_rows <= 0 or index_every <= 0 or chunk_rows <= 0:
+            raise ValueError("chunk_rows, segment_rows and index_every must be > 0")
+        self.root = root
+        self.chunk_rows = chunk_rows
+        self.flush_interval = flush_interval
+        self.segment_rows = segment_rows
+        self.index_every = index_every
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        # status listeners get time.monotonic(); stored timestamps are wall clock
+        self._wall_offset = time.time() - time.monotonic()
+        self._series: Dict[str, _Series] = {}
+        self._lock = threading.Lock()  # buffers and segment lists
+        self._io_lock = threading.Lock()  # appends, rotation and retention
+        self._cond = threading.Condition(self._lock)
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._attached: List[Any] = []
+        # statistics
+        self.rows_written = 0
+        self.bytes_written = 0
+        self.chunks_written = 0
+        self.segments_deleted = 0
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        for name in sorted(os.listdir(self.root)):
+            path = os.path.join(self.root, name)
+            try:
+                with open(os.path.join(path, SCHEMA_FILE)) as f:
+                    schema = json.load(f)
+            except (OSError, ValueError):
+                continue
+            series = _Series(path, schema["fields"], schema["kinds"], schema["tags"])
+            for segment in sorted(os.listdir(path)):
+                if segment.startswith("seg-"):
+                    series.segments.append(
+                        _Segment(
+                            os.path.join(path, segment),
+                            series.columns,
+                            self.index_every,
+                        )
+                    )
+            self._series[name] = series
+        if self._series:
+            logger.info("TelemetryStore: %d series in %s", len(self._series), self.root)
+
+    # --- producer side ----------------------------------------------------
+
+    def attach(self, slice_obj: Any) -> None:
+        """Store every decoded status of slice_obj."""
+        slice_obj.add_status_listener(self.on_status)
+        self._attached.append(slice_obj)
+
+    def detach(self, slice_obj: Any) -> None:
+        slice_obj.remove_status_listener(self.on_status)
+        if slice_obj in self._attached:
+            self._attached.remove(slice_obj)
+
+    def on_status(
+        self, slice_obj: Any, timestamp: float, values: Dict[str, Any]
+    ) -> None:
+        """Status listener buffering one sample (also usable behind a stage)."""
+        name = series_name(slice_obj)
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._create(name, slice_obj, values)
+            row = [timestamp + self._wall_offset]
+            for field in series.fields:
+                value = values.get(field)
+                row.append(math.nan if value is None else float(value))
+            series.buffer.append(row)
+            if len(series.buffer) >= self.chunk_rows:
+                self._cond.notify()
+
+    def _create(self, name: str, slice_obj: Any, values: Dict[str, Any]) -> _Series:
+        path = os.path.join(self.root, name)
+        os.makedirs(path, exist_ok=True)
+        tags = {
+            "address": "0x%02X" % slice_obj.target_address,
+            "slice": type(slice_obj).__name__,
+        }
+        fields = list(values)
+        kinds = [_kind(values[field]) for field in fields]
+        tmp = os.path.join(path, SCHEMA_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"fields": fields, "kinds": kinds, "tags": tags}, f)
+        os.replace(tmp, os.path.join(path, SCHEMA_FILE))
+        series = self._series[name] = _Series(path, fields, kinds, tags)
+        return series
+
+    # --- writer -----------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the background writer thread."""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="loafware-telemetry-store", daemon=True
+        )
+        self._thread.start()
+        logger.info("TelemetryStore: writing to %s", self.root)
+
+    def stop(self) -> None:
+        """Stop the writer thread and write everything still buffered."""
+        for slice_obj in list(self._attached):
+            self.detach(slice_obj)
+        with self._lock:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if self._running and not self._full():
+                    self._cond.wait(self.flush_interval)
+                if not self._running:
+                    return
+            self.flush()
+
+    def _full(self) -> bool:
+        return any(len(s.buffer) >= self.chunk_rows for s in self._series.values())
+
+    def flush(self) -> int:
+        """Append every buffered sample to disk now; returns the rows written."""
+        written = 0
+        with self._io_lock:
+            with self._lock:
+                pending = []
+                for series in self._series.values():
+                    if series.buffer:
+                        pending.append((series, series.buffer))
+                        series.buffer = []
+            for series, rows in pending:
+                written += self._append(series, np.array(rows, dtype="<f8"))
+            self._enforce_retention()
+        return written
+
+    def _append(self, series: _Series, chunk: Any) -> int:
+        done = 0
+        while done < len(chunk):
+            with self._lock:
+                segment = series.segments[-1] if series.segments else None
+            if segment is None or segment.rows >= self.segment_rows:
+                segment = self._new_segment(series)
+            part = chunk[done : done + self.segment_rows - segment.rows]
+            try:
+                segment.append(part)
+            except OSError as e:
+                logger.error(
+                    "flush: cannot append to %s: %s (%d rows lost)",
+                    segment.path,
+                    e,
+                    len(chunk) - done,
+                )
+                break
+            done += len(part)
+            self.rows_written += len(part)
+            self.bytes_written += part.nbytes
+            self.chunks_written += 1
+        return done
+
+    def _new_segment(self, series: _Series) -> _Segment:
+        number = 1
+        if series.segments:
+            number = int(os.path.basename(series.segments[-1].path)[4:]) + 1
+        path = os.path.join(series.path, "seg-%06d" % number)
+        os.makedirs(path, exist_ok=True)
+        segment = _Segment(path, series.columns, self.index_every)
+        with self._lock:
+            series.segments.append(segment)
+        return segment
+
+    def _enforce_retention(self) -> None:
+        if self.max_age is None and self.max_bytes is None:
+            return
+        with self._lock:
+            # the newest segment of a series is still being written: keep it
+            closed = [
+                (series, segment)
+                for series in self._series.values()
+                for segment in series.segments[:-1]
+            ]
+        expired = []
+        if self.max_age is not None:
+            horizon = time.time() - self.max_age
+            expired = [(s, g) for s, g in closed if g.time_span()[1] < horizon]
+        if self.max_bytes is not None:
+            total = sum(g.bytes() for s in self._series.values() for g in s.segments)
+            total -= sum(g.bytes() for _, g in expired)
+            for series, segment in sorted(closed, key=lambda c: c[1].time_span()[1]):
+                if total <= self.max_bytes:
+                    break
+                if (series, segment) not in expired:
+                    expired.append((series, segment))
+                    total -= segment.bytes()
+        for series, segment in expired:
+            with self._lock:
+                series.segments.remove(segment)
+            shutil.rmtree(segment.path, ignore_errors=True)
+            self.segments_deleted += 1
+            logger.info("TelemetryStore: deleted segment %s", segment.path)
+
+    # --- readers ----------------------------------------------------------
+
+    def series(self) -> List[str]:
+        with self._lock:
+            return sorted(self._series)
+
+    def _get(self, series: Union[str, Any]) -> _Series:
+        name = series if isinstance(series, str) else series_name(series)
+        with self._lock:
+            found = self._series.get(name)
+        if found is None:
+            raise KeyError("no series %r" % name)
+        return found
+
+    def fields(self, series: Union[str, Any]) -> Tuple[str, ...]:
+        return self._get(series).fields
+
+    def _pieces(
+        self,
+        series: _Series,
+        columns: Sequence[str],
+        start: Optional[float],
+        end: Optional[float],
+        batch: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            segments = list(series.segments)
+            buffered = list(series.buffer)
+        for segment in segments:
+            first, last = segment.time_span()
+            if end is not None and first >= end:
+                continue
+            if start is not None and last < start:
+                continue
+            lo, hi = segment.row_range(start, end)
+            step = batch or max(hi - lo, 1)
+            mapped = {name: segment.column(name) for name in columns}
+            for i in range(lo, hi, step):
+                j = min(i + step, hi)
+                yield {name: mapped[name][i:j] for name in columns}
+        if buffered:
+            rows = np.array(buffered, dtype="<f8")
+            keep = np.ones(len(rows), dtype=bool)
+            if start is not None:
+                keep &= rows[:, 0] >= start
+            if end is not None:
+                keep &= rows[:, 0] < end
+            rows = rows[keep]
+            if len(rows):
+                positions = [series.columns.index(name) for name in columns]
+                yield {name: rows[:, p] for name, p in zip(columns, positions)}
+
+    def query(
+        self,
+        series: Union[str, Any],
+        fields: Optional[Sequence[str]] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Samples of one series with start <= timestamp < end (time.time()
+        seconds), as {"timestamp": array, field: array}. Data from a single
+        segment is returned as read-only memory-mapped views, not copied.
+        :param series: Series name or the slice object.
+        :param fields: Fields to return (default: all).
+        """
+        found = self._get(series)
+        names = found.fields if fields is None else tuple(fields)
+        for name in names:
+            if name not in found.fields:
+                raise KeyError("series has no field %r" % name)
+        columns = (TIMESTAMP,) + tuple(names)
+        pieces = list(self._pieces(found, columns, start, end))
+        if len(pieces) == 1:
+            return pieces[0]
+        return {
+            name: np.concatenate([p[name] for p in pieces]) if pieces else np.zeros(0)
+            for name in columns
+        }
+
+    def last(
+        self, series: Union[str, Any], field: str, seconds: float
+    ) -> Tuple[Any, Any]:
+        """(timestamps, values) of one field over the last `seconds`."""
+        result = self.query(series, [field], start=time.time() - seconds)
+        return result[TIMESTAMP], result[field]
+
+    # --- backfill ---------------------------------------------------------
+
+    def backfill(
+        self,
+        sink: Any,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        series: Optional[Sequence[Union[str, Any]]] = None,
+        batch: Optional[int] = None,
+    ) -> int:
+        """
+        Replay stored samples (start <= timestamp < end) into a sink with an
+        InfluxExporter-style record(tags, fields, timestamp_ns). Rows are read
+        batch at a time and, if the sink has flush(), it is drained after
+        every batch so its bounded queue never overflows. Field values get
+        back their original type (int / bool). Returns the samples replayed.
+        """
+        batch = batch or getattr(sink, "batch_size", 1000)
+        drain = getattr(sink, "flush", None)
+        targets = [self._get(s) for s in series] if series else [
+            self._get(name) for name in self.series()
+        ]
+        count = 0
+        for found in targets:
+            columns = (TIMESTAMP,) + found.fields
+            converters = [_KINDS[kind] for kind in found.kinds]
+            for piece in self._pieces(found, columns, start, end, batch):
+                stamps = (piece[TIMESTAMP] * 1e9).astype(np.int64).tolist()
+                values = [piece[name].tolist() for name in found.fields]
+                for i, timestamp_ns in enumerate(stamps):
+                    fields = {}
+                    for name, convert, column in zip(found.fields, converters, values):
+                        value = column[i]
+                        if value == value:  # NaN: field missing in this sample
+                            fields[name] = convert(value)
+                    sink.record(found.tags, fields, timestamp_ns)
+                count += len(stamps)
+                if drain is not None:
+                    # flush() returns the samples it took off the queue
+                    while drain():
+                        pass
+        logger.info("TelemetryStore: backfilled %d samples", count)
+        return count
+
+    # --- reporting --------------------------------------------------------
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            buffered = sum(len(s.buffer) for s in self._series.values())
+            segments = sum(len(s.segments) for s in self._series.values())
+            return {
+                "series": len(self._series),
+                "segments": segments,
+                "buffered_rows": buffered,
+                "rows_written": self.rows_written,
+                "bytes_written": self.bytes_written,
+                "chunks_written": self.chunks_written,
+                "segments_deleted": self.segments_deleted,
+            }
@@ -0,0 +1,142 @@
+# src/loafware/tracing.py
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("loafware.tracing")
+
+# name, category, start (perf_counter s), duration (s), thread id, args
+Span = Tuple[str, str, float, float, int, Optional[Dict[str, Any]]]
+
+
+class Tracer:
+    """
+    Opt-in span recorder for bus transactions and slice methods.
+
+    The hooks in PyCRUMBSWrapper and BusWorker check `enabled` before doing
+    anything else, so a disabled tracer costs one attribute read per call;
+    the slice method wrappers are only installed (through add_toggle())
+    while tracing is enabled. Enabled, each span is one tuple appended to a
+    bounded deque (oldest spans are dropped). chrome_trace() / dump() export
+    the buffer in the Chrome trace event format, viewable in Perfetto or
+    chrome://tracing.
+    """
+
+    def __init__(self, capacity: int = 100000) -> None:
+        self.enabled = False
+        self._spans: Deque[Span] = deque(maxlen=capacity)
+        self._threads: Dict[int, str] = {}
+        self._toggles: List[Callable[[bool], None]] = []
+        self.recorded = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._spans.maxlen or 0
+
+    @property
+    def dropped(self) -> int:
+        """Spans pushed out of the buffer by newer ones."""
+        return self.recorded - len(self._spans)
+
+    def add_toggle(self, callback: Callable[[bool], None]) -> None:
+        """Call callback(enabled) whenever enable() / disable() switch tracing."""
+        self._toggles.append(callback)
+
+    def _switch(self, enabled: bool) -> None:
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        for callback in list(self._toggles):
+            callback(enabled)
+
+    def enable(self, capacity: Optional[int] = None) -> None:
+        """Start recording, optionally resizing (and clearing) the buffer."""
+        if capacity is not None and capacity != self.capacity:
+            self._spans = deque(maxlen=capacity)
+            self.recorded = 0
+        self._switch(True)
+
+    def disable(self) -> None:
+        self._switch(False)
+
+    def clear(self) -> None:
+        self._spans.clear()
+        self.recorded = 0
+
+    def record(
+        self,
+        name: str,
+        category: str,
+        start: float,
+        end: float,
+        args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Add a finished span; start and end are time.perf_counter() values."""
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        self._spans.append((name, category, start, end - start, tid, args))
+        self.recorded += 1
+
+    @contextmanager
+    def span(self, name: str, category: str = "app", **args: Any) -> Iterator[None]:
+        """Trace a block of application code (e.g. one control loop sweep)."""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, category, started, time.perf_counter(), args or None)
+
+    def spans(self) -> List[Span]:
+        """Copy of the buffered spans, oldest first."""
+        return list(self._spans)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """The buffer as a Chrome trace event document."""
+        pid = os.getpid()
+        spans = self.spans()
+        events: List[Dict[str, Any]] = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in list(self._threads.items())
+        ]
+        for name, category, start, duration, tid, args in spans:
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, path: str) -> int:
+        """Write chrome_trace() to path as JSON; returns the number of spans."""
+        trace = self.chrome_trace()
+        with open(path, "w") as f:
+            json.dump(trace, f)
+        count = sum(1 for e in trace["traceEvents"] if e["ph"] == "X")
+        logger.info("Tracer: wrote %d spans to %s", count, path)
+        return count
+
+
+# Process-wide tracer used by all hooks (disabled until enable() is called)
+TRACER = Tracer()
@@ -0,0 +1,377 @@
+# src/loafware/trajectory.py
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from .slice_base import Slice
+import heapq
+import logging
+import math
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; trajectories require it
+    np = None
+
+logger = logging.getLogger("loafware.trajectory")
+
+# Setpoint method -> (setpoint attributes, measured attributes) per channel
+SETPOINT_METHODS: Dict[str, Tuple[Tuple[str, str], Tuple[str, str]]] = {
+    "change_setpoints": (
+        ("setpoint1", "setpoint2"),
+        ("temperature1", "temperature2"),
+    ),
+    "set_position_setpoints": (
+        ("motor1_pos_sp", "motor2_pos_sp"),
+        ("motor1_pos", "motor2_pos"),
+    ),
+    "set_speed_setpoints": (
+        ("motor1_speed_sp", "motor2_speed_sp"),
+        ("motor1_speed", "motor2_speed"),
+    ),
+}
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("trajectories require numpy (pip install numpy)")
+
+
+# --- profiles ---------------------------------------------------------------
+
+
+def _move(
+    start: float,
+    end: float,
+    max_velocity: float,
+    max_accel: float,
+    dt: float,
+    s: bool,
+) -> Tuple[Any, Any]:
+    _require_numpy()
+    if max_velocity <= 0 or max_accel <= 0 or dt <= 0:
+        raise ValueError("max_velocity, max_accel and dt must be positive")
+    distance = abs(end - start)
+    direction = 1.0 if end >= start else -1.0
+    if distance == 0:
+        return np.zeros(1), np.full(1, float(start))
+    # time to reach velocity v: v / a (trapezoid) or pi v / 2a (sine accel);
+    # either way the ramp covers v * t_ramp / 2
+    k = (math.pi / 2 if s else 1.0) / max_accel
+    velocity = min(max_velocity, math.sqrt(distance / k))
+    t_ramp = k * velocity
+    t_cruise = (distance - velocity * t_ramp) / velocity
+    total = 2 * t_ramp + t_cruise
+    times = np.append(np.arange(0.0, total, dt), total)
+
+    def ramp(t: Any) -> Any:
+        if s:
+            return velocity / 2 * (t - t_ramp / math.pi * np.sin(math.pi * t / t_ramp))
+        return velocity / (2 * t_ramp) * t * t
+
+    d_ramp = velocity * t_ramp / 2
+    position = np.where(
+        times < t_ramp,
+        ramp(np.minimum(times, t_ramp)),
+        np.where(
+            times < t_ramp + t_cruise,
+            d_ramp + velocity * (times - t_ramp),
+            distance - ramp(np.maximum(total - times, 0.0)),
+        ),
+    )
+    return times, start + direction * position
+
+
+def trapezoid(
+    start: float, end: float, max_velocity: float, max_accel: float, dt: float = 0.01
+) -> Tuple[Any, Any]:
+    """
+    Trapezoidal velocity move (triangular if max_velocity is never reached).
+    :return: (times from 0 in s, positions) sampled every dt, ending at end.
+    """
+    return _move(start, end, max_velocity, max_accel, dt, False)
+
+
+def s_curve(
+    start: float, end: float, max_velocity: float, max_accel: float, dt: float = 0.01
+) -> Tuple[Any, Any]:
+    """
+    Jerk-limited move with sinusoidal acceleration phases (peak max_accel),
+    so acceleration starts and ends at zero.
+    :return: (times from 0 in s, positions) sampled every dt, ending at end.
+    """
+    return _move(start, end, max_velocity, max_accel, dt, True)
+
+
+def linear_ramp(
+    start: float, end: float, duration: float, dt: float = 1.0
+) -> Tuple[Any, Any]:
+    """Straight-line ramp from start to end over duration seconds."""
+    _require_numpy()
+    if duration <= 0:
+        return np.zeros(1), np.full(1, float(end))
+    times = np.append(np.arange(0.0, duration, dt), duration)
+    return times, start + (end - start) * times / duration
+
+
+def ramp_soak(
+    start: float, steps: Sequence[Tuple[float, float, float]], dt: float = 1.0
+) -> Tuple[Any, Any]:
+    """
+    Thermal program of ramp / soak steps.
+    :param start: Initial setpoint.
+    :param steps: (target, rate in units/s, soak time in s) per step.
+    :return: (times from 0 in s, setpoints).
+    """
+    _require_numpy()
+    times: List[Any] = [np.zeros(1)]
+    values: List[Any] = [np.full(1, float(start))]
+    t, value = 0.0, float(start)
+    for target, rate, soak in steps:
+        if rate <= 0:
+            raise ValueError("ramp rate must be positive")
+        duration = abs(target - value) / rate
+        if duration > 0:
+            ts, vs = linear_ramp(value, target, duration, dt)
+            times.append(t + ts[1:])
+            values.append(vs[1:])
+            t += duration
+        if soak > 0:
+            ts = np.append(np.arange(dt, soak, dt), soak)
+            times.append(t + ts)
+            values.append(np.full(len(ts), float(target)))
+            t += soak
+        value = float(target)
+    return np.concatenate(times), np.concatenate(values)
+
+
+# --- execution --------------------------------------------------------------
+
+
+class TrajectoryRun:
+    """One trajectory being dispatched to one slice, with its tracking stats."""
+
+    def __init__(
+        self,
+        slice_obj: Slice,
+        method: str,
+        times: Any,
+        setpoints: Any,
+        measured: Optional[Tuple[str, str]],
+        start: float,
+    ) -> None:
+        self.slice = slice_obj
+        self.method = method
+        self.times = times
+        self.setpoints = setpoints  # (2, N)
+        self.measured = measured
+        self.start = start
+        self.index = 0
+        self.done = threading.Event()
+        self.cancelled = False
+        # statistics
+        self.sent = 0
+        self.skipped = 0
+        self.failed = 0
+        self.max_lateness = 0.0
+        self._err_count = 0
+        self._err_square = 0.0
+        self.max_error = 0.0
+
+    @property
+    def due(self) -> float:
+        return self.start + float(self.times[self.index])
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def _track(self) -> None:
+        # compare polled state with the point commanded before this one
+        if self.measured is None or self.index == 0:
+            return
+        active = self.setpoints[:, self.index - 1]
+        for channel, name in enumerate(self.measured):
+            error = float(getattr(self.slice, name)) - float(active[channel])
+            self._err_count += 1
+            self._err_square += error * error
+            if abs(error) > self.max_error:
+                self.max_error = abs(error)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "points": len(self.times),
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "max_lateness": self.max_lateness,
+            "rms_error": (
+                math.sqrt(self._err_square / self._err_count)
+                if self._err_count
+                else 0.0
+            ),
+            "max_error": self.max_error,
+        }
+
+
+class TrajectoryExecutor:
+    """
+    Dispatches precomputed setpoint sequences on an absolute-time schedule.
+    Point i of a run is due at start + times[i]; lateness never accumulates
+    because every due time is computed from the start, not from the previous
+    dispatch. When the executor falls behind by more than one point it sends
+    only the newest due point and counts the rest as skipped. Any number of
+    runs (on different slices) share one dispatcher thread, ordered by due
+    time. Before each point the tracking error of the previous one is taken
+    from the slice's polled state.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        _require_numpy()
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._heap: List[Any] = []  # (due, seq, run)
+        self._seq = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def run(
+        self,
+        slice_obj: Slice,
+        method: str,
+        times: Any,
+        setpoint1: Any,
+        setpoint2: Any = None,
+        start_at: Optional[float] = None,
+    ) -> TrajectoryRun:
+        """
+        Schedule a trajectory.
+        :param slice_obj: Target slice.
+        :param method: Setpoint method taking both channels, e.g.
+            "set_position_setpoints" or "change_setpoints".
+        :param times: Offsets (s) of the points from the start.
+        :param setpoint1: Channel 1 setpoints (array, or a scalar to hold).
+        :param setpoint2: Channel 2 setpoints; None holds its current setpoint.
+        :param start_at: clock() time of point 0 (default: now).
+        :raises ValueError: times is empty, not 1-D or decreasing, or a
+            setpoint array does not have one value per time.
+        """
+        times = np.asarray(times, dtype=float)
+        if times.ndim != 1 or len(times) == 0:
+            raise ValueError("times must be a non-empty 1-D sequence")
+        if not np.all(np.isfinite(times)) or np.any(np.diff(times) < 0):
+            raise ValueError("times must be finite and non-decreasing")
+        setpoints = np.empty((2, len(times)))
+        attrs, measured = SETPOINT_METHODS.get(method, (None, None))
+        for channel, values in enumerate((setpoint1, setpoint2)):
+            if values is None:
+                if attrs is None:
+                    raise ValueError("%s: both channels are required" % method)
+                values = getattr(slice_obj, attrs[channel])
+            values = np.asarray(values, dtype=float)
+            if values.ndim > 1 or (values.ndim == 1 and len(values) != len(times)):
+                raise ValueError(
+                    "setpoint%d needs %d values (one per time), got shape %s"
+                    % (channel + 1, len(times), values.shape)
+                )
+            setpoints[channel] = values
+        if not callable(getattr(slice_obj, method, None)):
+            raise AttributeError("%s has no %s()" % (type(slice_obj).__name__, method))
+        start = self._clock() if start_at is None else start_at
+        run = TrajectoryRun(slice_obj, method, times, setpoints, measured, start)
+        with self._cond:
+            self._push(run)
+            self._cond.notify()
+        return run
+
+    def _push(self, run: TrajectoryRun) -> None:
+        self._seq += 1
+        heapq.heappush(self._heap, (run.due, self._seq, run))
+
+    def start(self) -> None:
+        """Start the dispatcher thread."""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="loafware-trajectory", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the dispatcher; unfinished runs are cancelled."""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._cond:
+            runs, self._heap = self._heap, []
+        for _, _, run in runs:
+            run.cancel()
+            run.done.set()
+
+    def wait(
+        self, runs: Sequence[TrajectoryRun], timeout: Optional[float] = None
+    ) -> bool:
+        """Wait until every run has finished; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for run in runs:
+            remaining = None
+            if deadline is not None:
+                remaining = max(0.0, deadline - time.monotonic())
+            if not run.done.wait(remaining):
+                return False
+        return True
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running:
+                    if self._heap:
+                        delay = self._heap[0][0] - self._clock()
+                        if delay <= 0:
+                            break
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+                if not self._running:
+                    return
+                _, _, run = heapq.heappop(self._heap)
+            self._dispatch(run)
+            with self._cond:
+                if run.cancelled or run.index >= len(run.times):
+                    run.done.set()
+                else:
+                    self._push(run)
+
+    def _dispatch(self, run: TrajectoryRun) -> None:
+        if run.cancelled:
+            return
+        now = self._clock()
+        # catch up: send only the newest point that is already due
+        last = int(np.searchsorted(run.times, now - run.start, side="right")) - 1
+        if last > run.index:
+            run.skipped += last - run.index
+            run.index = last
+        run.max_lateness = max(run.max_lateness, now - run.due)
+        run._track()
+        sp1, sp2 = run.setpoints[:, run.index].tolist()
+        try:
+            ok = bool(getattr(run.slice, run.method)(sp1, sp2))
+        except Exception as e:
+            logger.exception(
+                "trajectory %s on 0x%02X raised: %s",
+                run.method,
+                run.slice.target_address,
+                e,
+            )
+            ok = False
+        if ok:
+            run.sent += 1
+        else:
+            run.failed += 1
+        run.index += 1
@@ -0,0 +1,88 @@
+# tests/test_bus_capture.py
+import os
+from concurrent.futures import Future
+
+import pytest
+
+pytest.importorskip("pyCRUMBS")
+
+from loafware.bus_capture import (  # noqa: E402
+    HEADER,
+    NO_RESPONSE,
+    RECEIVED,
+    RECORD,
+    SEND_FAILED,
+    SENT,
+    CaptureReader,
+    CaptureWrapper,
+)
+from loafware.bus_worker import BusWorker  # noqa: E402
+from loafware.simulated_bus import SimulatedCrumbsBus, SimulatedRLHT  # noqa: E402
+from pyCRUMBS import CRUMBSMessage  # noqa: E402
+
+
+def _capture(path, reads):
+    bus = SimulatedCrumbsBus()
+    bus.add_device(0x0A, SimulatedRLHT())
+    wrapper = CaptureWrapper(bus, path)
+    for _ in range(reads):
+        wrapper.request_message(0x0A)
+    wrapper.request_message(0x0B)
+    wrapper.close()
+
+
+def test_append_after_truncated_tail(tmp_path):
+    path = str(tmp_path / "bus.cap")
+    _capture(path, 3)
+    # a crash mid-write leaves part of a record behind
+    with open(path, "ab") as f:
+        f.write(b"\xff" * (RECORD.size // 2))
+
+    _capture(path, 2)
+    assert os.path.getsize(path) == HEADER.size + 7 * RECORD.size
+    reader = CaptureReader(path)
+    try:
+        directions = [record.direction for record in reader]
+        assert directions == [RECEIVED] * 3 + [NO_RESPONSE] + [RECEIVED] * 2 + [
+            NO_RESPONSE
+        ]
+        assert {record.address for record in reader} == {0x0A, 0x0B}
+    finally:
+        reader.close()
+
+
+def _setpoints(sp1, sp2):
+    msg = CRUMBSMessage()
+    msg.typeID = 1
+    msg.commandType = 2
+    msg.data = [sp1, sp2, 0.0, 0.0, 0.0, 0.0]
+    return msg
+
+
+def test_coalesced_writes_recorded_when_resolved(tmp_path):
+    path = str(tmp_path / "bus.cap")
+    bus = SimulatedCrumbsBus(latency=0.05)
+    bus.add_device(0x0A, SimulatedRLHT())
+    worker = BusWorker(bus, coalesce=True)
+    wrapper = CaptureWrapper(worker, path)
+    futures = [
+        wrapper.send_message(_setpoints(sp, sp), 0x0A) for sp in (10.0, 20.0, 30.0)
+    ]
+    failed = wrapper.send_message(_setpoints(1.0, 1.0), 0x0B)  # nobody there
+    assert all(isinstance(future, Future) for future in futures)
+    assert wrapper.records == 0  # queued, nothing on the bus yet
+    wrapper.close()  # drains the worker
+    assert futures[-1].result() is None
+    with pytest.raises(OSError):
+        failed.result()
+
+    reader = CaptureReader(path)
+    try:
+        records = [(r.address, r.direction, r.data[0]) for r in reader]
+    finally:
+        reader.close()
+    # one record per bus write, carrying the payload that won coalescing
+    sent = [record for record in records if record[0] == 0x0A]
+    assert len(sent) == len(set(futures))
+    assert sent[-1] == (0x0A, SENT, 30.0)
+    assert records[-1] == (0x0B, SEND_FAILED, 1.0)
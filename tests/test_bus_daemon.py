@@ -0,0 +1,117 @@
+# tests/test_bus_daemon.py
+import time
+
+import pytest
+
+pytest.importorskip("pyCRUMBS")
+
+from loafware.bus_daemon import BusDaemon  # noqa: E402
+from loafware.bus_health import HealthGuard  # noqa: E402
+from loafware.relay_heater_slice import RelayHeaterSlice  # noqa: E402
+from loafware.slice_base import NOT_FRESH  # noqa: E402
+from loafware.simulated_bus import (  # noqa: E402
+    SimulatedCrumbsBus,
+    SimulatedDevice,
+    SimulatedRLHT,
+)
+
+
+def _make_bus():
+    bus = SimulatedCrumbsBus()
+    bus.add_device(0x10, SimulatedRLHT())
+    return bus
+
+
+class _Counter(SimulatedDevice):
+    """Every reply carries the number of the poll in all six data slots."""
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def step(self, dt):
+        pass
+
+    def handle_command(self, command_type, data):
+        pass
+
+    def status(self):
+        self.count += 1
+        return [float(self.count)] * 6
+
+
+def _make_counter_bus():
+    bus = SimulatedCrumbsBus()
+    bus.add_device(0x10, _Counter())
+    return bus
+
+
+def test_read_never_returns_torn_rows():
+    daemon = BusDaemon(_make_counter_bus, capacity=1)
+    daemon.start()
+    try:
+        daemon.add_address(0x10, 1e-5)  # the child rewrites the row nonstop
+        deadline = time.monotonic() + 1.0
+        reads = 0
+        while time.monotonic() < deadline:
+            values = daemon.read(0x10)
+            if values is None or values[3] == 0:
+                continue
+            reads += 1
+            assert values[0] % 2 == 0
+            # poll count and every data slot come from the same poll
+            assert set(values[8:14]) == {float(values[3])}
+        assert reads > 0
+        assert daemon.stats()[0x10]["polls"] > 1000
+    finally:
+        daemon.stop()
+
+
+def test_readd_keeps_poll_rate():
+    daemon = BusDaemon(_make_bus)
+    daemon.start()
+    try:
+        daemon.add_address(0x10, 0.05)
+        for _ in range(5):
+            daemon.remove_address(0x10)
+            daemon.add_address(0x10, 0.05)
+        time.sleep(1.0)
+        assert daemon.stats()[0x10]["polls"] <= 24  # ~20 at one schedule
+    finally:
+        daemon.stop()
+
+
+def test_proxy_returns_each_frame_once():
+    daemon = BusDaemon(_make_bus)
+    daemon.start()
+    try:
+        daemon.add_address(0x10, 0.5)
+        time.sleep(0.2)
+        assert daemon.proxy.request_message(0x10) is not None
+        assert daemon.proxy.request_message(0x10) is NOT_FRESH
+    finally:
+        daemon.stop()
+
+
+def test_slice_polled_faster_than_daemon(caplog):
+    daemon = BusDaemon(_make_bus)
+    daemon.start()
+    try:
+        daemon.add_address(0x10, 0.2)
+        time.sleep(0.1)
+        guard = HealthGuard(daemon.proxy, timeout=None)
+        rlht = RelayHeaterSlice(0x10, guard)
+        statuses = []
+        rlht.add_status_listener(lambda s, t, values: statuses.append(t))
+        deadline = time.monotonic() + 0.5
+        polls = 0
+        while time.monotonic() < deadline:
+            assert rlht.request_status() is not None
+            polls += 1
+            time.sleep(0.01)
+        assert 2 <= len(statuses) <= 4 < polls  # one status per daemon poll
+        assert rlht.temperature1 > 0.0
+        assert guard.health.snapshot().get(0x10, {}).get("total_failures", 0) == 0
+        assert not [r for r in caplog.records if r.levelname == "ERROR"]
+    finally:
+        daemon.stop()
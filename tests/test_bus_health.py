@@ -0,0 +1,128 @@
+# tests/test_bus_health.py
+import pytest
+
+pytest.importorskip("pyCRUMBS")
+
+from loafware.bus_health import (  # noqa: E402
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    HealthGuard,
+    HealthTracker,
+)
+from loafware.relay_heater_slice import RelayHeaterSlice  # noqa: E402
+from loafware.simulated_bus import SimulatedCrumbsBus, SimulatedRLHT  # noqa: E402
+from loafware.slice_poller import SlicePoller  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _tracker(clock):
+    return HealthTracker(
+        failure_threshold=3,
+        base_backoff=0.1,
+        max_backoff=0.15,
+        probe_interval=5.0,
+        clock=clock,
+    )
+
+
+def test_backoff_doubles_up_to_the_cap(clock):
+    health = _tracker(clock)
+    assert health.allow(0x0A)
+    health.record_failure(0x0A)
+    assert health.next_attempt(0x0A) == pytest.approx(100.1)
+    assert not health.allow(0x0A)
+    clock.now = 100.1
+    assert health.allow(0x0A)
+    health.record_failure(0x0A)
+    assert health.next_attempt(0x0A) == pytest.approx(100.25)  # capped, not 0.2
+    health.record_success(0x0A)
+    assert health.next_attempt(0x0A) == 0.0
+    assert health.snapshot()[0x0A]["total_failures"] == 2
+
+
+def test_breaker_trips_probes_and_recovers(clock):
+    health = _tracker(clock)
+    events = []
+    health.add_trip_listener(lambda address: events.append(("trip", address)))
+    health.add_recovery_listener(lambda address: events.append(("up", address)))
+
+    def broken(address):
+        raise RuntimeError("listener bug")
+
+    health.add_trip_listener(broken)  # isolated from the tracker
+    for _ in range(3):
+        health.record_failure(0x0A)
+    assert health.state(0x0A) == OPEN
+    assert events == [("trip", 0x0A)]
+    assert not health.allow(0x0A)
+
+    clock.now += 5.0
+    assert health.allow(0x0A)  # the probe
+    assert health.state(0x0A) == HALF_OPEN
+    assert not health.allow(0x0A)  # one probe at a time
+    health.record_failure(0x0A)
+    assert health.state(0x0A) == OPEN
+    assert health.snapshot()[0x0A]["trips"] == 1
+
+    clock.now += 5.0
+    assert health.allow(0x0A)
+    health.record_success(0x0A)
+    assert health.state(0x0A) == CLOSED
+    assert events == [("trip", 0x0A), ("up", 0x0A)]
+
+
+def test_guard_skips_reads_but_not_writes(clock):
+    bus = SimulatedCrumbsBus()
+    guard = HealthGuard(bus, _tracker(clock), timeout=None, clock=clock)
+    heater = RelayHeaterSlice(0x0A, guard)
+    for _ in range(3):
+        clock.now += 1.0
+        assert heater.request_status() is None
+    assert guard.health.state(0x0A) == OPEN
+    transactions = bus.transactions
+    assert heater.request_status() is None
+    assert bus.transactions == transactions  # not put on the bus
+
+    bus.add_device(0x0A, SimulatedRLHT())
+    assert heater.change_setpoints(40.0, 40.0)  # writes always go out
+    assert guard.health.state(0x0A) == CLOSED
+    assert heater.request_status() is not None
+
+
+def test_slow_transactions_count_as_failures(clock):
+    def sleep(delay):
+        clock.now += delay
+
+    bus = SimulatedCrumbsBus(latency=0.2, sleep=sleep)
+    bus.add_device(0x0A, SimulatedRLHT())
+    guard = HealthGuard(bus, _tracker(clock), timeout=0.1, clock=clock)
+    assert guard.request_message(0x0A) is not None  # the reply is still used
+    assert guard.health.snapshot()[0x0A]["consecutive_failures"] == 1
+
+
+def test_poller_defers_dead_devices(clock):
+    bus = SimulatedCrumbsBus(clock=clock)
+    guard = HealthGuard(bus, _tracker(clock), timeout=None, clock=clock)
+    poller = SlicePoller(guard, clock=clock)
+    assert poller.health is guard.health
+    poller.add_slice(RelayHeaterSlice(0x0A, guard), 0.01)
+    end = clock.now + 2.0
+    while clock.now < end:
+        poller.run_once()
+        clock.now += 0.01
+    # three failures with backoff, then only the breaker probe interval
+    assert bus.transactions == 3
+    assert poller.stats()[0x0A]["failures"] == 3
@@ -0,0 +1,98 @@
+# tests/test_bus_worker.py
+import threading
+
+import pytest
+
+pytest.importorskip("pyCRUMBS")
+
+from loafware import bus_worker  # noqa: E402
+from loafware.bus_worker import (  # noqa: E402
+    PRIORITY_SAFETY,
+    PRIORITY_SETPOINT,
+    PRIORITY_TELEMETRY,
+    BusWorker,
+    classify_message,
+    register_safety_commands,
+)
+from loafware.relay_heater_slice import RelayHeaterSlice  # noqa: E402
+from loafware.simulated_bus import SimulatedCrumbsBus, SimulatedRLHT  # noqa: E402
+from pyCRUMBS import CRUMBSMessage  # noqa: E402
+
+
+def _message(type_id, command_type):
+    msg = CRUMBSMessage()
+    msg.typeID = type_id
+    msg.commandType = command_type
+    msg.data = [0.0] * 6
+    return msg
+
+
+@pytest.fixture
+def worker():
+    bus = SimulatedCrumbsBus()
+    bus.add_device(0x0A, SimulatedRLHT())
+    worker = BusWorker(bus)
+    yield worker
+    worker.close()
+
+
+def _hold(worker):
+    """Occupy the worker thread until the returned event is set."""
+    started, release = threading.Event(), threading.Event()
+
+    def busy():
+        started.set()
+        release.wait(5.0)
+
+    worker.submit(busy, priority=PRIORITY_TELEMETRY)
+    assert started.wait(5.0)
+    return release
+
+
+def test_queued_transactions_run_by_priority_then_fifo(worker):
+    release = _hold(worker)
+    order = []
+    futures = [
+        worker.submit(order.append, name, priority=priority)
+        for name, priority in [
+            ("read1", PRIORITY_TELEMETRY),
+            ("write1", PRIORITY_SETPOINT),
+            ("read2", PRIORITY_TELEMETRY),
+            ("brake", PRIORITY_SAFETY),
+            ("write2", PRIORITY_SETPOINT),
+        ]
+    ]
+    assert worker.queue_depths() == {"safety": 1, "setpoint": 2, "telemetry": 2}
+    release.set()
+    for future in futures:
+        future.result(5.0)
+    assert order == ["brake", "write1", "write2", "read1", "read2"]
+    assert worker.queue_depths() == {"safety": 0, "setpoint": 0, "telemetry": 0}
+    assert worker.wait_stats()["safety"]["count"] == 1
+
+
+def test_slices_use_the_worker_as_their_wrapper(worker):
+    rlht = RelayHeaterSlice(0x0A, worker)
+    assert rlht.change_setpoints(40.0, 50.0)
+    assert rlht.request_status() is not None
+    assert (rlht.setpoint1, rlht.setpoint2) == (40.0, 50.0)
+    # a NACKed write raises in the caller, as with the plain wrapper
+    with pytest.raises(OSError):
+        worker.send_message(_message(1, 2), 0x0B)
+
+
+def test_classification(monkeypatch):
+    monkeypatch.setattr(bus_worker, "SAFETY_COMMANDS", dict(bus_worker.SAFETY_COMMANDS))
+    safety = next(iter(bus_worker.SAFETY_COMMANDS[1]))
+    assert classify_message(_message(1, safety)) == PRIORITY_SAFETY
+    assert classify_message(_message(1, 2)) == PRIORITY_SETPOINT
+    assert classify_message(_message(9, 3)) == PRIORITY_SETPOINT
+    register_safety_commands(9, {3})
+    assert classify_message(_message(9, 3)) == PRIORITY_SAFETY
+
+
+def test_closed_worker_rejects_work():
+    worker = BusWorker(SimulatedCrumbsBus())
+    worker.close()
+    with pytest.raises(RuntimeError):
+        worker.submit(lambda: None)
@@ -0,0 +1,104 @@
+# tests/test_change_subscription.py
+import queue
+
+import pytest
+
+pytest.importorskip("pyCRUMBS")
+
+from loafware.relay_heater_slice import RelayHeaterSlice  # noqa: E402
+from loafware.simulated_bus import SimulatedCrumbsBus, SimulatedRLHT  # noqa: E402
+
+
+class FrozenClock:
+    def __call__(self):
+        return 0.0
+
+
+@pytest.fixture
+def rig():
+    bus = SimulatedCrumbsBus(clock=FrozenClock())  # the plant does not move
+    device = SimulatedRLHT(ambient=20.0)
+    bus.add_device(0x0A, device)
+    return device, RelayHeaterSlice(0x0A, bus)
+
+
+def _poll(device, heater, temperature, error_flags=0):
+    device.temperatures = [temperature, temperature]
+    device.error_flags = error_flags
+    heater.request_status()
+
+
+def test_deadband_notifies_on_accumulated_drift(rig):
+    device, heater = rig
+    changes = []
+    heater.subscribe(
+        ["temperature1", "error_flags"],
+        callback=lambda s, t, changed: changes.append(changed),
+        absolute=0.5,
+    )
+    _poll(device, heater, 20.0)
+    assert changes == [{"temperature1": 20.0, "error_flags": 0}]  # full state
+    for temperature in (20.2, 20.4, 20.6):  # each step inside the deadband
+        _poll(device, heater, temperature)
+    assert changes[1:] == [{"temperature1": pytest.approx(20.6)}]
+    _poll(device, heater, 20.6, error_flags=4)  # discrete: any change
+    assert changes[2:] == [{"error_flags": 4}]
+
+
+def test_relative_and_per_field_deadbands(rig):
+    device, heater = rig
+    changes = []
+    heater.subscribe(
+        ["temperature1", "temperature2"],
+        callback=lambda s, t, changed: changes.append(changed),
+        relative={"temperature1": 0.1},  # temperature2: any change
+    )
+    _poll(device, heater, 100.0)
+    _poll(device, heater, 105.0)
+    assert changes[1:] == [{"temperature2": 105.0}]
+    _poll(device, heater, 111.0)
+    assert changes[2:] == [{"temperature1": 111.0, "temperature2": 111.0}]
+
+
+def test_queue_delivery_and_failures_are_isolated(rig):
+    device, heater = rig
+    full = queue.Queue(maxsize=1)
+    queued = heater.subscribe(["temperature1"], queue=full)
+
+    def broken(slice_obj, timestamp, changed):
+        raise RuntimeError("subscriber bug")
+
+    heater.subscribe(["temperature1"], callback=broken)
+    seen = []
+    heater.subscribe(["temperature1"], callback=lambda s, t, c: seen.append(c))
+    _poll(device, heater, 20.0)
+    _poll(device, heater, 30.0)
+    slice_obj, timestamp, changed = full.get_nowait()
+    assert slice_obj is heater and changed == {"temperature1": 20.0}
+    assert queued.dropped == 1 and queued.notifications == 2
+    assert seen == [{"temperature1": 20.0}, {"temperature1": 30.0}]
+
+
+def test_unsubscribe_and_reset(rig):
+    device, heater = rig
+    changes = []
+    subscription = heater.subscribe(
+        ["temperature1"], callback=lambda s, t, c: changes.append(c), absolute=5.0
+    )
+    _poll(device, heater, 20.0)
+    subscription.reset()
+    _poll(device, heater, 21.0)  # within the deadband, but state was reset
+    assert changes == [{"temperature1": 20.0}, {"temperature1": 21.0}]
+    heater.unsubscribe(subscription)
+    _poll(device, heater, 90.0)
+    assert len(changes) == 2
+
+
+def test_invalid_subscriptions(rig):
+    device, heater = rig
+    with pytest.raises(ValueError):
+        heater.subscribe(["no_such_field"], callback=print)
+    with pytest.raises(ValueError):
+        heater.subscribe(["temperature1"])  # nowhere to deliver
+    with pytest.raises(ValueError):
+        heater.subscribe(["temperature1"], callback=print, absolute={"setpoint1": 1})
@@ -0,0 +1,82 @@
+# tests/test_coalescing.py
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import pytest
+
+pytest.importorskip("pyCRUMBS")
+
+from loafware.bus_health import HealthGuard  # noqa: E402
+from loafware.bus_worker import BusWorker  # noqa: E402
+from loafware.relay_heater_slice import RelayHeaterSlice  # noqa: E402
+from loafware.simulated_bus import SimulatedCrumbsBus, SimulatedRLHT  # noqa: E402
+
+
+def _drain(worker):
+    # a telemetry read is served after every queued setpoint write
+    worker.request_message(0x7F)
+
+
+def test_failed_coalesced_write_is_not_suppressed_on_retry():
+    bus = SimulatedCrumbsBus()  # no device yet: every write is NACKed
+    worker = BusWorker(bus, coalesce=True)
+    try:
+        rlht = RelayHeaterSlice(0x0A, worker)
+        rlht.suppress_redundant_writes = True
+
+        assert rlht.change_setpoints(40.0, 50.0)  # queued, fails on the bus
+        _drain(worker)
+        assert bus.nacks == 2  # the write and the drain read
+        assert rlht.writes_suppressed == 0
+
+        bus.add_device(0x0A, SimulatedRLHT())
+        transactions = bus.transactions
+        assert rlht.change_setpoints(40.0, 50.0)  # the retry reaches the bus
+        _drain(worker)
+        assert rlht.writes_suppressed == 0
+        assert bus.transactions == transactions + 2
+        assert bus.devices[0x0A].setpoints == [40.0, 50.0]
+
+        assert rlht.change_setpoints(40.0, 50.0)  # confirmed: now redundant
+        assert rlht.writes_suppressed == 1
+    finally:
+        worker.close()
+
+
+def test_health_guard_judges_coalesced_write_on_completion():
+    bus = SimulatedCrumbsBus()  # the write will be NACKed
+    worker = BusWorker(bus, coalesce=True)
+    guard = HealthGuard(worker, timeout=None)
+    try:
+        rlht = RelayHeaterSlice(0x0A, guard)
+        rlht.suppress_redundant_writes = True
+        assert rlht.change_setpoints(40.0, 50.0)
+        _drain(worker)
+        health = guard.health.snapshot()[0x0A]
+        assert health["consecutive_failures"] == 1
+
+        # the failed write is not taken as confirmed: the retry goes out
+        bus.add_device(0x0A, SimulatedRLHT())
+        assert rlht.change_setpoints(40.0, 50.0)
+        _drain(worker)
+        assert rlht.writes_suppressed == 0
+        assert bus.devices[0x0A].setpoints == [40.0, 50.0]
+        assert guard.health.snapshot()[0x0A]["consecutive_failures"] == 0
+    finally:
+        worker.close()
+
+
+def test_timed_out_read_is_cancelled():
+    bus = SimulatedCrumbsBus(latency=0.05)
+    bus.add_device(0x0A, SimulatedRLHT())
+    worker = BusWorker(bus)
+    worker.timeout = 0.01
+    try:
+        with pytest.raises(FutureTimeout):
+            worker.request_message(0x0A)  # on the bus
+        with pytest.raises(FutureTimeout):
+            worker.request_message(0x0A)  # queued behind it: cancelled
+        worker.timeout = None
+        worker.request_message(0x0A)
+        assert bus.transactions == 2
+    finally:
+        worker.close()
@@ -0,0 +1,93 @@
+# tests/test_discovery.py
+import pytest
+
+pytest.importorskip("pyCRUMBS")
+
+from loafware import discovery  # noqa: E402
+from loafware.discovery import (  # noqa: E402
+    discover,
+    load_cache,
+    register_slice_type,
+    save_cache,
+)
+from loafware.motor_controller_slice import MotorControllerSlice  # noqa: E402
+from loafware.relay_heater_slice import RelayHeaterSlice  # noqa: E402
+from loafware.simulated_bus import (  # noqa: E402
+    SimulatedCrumbsBus,
+    SimulatedDCMT,
+    SimulatedRLHT,
+)
+
+
+def _bus(*devices):
+    bus = SimulatedCrumbsBus()
+    for address, device in devices:
+        bus.add_device(address, device)
+    return bus
+
+
+def test_full_scan_builds_seeded_slices():
+    bus = _bus((0x0A, SimulatedRLHT(ambient=31.0)), (0x10, SimulatedDCMT()))
+    slices = discover({1: bus})[1]
+    assert sorted(slices) == [0x0A, 0x10]
+    assert isinstance(slices[0x0A], RelayHeaterSlice)
+    assert isinstance(slices[0x10], MotorControllerSlice)
+    assert slices[0x0A].crumbs is bus
+    assert slices[0x0A].temperature1 == pytest.approx(31.0)  # seeded by the reply
+
+
+def test_warm_start_probes_only_cached_addresses(tmp_path):
+    path = str(tmp_path / "discovery.json")
+    bus = _bus((0x0A, SimulatedRLHT()), (0x10, SimulatedDCMT()))
+    discover({1: bus}, cache_path=path)
+    assert load_cache(path) == {"1": {0x0A: 1, 0x10: 2}}
+
+    transactions = bus.transactions
+    assert sorted(discover({1: bus}, cache_path=path)[1]) == [0x0A, 0x10]
+    assert bus.transactions == transactions + 2
+
+    # nothing cached answers any more: fall back to a full scan
+    bus = _bus((0x20, SimulatedRLHT()))
+    assert sorted(discover({1: bus}, cache_path=path)[1]) == [0x20]
+    assert load_cache(path) == {"1": {0x20: 1}}
+
+
+def test_failed_bus_scan_keeps_its_cache_entry(tmp_path, monkeypatch):
+    path = str(tmp_path / "discovery.json")
+    save_cache(path, {"1": {0x0A: 1}, "2": {0x10: 2}})
+    good = _bus((0x0A, SimulatedRLHT()), (0x0B, SimulatedRLHT()))
+    broken = _bus()
+    scan_bus = discovery.scan_bus
+
+    def flaky_scan(crumbs_wrapper, addresses=discovery.SCAN_RANGE):
+        if crumbs_wrapper is broken:
+            raise RuntimeError("bus adapter unplugged")
+        return scan_bus(crumbs_wrapper, addresses)
+
+    monkeypatch.setattr(discovery, "scan_bus", flaky_scan)
+    result = discover({1: good, 2: broken}, cache_path=path, full_scan=True)
+    assert sorted(result[1]) == [0x0A, 0x0B]
+    assert result[2] == {}
+    assert load_cache(path) == {"1": {0x0A: 1, 0x0B: 1}, "2": {0x10: 2}}
+
+
+def test_unreadable_cache_is_ignored(tmp_path):
+    path = tmp_path / "discovery.json"
+    path.write_text("{not json")
+    assert load_cache(str(path)) == {}
+    assert load_cache(str(tmp_path / "missing.json")) == {}
+
+
+def test_registered_type_and_unknown_type(monkeypatch):
+    monkeypatch.setattr(discovery, "SLICE_TYPES", {})
+    with pytest.raises(TypeError):
+        register_slice_type(1, object)
+
+    class TunedHeater(RelayHeaterSlice):
+        pass
+
+    register_slice_type(1, TunedHeater)
+    slices = discover({1: _bus((0x0A, SimulatedRLHT()), (0x10, SimulatedDCMT()))})
+    # 0x10 reports a typeID nobody registered: skipped
+    assert list(slices[1]) == [0x0A]
+    assert type(slices[1][0x0A]) is TunedHeater
@@ -0,0 +1,103 @@
+# tests/test_fleet_state.py
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pyCRUMBS")
+
+from loafware.fleet_state import FleetTable  # noqa: E402
+from loafware.motor_controller_slice import MotorControllerSlice  # noqa: E402
+from loafware.relay_heater_slice import RelayHeaterSlice  # noqa: E402
+from loafware.simulated_bus import (  # noqa: E402
+    SimulatedCrumbsBus,
+    SimulatedDCMT,
+    SimulatedRLHT,
+)
+
+
+class BoardHeater(RelayHeaterSlice):
+    """A site-specific heater with one extra mirrored field."""
+
+    STATUS_FIELDS = RelayHeaterSlice.STATUS_FIELDS + ("board_temperature",)
+    board_temperature = 0.0
+
+
+@pytest.fixture
+def bus():
+    bus = SimulatedCrumbsBus()
+    bus.add_device(0x0A, SimulatedRLHT(ambient=25.0))
+    bus.add_device(0x0B, SimulatedRLHT(ambient=30.0))
+    bus.add_device(0x10, SimulatedDCMT())
+    return bus
+
+
+@pytest.fixture
+def table():
+    table = FleetTable([RelayHeaterSlice, MotorControllerSlice], capacity=4)
+    yield table
+    table.close()
+
+
+def test_status_updates_are_mirrored(bus, table):
+    heater = RelayHeaterSlice(0x0A, bus)
+    motor = MotorControllerSlice(0x10, bus)
+    assert table.attach(heater) == 0
+    assert table.attach(motor) == 1
+    assert table.attach(heater) == 0  # already attached
+    assert table.view(0).timestamp is None
+
+    heater.request_status()
+    motor.request_status()
+    heaters = table.rows(RelayHeaterSlice)
+    assert heaters.tolist() == [True, False]
+    assert table.column("temperature1")[heaters].tolist() == [pytest.approx(25.0)]
+    assert math.isnan(table.column("temperature1")[1])  # not a motor field
+
+    view = table.view(0)
+    assert type(view).__name__ == "RelayHeaterSliceView"
+    assert view.target_address == 0x0A
+    assert view.temperature1 == pytest.approx(25.0)
+    assert view.timestamp is not None
+    assert view.status_values() == pytest.approx(heater.status_values())
+
+
+def test_detached_row_is_cleared_and_reused(bus, table):
+    first = RelayHeaterSlice(0x0A, bus)
+    second = RelayHeaterSlice(0x0B, bus)
+    table.attach(first)
+    first.request_status()
+    table.detach(first)
+    assert len(table) == 0
+    with pytest.raises(KeyError):
+        table.view(0)
+    first.request_status()  # no longer mirrored
+
+    assert table.attach(second) == 0
+    assert table.view(0).timestamp is None  # seeded, nothing decoded yet
+    assert table.view(0).temperature1 == 0.0
+    second.request_status()
+    assert table.view(0).temperature1 == pytest.approx(30.0)
+
+
+def test_subclass_of_a_table_type_is_accepted(bus, table):
+    heater = BoardHeater(0x0A, bus)
+    row = table.attach(heater)
+    heater.request_status()
+    assert table.rows(RelayHeaterSlice)[row]
+    view = table.view(row)
+    assert type(view).__name__ == "RelayHeaterSliceView"
+    assert view.temperature1 == pytest.approx(25.0)
+    assert "board_temperature" not in table.fields
+
+
+def test_unknown_type_and_full_table(bus):
+    table = FleetTable([MotorControllerSlice], capacity=1)
+    try:
+        with pytest.raises(TypeError):
+            table.attach(RelayHeaterSlice(0x0A, bus))
+        table.attach(MotorControllerSlice(0x10, bus))
+        with pytest.raises(ValueError):
+            table.attach(MotorControllerSlice(0x11, bus))
+    finally:
+        table.close()
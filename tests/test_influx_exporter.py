@@ -0,0 +1,160 @@
+# tests/test_influx_exporter.py
+import http.server
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pyCRUMBS")
+
+from loafware.influx_exporter import (  # noqa: E402
+    SPILL,
+    InfluxExporter,
+    to_line_protocol,
+)
+
+
+class _Sink(http.server.ThreadingHTTPServer):
+    """Line protocol endpoint answering with queued status codes (then 204)."""
+
+    daemon_threads = True
+
+    def __init__(self, statuses=()):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.statuses = list(statuses)
+        self.lines = []
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:%d" % self.server_port
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        status = self.server.statuses.pop(0) if self.server.statuses else 204
+        if status < 300:
+            self.server.lines.extend(body.decode().splitlines())
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def sink():
+    server = _Sink()
+    yield server
+    server.close()
+
+
+def test_line_protocol_escaping_and_types():
+    line = to_line_protocol(
+        "slice status",
+        {"slice": "Relay,Heater", "address": "0x0A"},
+        {"temperature1": 21.5, "mode": 1, "brakes": True, "name": 'a "b"'},
+        123,
+    )
+    assert line == (
+        "slice\\ status,address=0x0A,slice=Relay\\,Heater "
+        'temperature1=21.5,mode=1i,brakes=true,name="a \\"b\\"" 123'
+    )
+
+
+def test_non_finite_fields_are_left_out():
+    fields = {"a": float("nan"), "b": 1.5, "c": float("inf")}
+    assert to_line_protocol("m", {}, fields, 5) == "m b=1.5 5"
+    assert to_line_protocol("m", {}, {"a": float("nan")}, 5) == ""
+
+
+def test_stop_drains_past_rejected_and_empty_batches(sink):
+    sink.statuses = [400]
+    exporter = InfluxExporter(sink.url, batch_size=2)
+    exporter.record({}, {"x": 1.0}, 1)
+    exporter.record({}, {"x": 2.0}, 2)  # first batch: rejected
+    exporter.record({}, {"x": float("nan")}, 3)
+    exporter.record({}, {"x": float("nan")}, 4)  # nothing to send
+    exporter.record({}, {"x": 5.0}, 5)
+    exporter.stop()
+    stats = exporter.stats()
+    assert sink.lines == ["slice_status x=5.0 5"]
+    assert stats["queue_depth"] == 0
+    assert stats["samples_sent"] == 1
+    assert stats["samples_dropped"] == 4
+
+
+def test_unreachable_sink_spills_and_backfills(tmp_path, sink):
+    spill = str(tmp_path / "spill.lp")
+    down = InfluxExporter("http://127.0.0.1:9", overflow=SPILL, spill_path=spill)
+    for i in range(5):
+        down.record({}, {"x": float(i)}, i)
+    assert down.drain() == 0
+    assert down.stats()["samples_spilled"] == 5
+
+    exporter = InfluxExporter(sink.url, overflow=SPILL, spill_path=spill)
+    exporter.record({}, {"x": 9.0}, 9)
+    assert exporter.flush() == 1
+    assert sorted(sink.lines) == sorted(
+        ["slice_status x=%.1f %d" % (i, i) for i in (0, 1, 2, 3, 4, 9)]
+    )
+
+
+def test_drop_newest_overflow(sink):
+    exporter = InfluxExporter(sink.url, max_queue=2, overflow="drop_newest")
+    assert exporter.record({}, {"x": 1.0}, 1)
+    assert exporter.record({}, {"x": 2.0}, 2)
+    assert not exporter.record({}, {"x": 3.0}, 3)
+    assert exporter.drain() == 2
+    assert exporter.stats()["samples_dropped"] == 1
+
+
+def test_store_backfill_never_overflows_the_queue(tmp_path, sink):
+    pytest.importorskip("numpy")
+    from loafware.telemetry_store import TelemetryStore
+
+    class _Slice:
+        target_address = 0x0A
+
+    store = TelemetryStore(str(tmp_path))
+    for i in range(50):
+        # a NaN-only sample in every batch must not stop the drain
+        value = float("nan") if i % 10 == 0 else float(i)
+        store.on_status(_Slice(), float(i), {"temperature1": value})
+    store.flush()
+    exporter = InfluxExporter(sink.url, batch_size=5, max_queue=10)
+    assert store.backfill(exporter, batch=10) == 50
+    stats = exporter.stats()
+    assert stats["samples_sent"] == 45
+    assert stats["samples_dropped"] == 5
+    assert stats["queue_depth"] == 0
+
+
+def test_stage_output_is_exported_at_its_own_time(sink):
+    from loafware.telemetry_aggregation import WindowAggregator
+
+    class _Slice:
+        target_address = 0x0A
+
+    windows = WindowAggregator(window=10.0, fields=["x"])
+    exporter = InfluxExporter(sink.url)
+    windows.add_listener(exporter.on_status)
+    source = _Slice()
+    start = (time.monotonic() // 10.0 - 30) * 10.0  # five minutes ago
+    for i in range(3):
+        windows.on_status(source, start + 10.0 * i, {"x": float(i)})
+    assert exporter.drain() == 2
+    stamps = [int(line.rsplit(" ", 1)[1]) for line in sink.lines]
+    # each window is stamped with its end, not with when it was emitted
+    assert stamps[1] - stamps[0] == pytest.approx(10e9, abs=1e6)
+    age = time.time_ns() - stamps[0]
+    assert age == pytest.approx(290e9, abs=11e9)
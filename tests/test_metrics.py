@@ -0,0 +1,93 @@
+# tests/test_metrics.py
+import pytest
+
+pytest.importorskip("pyCRUMBS")
+
+from loafware.bus_worker import BusWorker  # noqa: E402
+from loafware.metrics import (  # noqa: E402
+    METRICS,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+)
+from loafware.relay_heater_slice import RelayHeaterSlice  # noqa: E402
+from loafware.simulated_bus import SimulatedCrumbsBus, SimulatedRLHT  # noqa: E402
+
+
+@pytest.fixture
+def metrics():
+    METRICS.reset()
+    METRICS.enabled = True
+    yield METRICS
+    METRICS.enabled = True
+    METRICS.reset()
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("jobs_total", "Jobs.", ("kind",)))
+    histogram = registry.register(Histogram("wait_seconds", "Wait.", buckets=(0.1, 1)))
+    gauge = registry.register(Gauge("depth", "Depth.", ("queue",)))
+    with pytest.raises(ValueError):
+        registry.register(Counter("jobs_total", "Again."))
+
+    counter.inc('say "hi"')
+    counter.inc('say "hi"', amount=2)
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5.0)
+    gauge.add_source(lambda: {("bus",): 3})
+
+    def broken():
+        raise RuntimeError("source gone")
+
+    gauge.add_source(broken)  # logged, does not hide the other sources
+    text = registry.to_prometheus()
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{kind="say \\"hi\\""} 3.0' in text
+    assert 'wait_seconds_bucket{le="0.1"} 1' in text
+    assert 'wait_seconds_bucket{le="1.0"} 2' in text
+    assert 'wait_seconds_bucket{le="+Inf"} 3' in text
+    assert "wait_seconds_count 3" in text
+    assert 'depth{queue="bus"} 3.0' in text
+
+    snapshot = registry.snapshot()
+    assert snapshot["wait_seconds"]["values"][()]["sum"] == pytest.approx(5.55)
+    registry.reset()
+    assert registry.snapshot()["jobs_total"]["values"] == {}
+
+
+def test_slice_hooks_count_transactions_and_errors(metrics):
+    bus = SimulatedCrumbsBus()
+    bus.add_device(0x0A, SimulatedRLHT())
+    RelayHeaterSlice(0x0A, bus).change_setpoints(40.0, 40.0)
+    RelayHeaterSlice(0x0A, bus).request_status()
+    RelayHeaterSlice(0x0B, bus).request_status()
+    RelayHeaterSlice(0x0B, bus).change_setpoints(40.0, 40.0)
+
+    sends = metrics.transactions.snapshot()
+    assert sends[("0x0A", "send_command", "2")] == 1
+    errors = metrics.errors.snapshot()
+    assert errors == {("0x0B", "request_failed"): 1, ("0x0B", "send_failed"): 1}
+    latency = metrics.latency.snapshot()
+    assert latency[("request_status",)]["count"] == 2
+    assert latency[("parse",)]["count"] == 1
+
+
+def test_disabled_metrics_record_nothing(metrics):
+    bus = SimulatedCrumbsBus()
+    metrics.enabled = False
+    RelayHeaterSlice(0x0B, bus).request_status()
+    assert metrics.errors.snapshot() == {}
+    assert metrics.latency.snapshot() == {}
+
+
+def test_bus_worker_reports_queue_depth(metrics):
+    worker = BusWorker(SimulatedCrumbsBus(), name="rack1")
+    try:
+        depths = metrics.queue_depth.snapshot()
+        assert depths[("rack1", "telemetry")] == 0
+    finally:
+        worker.close()
+    assert ("rack1", "telemetry") not in metrics.queue_depth.snapshot()
@@ -0,0 +1,123 @@
+# tests/test_pid_engine.py
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pyCRUMBS")
+
+from loafware import relay_heater_slice as rlht  # noqa: E402
+from loafware.pid_engine import PIDEngine  # noqa: E402
+from loafware.relay_heater_slice import RelayHeaterSlice  # noqa: E402
+from loafware.simulated_bus import SimulatedCrumbsBus, SimulatedRLHT  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.now += delay
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def heater(clock):
+    bus = SimulatedCrumbsBus(clock=clock)
+    bus.add_device(0x0A, SimulatedRLHT(ambient=20.0, heat_capacity=10.0))
+    heater = RelayHeaterSlice(0x0A, bus)
+    assert heater.change_mode(rlht.WRITE)
+    return heater
+
+
+def test_compute_clamps_and_stops_windup(heater, clock):
+    engine = PIDEngine(period=0.1, clock=clock)
+    engine.add_channel(heater, "temperature1", 0, setpoint=50.0, kp=1.0, ki=1.0)
+    engine.compute(np.array([45.0]), 1.0)
+    assert engine.output.tolist() == [pytest.approx(10.0)]
+    assert engine.integral.tolist() == [pytest.approx(5.0)]
+    # far below the setpoint: saturated, the integral does not wind up
+    for _ in range(10):
+        output = engine.compute(np.array([0.0]), 1.0)
+    assert output.tolist() == [100.0]
+    assert engine.integral.tolist() == [pytest.approx(5.0)]
+    # so the output drops back as soon as the setpoint is reached
+    assert engine.compute(np.array([50.0]), 1.0).tolist() == [pytest.approx(5.0)]
+    engine.reset()
+    assert engine.integral.tolist() == [0.0]
+
+
+def test_derivative_acts_on_measurement_only(heater, clock):
+    engine = PIDEngine(period=0.1, clock=clock)
+    engine.add_channel(heater, "temperature1", 0, setpoint=30.0, kp=0.0, kd=1.0)
+    engine.compute(np.array([20.0]), 0.1)  # primes the derivative
+    engine.set_setpoint(0, 80.0)  # no setpoint kick
+    assert engine.compute(np.array([20.0]), 0.1).tolist() == [0.0]
+    engine.compute(np.array([19.0]), 0.1)  # falling: push up
+    assert engine.output.tolist() == [pytest.approx(10.0)]
+
+
+def test_closed_loop_reaches_setpoint(heater, clock):
+    engine = PIDEngine(period=0.1, clock=clock)
+    engine.add_channel(heater, "temperature1", 0, setpoint=40.0, kp=10.0, ki=1.0)
+    for _ in range(1200):
+        clock.now += 0.1
+        heater.request_status()
+        engine.tick()
+    assert heater.temperature1 == pytest.approx(40.0, abs=0.5)
+    assert engine.stats.write_failures == 0
+    assert 0 < engine.stats.writes <= 1200
+
+
+def test_stale_channels_are_held(heater, clock):
+    engine = PIDEngine(period=0.1, clock=clock)
+    engine.add_channel(heater, "temperature1", 0, setpoint=40.0, kp=1.0, ki=1.0)
+    heater.request_status()
+    engine.tick()
+    held = (engine.output.tolist(), engine.integral.tolist())
+    clock.now += 1.0  # the slice is no longer polled
+    engine.tick()
+    engine.tick()
+    assert (engine.output.tolist(), engine.integral.tolist()) == held
+    assert engine.stats.stale == 2
+    assert engine.stats.writes == 1  # unchanged outputs are not rewritten
+
+
+def test_fixed_rate_loop_counts_overruns(heater, clock):
+    engine = PIDEngine(period=0.01, clock=clock, sleep=clock.sleep)
+    engine.add_channel(heater, "temperature1", 0, setpoint=40.0, kp=1.0)
+    engine.run(duration=0.095)
+    assert engine.stats.ticks == 10
+    assert clock.now < 0.095
+    assert engine.stats.overruns == 0
+
+    def slow_clock():
+        clock.now += 0.008  # every reading costs time: ticks overrun
+        return clock.now
+
+    engine = PIDEngine(period=0.01, clock=slow_clock, sleep=clock.sleep)
+    engine.add_channel(heater, "temperature1", 0, setpoint=40.0, kp=1.0)
+    engine.run(duration=0.5)
+    stats = engine.stats.as_dict()
+    assert stats["overruns"] == stats["ticks"]
+    assert stats["skipped"] > 0
+    assert stats["max_compute"] >= 0.008
+
+
+def test_channel_validation(heater, clock):
+    engine = PIDEngine(clock=clock)
+    with pytest.raises(ValueError):
+        engine.add_channel(heater, "temperature1", 2, setpoint=40.0, kp=1.0)
+    with pytest.raises(ValueError):
+        engine.add_channel(
+            heater, "temperature1", 0, setpoint=40.0, kp=1.0, out_min=5, out_max=5
+        )
+    with pytest.raises(TypeError):
+        engine.add_channel(object(), "temperature1", 0, setpoint=40.0, kp=1.0)
+    with pytest.raises(ValueError):
+        PIDEngine(period=0.0)
@@ -0,0 +1,106 @@
+# tests/test_rest_api.py
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pyCRUMBS")
+
+from loafware.relay_heater_slice import RelayHeaterSlice  # noqa: E402
+from loafware.rest_api import RestServer  # noqa: E402
+from loafware.simulated_bus import SimulatedCrumbsBus, SimulatedRLHT  # noqa: E402
+
+
+@pytest.fixture
+def api():
+    bus = SimulatedCrumbsBus()
+    bus.add_device(0x0A, SimulatedRLHT())
+    rlht = RelayHeaterSlice(0x0A, bus)
+    server = RestServer({("bus0", 0x0A): rlht}, port=0)
+    server.start()
+    yield server, rlht
+    server.stop()
+
+
+def _request(server, method, path, headers=None, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+
+def test_state_and_etag(api):
+    server, rlht = api
+    rlht.request_status()
+    status, headers, body = _request(server, "GET", "/slices/bus0/0x0A")
+    assert status == 200
+    doc = json.loads(body)
+    assert doc["address"] == 0x0A
+    assert doc["values"]["temperature1"] == rlht.temperature1
+    etag = headers["ETag"]
+
+    for match in (etag, "W/" + etag, '"1", %s' % etag, "*"):
+        status, _, body = _request(
+            server, "GET", "/slices/bus0/0x0A", {"If-None-Match": match}
+        )
+        assert (status, body) == (304, b"")
+    status, _, _ = _request(server, "GET", "/slices", {"If-None-Match": '"0"'})
+    assert status == 200
+
+
+def test_long_poll_returns_on_new_status(api):
+    server, rlht = api
+    _, headers, _ = _request(server, "GET", "/slices")
+    timer = threading.Timer(0.2, rlht.request_status)
+    timer.start()
+    started = time.monotonic()
+    status, new_headers, _ = _request(
+        server, "GET", "/slices?wait=5", {"If-None-Match": headers["ETag"]}
+    )
+    assert status == 200
+    assert new_headers["ETag"] != headers["ETag"]
+    assert 0.1 < time.monotonic() - started < 4.0
+    timer.join()
+
+
+def test_head_does_not_stream(api):
+    server, _ = api
+    started = time.monotonic()
+    status, headers, body = _request(server, "HEAD", "/stream")
+    assert status == 200
+    assert headers["Content-Type"] == "text/event-stream"
+    assert body == b""
+    assert time.monotonic() - started < 2.0
+    status, headers, body = _request(server, "HEAD", "/slices")
+    assert status == 200 and "ETag" in headers and body == b""
+
+
+def test_queued_command(api):
+    server, rlht = api
+    status, _, body = _request(
+        server,
+        "POST",
+        "/slices/bus0/0x0A/change_setpoints",
+        {"Content-Type": "application/json"},
+        json.dumps([40.0, 50.0]),
+    )
+    assert status == 202
+    command = json.loads(body)["status"]
+    for _ in range(100):
+        _, _, body = _request(server, "GET", command)
+        record = json.loads(body)
+        if record["state"] != "queued":
+            break
+        time.sleep(0.01)
+    assert record["state"] == "done" and record["result"] is True
+    assert (rlht.setpoint1, rlht.setpoint2) == (40.0, 50.0)
+
+    status, _, _ = _request(server, "POST", "/slices/bus0/0x0A/handle_message")
+    assert status == 403
+    status, _, _ = _request(server, "GET", "/slices/bus0/0x0B")
+    assert status == 404
@@ -0,0 +1,94 @@
+# tests/test_simulated_bus.py
+import pytest
+
+pytest.importorskip("pyCRUMBS")
+
+from loafware import motor_controller_slice as dcmt  # noqa: E402
+from loafware.motor_controller_slice import MotorControllerSlice  # noqa: E402
+from loafware.relay_heater_slice import RelayHeaterSlice  # noqa: E402
+from loafware.simulated_bus import (  # noqa: E402
+    SimulatedCrumbsBus,
+    SimulatedDCMT,
+    SimulatedRLHT,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_heater_follows_setpoint(clock):
+    bus = SimulatedCrumbsBus(clock=clock)
+    bus.add_device(0x0A, SimulatedRLHT(ambient=20.0))
+    heater = RelayHeaterSlice(0x0A, bus)
+    assert heater.change_setpoints(60.0, 20.0)
+    heater.request_status()
+    assert heater.temperature1 == pytest.approx(20.0)
+
+    clock.now += 5.0
+    heater.request_status()
+    assert 20.0 < heater.temperature1 < 60.0
+    assert heater.temperature2 == pytest.approx(20.0)
+    assert heater.relay_on_time1 > 0.0
+    assert heater.setpoint1 == 60.0
+
+
+def test_motor_reaches_position_setpoint(clock):
+    bus = SimulatedCrumbsBus(clock=clock)
+    bus.add_device(0x10, SimulatedDCMT())
+    motor = MotorControllerSlice(0x10, bus)
+    assert motor.change_mode(dcmt.CLOSED_LOOP_POSITION)
+    assert motor.set_position_setpoints(10.0, -5.0)
+    for _ in range(50):
+        clock.now += 0.1
+        motor.request_status()
+    assert motor.motor1_pos == pytest.approx(10.0, abs=0.5)
+    assert motor.motor2_pos == pytest.approx(-5.0, abs=0.5)
+
+
+def test_absent_and_nacking_devices():
+    bus = SimulatedCrumbsBus(nack_rate=1.0)
+    bus.add_device(0x0A, SimulatedRLHT())
+    heater = RelayHeaterSlice(0x0A, bus)
+    assert heater.request_status() is None
+    assert not heater.change_setpoints(40.0, 40.0)
+    assert bus.nacks == bus.transactions == 2
+
+    bus = SimulatedCrumbsBus()
+    bus.add_device(0x0A, SimulatedRLHT())
+    bus.remove_device(0x0A)
+    assert bus.request_message(0x0A) is None
+    assert bus.nacks == 1
+
+
+def test_latency_is_spent_per_transaction():
+    slept = []
+    bus = SimulatedCrumbsBus(
+        latency=0.002, latency_jitter=0.001, seed=1, sleep=slept.append
+    )
+    bus.add_device(0x0A, SimulatedRLHT())
+    bus.request_message(0x0A)
+    bus.request_message(0x0B)
+    assert len(slept) == 2
+    assert all(0.002 <= delay <= 0.003 for delay in slept)
+
+
+def test_corrupted_replies_are_seeded():
+    def replies(seed):
+        bus = SimulatedCrumbsBus(corrupt_rate=0.5, seed=seed)
+        bus.add_device(0x0A, SimulatedRLHT())
+        frames = [bus.request_message(0x0A) for _ in range(20)]
+        return bus.corrupted, [(m.typeID, m.data, m.errorFlags) for m in frames]
+
+    corrupted, frames = replies(7)
+    assert 0 < corrupted < 20
+    assert replies(7) == (corrupted, frames)
@@ -0,0 +1,145 @@
+# tests/test_slice_poller.py
+import pytest
+
+pytest.importorskip("pyCRUMBS")
+
+from loafware.motor_controller_slice import MotorControllerSlice  # noqa: E402
+from loafware.relay_heater_slice import RelayHeaterSlice  # noqa: E402
+from loafware.simulated_bus import (  # noqa: E402
+    SimulatedCrumbsBus,
+    SimulatedDCMT,
+    SimulatedRLHT,
+)
+from loafware.slice_poller import AdaptivePolicy, SlicePoller  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _run(poller, clock, duration, step=0.001):
+    end = clock.now + duration
+    while clock.now < end:
+        while poller.run_once() is not None:
+            pass
+        clock.now += step
+
+
+@pytest.fixture
+def rack():
+    clock = FakeClock()
+    bus = SimulatedCrumbsBus(clock=clock)
+    bus.add_device(0x0A, SimulatedRLHT())
+    bus.add_device(0x10, SimulatedDCMT())
+    rlht = RelayHeaterSlice(0x0A, bus)
+    dcmt = MotorControllerSlice(0x10, bus)
+    return clock, bus, rlht, dcmt
+
+
+def test_each_slice_is_polled_at_its_own_period(rack):
+    clock, bus, rlht, dcmt = rack
+    poller = SlicePoller(bus, clock=clock)
+    assert poller.add_slice(rlht, 0.1)
+    assert poller.add_slice(dcmt, 0.01)
+    _run(poller, clock, 1.0)
+    stats = poller.stats()
+    assert stats[0x0A]["polls"] == pytest.approx(10, abs=1)
+    assert stats[0x10]["polls"] == pytest.approx(100, abs=2)
+    assert stats[0x10]["achieved_rate"] == pytest.approx(100.0, rel=0.05)
+    assert stats[0x10]["missed_deadlines"] == 0
+    assert stats[0x10]["failures"] == 0
+
+
+def test_earliest_deadline_is_polled_first(rack):
+    clock, bus, rlht, dcmt = rack
+    poller = SlicePoller(bus, clock=clock)
+    poller.add_slice(rlht, 1.0)
+    poller.add_slice(dcmt, 0.01)
+    # both released at t=0: the 10 ms slice has the earlier deadline
+    assert poller.run_once() is dcmt
+    assert poller.run_once() is rlht
+    assert poller.run_once() is None
+    assert poller.time_until_next() == pytest.approx(0.01)
+
+
+def test_overrun_skips_periods_and_counts_misses(rack):
+    clock, bus, rlht, dcmt = rack
+    poller = SlicePoller(bus, clock=clock)
+    poller.add_slice(dcmt, 0.01)
+    poller.run_once()
+    clock.now = 0.055  # the loop stalled for five periods
+    poller.run_once()
+    assert poller.stats()[0x10]["missed_deadlines"] == 4
+    # back on the 10 ms grid: one poll for the current period, no burst
+    assert poller.run_once() is dcmt
+    assert poller.run_once() is None
+    assert poller.time_until_next() == pytest.approx(0.005)
+
+
+def test_failed_polls_are_counted(rack):
+    clock, bus, rlht, dcmt = rack
+    poller = SlicePoller(bus, clock=clock)
+    poller.add_slice(rlht, 0.1)
+    bus.remove_device(0x0A)
+    _run(poller, clock, 0.35)
+    stats = poller.stats()[0x0A]
+    assert stats["polls"] == stats["failures"] == 4
+
+
+def test_remove_and_reschedule(rack):
+    clock, bus, rlht, dcmt = rack
+    poller = SlicePoller(bus, clock=clock)
+    poller.add_slice(rlht, 0.1)
+    assert poller.set_period(0x0A, 0.05)
+    _run(poller, clock, 0.5)
+    assert poller.stats()[0x0A]["polls"] == pytest.approx(10, abs=1)
+    assert poller.remove_slice(0x0A)
+    assert not poller.remove_slice(0x0A)
+    transactions = bus.transactions
+    _run(poller, clock, 0.5)
+    assert bus.transactions == transactions
+    assert poller.time_until_next() is None
+
+
+def test_rejects_slices_of_another_bus(rack):
+    clock, bus, rlht, dcmt = rack
+    poller = SlicePoller(SimulatedCrumbsBus(clock=clock), clock=clock)
+    assert not poller.add_slice(rlht, 0.1)
+    assert not poller.add_slice(dcmt, 0.0)
+
+
+def test_adaptive_policy_period():
+    policy = AdaptivePolicy(0.1, 2.0, {"temperature1": 0.5, "mode": 0}, growth=2.0)
+    quiet = {"temperature1": 20.0, "mode": 0}
+    assert policy.next_period(0.5, 0.5, quiet, quiet) == 1.0  # grows gradually
+    assert policy.next_period(1.5, 1.5, quiet, quiet) == 2.0  # up to max_period
+    # 1 C in 1 s against a 0.5 C deadband: sample every 0.5 s, at once
+    warming = {"temperature1": 21.0, "mode": 0}
+    assert policy.next_period(2.0, 1.0, quiet, warming) == pytest.approx(0.5)
+    switched = {"temperature1": 20.0, "mode": 1}
+    assert policy.next_period(2.0, 1.0, quiet, switched) == 0.1
+    with pytest.raises(ValueError):
+        AdaptivePolicy(1.0, 0.5, {})
+    with pytest.raises(ValueError):
+        AdaptivePolicy(0.1, 1.0, {}, growth=1.0)
+
+
+def test_adaptive_slice_slows_down_and_snaps_back_on_command(rack):
+    clock, bus, rlht, dcmt = rack
+    poller = SlicePoller(bus, clock=clock)
+    policy = AdaptivePolicy(0.05, 1.0, {"temperature1": 0.5, "setpoint1": 0})
+    poller.add_slice(rlht, 0.05, adaptive=policy)
+    _run(poller, clock, 5.0)
+    assert poller.stats()[0x0A]["period"] == 1.0  # nothing moves
+
+    assert rlht.change_setpoints(60.0, 60.0)
+    assert poller.stats()[0x0A]["period"] == 0.05
+    assert poller.run_once() is rlht  # polled right away
+    # the poll saw the setpoint change (deadband 0): still at the fastest rate
+    assert poller.stats()[0x0A]["period"] == 0.05
+    _run(poller, clock, 0.1)
+    assert poller.stats()[0x0A]["period"] == pytest.approx(0.075)  # calm again
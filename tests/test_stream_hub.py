@@ -0,0 +1,102 @@
+# tests/test_stream_hub.py
+import json
+
+import pytest
+
+pytest.importorskip("pyCRUMBS")
+
+from loafware.relay_heater_slice import RelayHeaterSlice  # noqa: E402
+from loafware.simulated_bus import SimulatedCrumbsBus, SimulatedRLHT  # noqa: E402
+from loafware.stream_hub import StreamHub  # noqa: E402
+
+
+class Source:
+    """Minimal status source publishing samples at chosen timestamps."""
+
+    def __init__(self):
+        self.listeners = []
+
+    def add_status_listener(self, callback):
+        self.listeners.append(callback)
+
+    def remove_status_listener(self, callback):
+        self.listeners.remove(callback)
+
+    def publish(self, timestamp, **values):
+        for callback in list(self.listeners):
+            callback(self, timestamp, values)
+
+
+def _decode(frame):
+    event, data, blank = frame.decode("utf-8").split("\n", 2)
+    assert event == "event: status" and blank == "\n"
+    return json.loads(data[len("data: ") :])
+
+
+def test_slice_status_is_streamed_with_filters():
+    bus = SimulatedCrumbsBus()
+    bus.add_device(0x0A, SimulatedRLHT(ambient=24.0))
+    bus.add_device(0x0B, SimulatedRLHT())
+    hub = StreamHub()
+    first, second = RelayHeaterSlice(0x0A, bus), RelayHeaterSlice(0x0B, bus)
+    hub.add((1, 0x0A), first)
+    hub.add((1, 0x0B), second)
+    everything = hub.subscribe()
+    narrow = hub.subscribe(slices=[(1, 0x0A)], fields=["temperature1"])
+    first.request_status()
+    second.request_status()
+
+    event = everything.get(1.0)
+    assert (event.key, event.type) == ((1, 0x0A), "RelayHeaterSlice")
+    assert set(event.values) == set(RelayHeaterSlice.STATUS_FIELDS)
+    assert everything.get(1.0).key == (1, 0x0B)
+
+    frame = narrow.get(1.0).sse(narrow.fields)
+    payload = _decode(frame)
+    assert payload["bus"] == 1 and payload["address"] == 0x0A
+    assert payload["values"] == {"temperature1": pytest.approx(24.0)}
+    assert narrow.get(0.01) is None  # 0x0B filtered out
+    assert event.sse(narrow.fields) is frame  # encoded once per filter
+
+    hub.remove((1, 0x0A), first)
+    first.request_status()
+    assert everything.get(0.01) is None
+
+
+def test_rate_limit_keeps_a_fixed_grid():
+    hub = StreamHub()
+    source = Source()
+    hub.add(("bus", 1), source)
+    limited = hub.subscribe(max_rate=10.0)
+    for i in range(20):  # 20 Hz with a little jitter
+        source.publish(i * 0.05 + (0.004 if i % 2 else 0.0), value=i)
+    received = []
+    event = limited.get(0.01)
+    while event is not None:
+        received.append(event.values["value"])
+        event = limited.get(0.01)
+    assert received == list(range(0, 20, 2))
+    assert limited.decimated == 10
+
+
+def test_slow_subscriber_is_dropped():
+    hub = StreamHub()
+    source = Source()
+    hub.add(("bus", 1), source)
+    slow = hub.subscribe(max_queue=2)
+    fast = hub.subscribe()
+    for i in range(3):
+        source.publish(float(i), value=i)
+    assert slow.dropped and slow.closed
+    assert slow.get(0.01) is None
+    assert hub.subscribers_dropped == 1
+    assert hub.subscriber_count == 1
+    assert [fast.get(0.01).values["value"] for _ in range(3)] == [0, 1, 2]
+
+
+def test_close_ends_every_stream():
+    hub = StreamHub()
+    subscription = hub.subscribe()
+    hub.close()
+    assert subscription.get(5.0) is None  # returns at once
+    assert hub.subscriber_count == 0
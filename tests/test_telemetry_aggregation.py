@@ -0,0 +1,122 @@
+# tests/test_telemetry_aggregation.py
+import pytest
+
+pytest.importorskip("pyCRUMBS")
+
+from loafware.relay_heater_slice import RelayHeaterSlice  # noqa: E402
+from loafware.simulated_bus import SimulatedCrumbsBus, SimulatedRLHT  # noqa: E402
+from loafware.telemetry_aggregation import (  # noqa: E402
+    LTTBDownsampler,
+    WindowAggregator,
+)
+
+
+class Source:
+    """A status source publishing samples at chosen timestamps."""
+
+    target_address = 0x0A
+
+    def __init__(self):
+        self.listeners = []
+
+    def add_status_listener(self, callback):
+        self.listeners.append(callback)
+
+    def remove_status_listener(self, callback):
+        self.listeners.remove(callback)
+
+    def publish(self, timestamp, **values):
+        for callback in list(self.listeners):
+            callback(self, timestamp, values)
+
+
+def _collect(stage):
+    out = []
+    stage.add_listener(lambda s, t, values: out.append((t, values)))
+    return out
+
+
+def test_window_statistics():
+    source = Source()
+    windows = WindowAggregator(window=1.0)
+    windows.attach(source)
+    out = _collect(windows)
+    for t, value, mode in [(0.1, 2.0, 0), (0.5, 8.0, 0), (0.9, 5.0, 1), (1.2, 1.0, 1)]:
+        source.publish(t, temperature=value, mode=mode)
+    assert out == [
+        (
+            1.0,
+            {
+                "temperature_min": 2.0,
+                "temperature_max": 8.0,
+                "temperature_mean": 5.0,
+                "temperature_last": 5.0,
+                "mode_last": 1,  # discrete: last value only
+                "count": 3,
+            },
+        )
+    ]
+    assert windows.flush() == 1
+    assert out[1][0] == 2.0 and out[1][1]["count"] == 1
+    assert windows.stats() == {"samples_in": 4, "samples_out": 2, "reduction": 2.0}
+
+    windows.detach(source)
+    source.publish(5.0, temperature=0.0, mode=0)
+    assert windows.stats()["samples_in"] == 4
+
+
+def test_window_field_selection_and_validation():
+    source = Source()
+    windows = WindowAggregator(window=0.5, fields=["temperature"])
+    windows.attach(source)
+    out = _collect(windows)
+    source.publish(0.1, temperature=1.0, mode=0)
+    windows.flush()
+    assert set(out[0][1]) == {
+        "temperature_min",
+        "temperature_max",
+        "temperature_mean",
+        "temperature_last",
+        "count",
+    }
+    with pytest.raises(ValueError):
+        WindowAggregator(window=0.0)
+
+
+def test_lttb_keeps_peaks():
+    source = Source()
+    lttb = LTTBDownsampler(bucket=1.0)
+    lttb.attach(source)
+    out = _collect(lttb)
+    for i in range(100):  # 10 samples per bucket, one spike
+        value = 50.0 if i == 37 else 0.0
+        source.publish(i * 0.1, level=value, mode=0)
+    lttb.flush()
+    points = [(round(t, 1), values) for t, values in out]
+    assert points[0] == (0.0, {"level": 0.0})  # first sample kept
+    assert (3.7, {"level": 50.0}) in points
+    assert points[-1] == (9.9, {"level": 0.0})  # last sample kept
+    assert len(points) <= 12
+    assert all(set(values) == {"level"} for _, values in points)  # floats only
+
+
+def test_stages_chain_behind_a_slice():
+    bus = SimulatedCrumbsBus()
+    bus.add_device(0x0A, SimulatedRLHT(ambient=25.0))
+    heater = RelayHeaterSlice(0x0A, bus)
+    windows = WindowAggregator(window=60.0, fields=["temperature1"])
+    lttb = LTTBDownsampler(bucket=60.0, fields=["temperature1_mean"])
+    windows.attach(heater)
+    windows.add_listener(lttb.on_status)
+    out = _collect(lttb)
+
+    def broken(slice_obj, timestamp, values):
+        raise RuntimeError("sink bug")
+
+    windows.add_listener(broken)  # isolated from the other listeners
+    for _ in range(5):
+        heater.request_status()
+    windows.flush()
+    lttb.flush()
+    (sample,) = out
+    assert sample[1] == {"temperature1_mean": pytest.approx(25.0)}
@@ -0,0 +1,74 @@
+# tests/test_telemetry_history.py
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pyCRUMBS")
+
+from loafware.relay_heater_slice import RelayHeaterSlice  # noqa: E402
+from loafware.simulated_bus import SimulatedCrumbsBus, SimulatedRLHT  # noqa: E402
+from loafware.telemetry_history import TelemetryHistory  # noqa: E402
+
+
+def _filled(count, capacity=4):
+    history = TelemetryHistory(["a", "b"], capacity)
+    for i in range(count):
+        history.append(float(i), [i * 10.0, -i])
+    return history
+
+
+def test_keeps_the_newest_samples_in_order():
+    history = _filled(6)
+    assert len(history) == 4
+    assert history.timestamps().tolist() == [2.0, 3.0, 4.0, 5.0]
+    assert history.column("a", 2).tolist() == [40.0, 50.0]
+    assert history.last(10).shape == (4, 3)
+    assert history.latest() == {"timestamp": 5.0, "a": 50.0, "b": -5.0}
+    assert history.as_dict(1)["b"].tolist() == [-5.0]
+
+
+def test_partially_filled_and_cleared():
+    history = _filled(2)
+    assert history.timestamps().tolist() == [0.0, 1.0]
+    assert history.last(0).shape == (0, 3)
+    history.clear()
+    assert len(history) == 0
+    assert history.latest() is None
+
+
+def test_between_selects_a_time_range():
+    history = _filled(7, capacity=5)
+    assert history.between(3.0, 5.0)[:, 0].tolist() == [3.0, 4.0]
+    assert history.between(0.0, 3.0)[:, 0].tolist() == [2.0]
+    assert len(history.between(10.0, 20.0)) == 0
+
+
+def test_views_are_zero_copy():
+    history = _filled(4)
+    view = history.column("a")
+    assert np.shares_memory(view, history.last())
+    kept = np.array(view)
+    history.append(4.0, [99.0, 0.0])
+    assert kept.tolist() == [0.0, 10.0, 20.0, 30.0]
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError):
+        TelemetryHistory(["a"], 0)
+
+
+def test_slice_records_each_decoded_status():
+    bus = SimulatedCrumbsBus()
+    bus.add_device(0x0A, SimulatedRLHT(ambient=21.0))
+    heater = RelayHeaterSlice(0x0A, bus)
+    history = heater.enable_history(capacity=8)
+    assert history.fields == RelayHeaterSlice.STATUS_FIELDS
+    for _ in range(3):
+        heater.request_status()
+    assert len(history) == 3
+    assert history.column("temperature1").tolist() == pytest.approx([21.0] * 3)
+    assert np.all(np.diff(history.timestamps()) >= 0)
+
+    heater.disable_history()
+    heater.request_status()
+    assert heater.history is None
+    assert len(history) == 3
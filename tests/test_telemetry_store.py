@@ -0,0 +1,60 @@
+# tests/test_telemetry_store.py
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pyCRUMBS")
+
+from loafware.telemetry_store import INDEX_FILE, TelemetryStore  # noqa: E402
+
+
+class _Slice:
+    target_address = 0x0A
+
+
+def _feed(store, start, count):
+    for i in range(start, start + count):
+        store.on_status(_Slice(), float(i), {"temperature1": float(i), "mode": 0})
+    store.flush()
+
+
+def _segment(root):
+    series = os.path.join(root, "_Slice_0x0A")
+    (name,) = [name for name in os.listdir(series) if name.startswith("seg-")]
+    return os.path.join(series, name)
+
+
+def test_reopen_after_torn_append(tmp_path):
+    root = str(tmp_path)
+    store = TelemetryStore(root, index_every=4)
+    _feed(store, 0, 10)
+    segment = _segment(root)
+
+    # a crash mid-append: the columns and the index end at different rows
+    with open(os.path.join(segment, "temperature1.f8"), "ab") as f:
+        f.write(b"\0" * 20)
+    with open(os.path.join(segment, "timestamp.f8"), "ab") as f:
+        f.write(b"\0" * 5)
+    with open(os.path.join(segment, INDEX_FILE), "r+b") as f:
+        f.truncate(8)
+
+    store = TelemetryStore(root, index_every=4)
+    sizes = {
+        name: os.path.getsize(os.path.join(segment, name))
+        for name in os.listdir(segment)
+    }
+    assert sizes == {
+        "timestamp.f8": 80,
+        "temperature1.f8": 80,
+        "mode.f8": 80,
+        INDEX_FILE: 24,
+    }
+
+    _feed(store, 10, 10)
+    result = store.query("_Slice_0x0A", ["temperature1"])
+    assert list(result["temperature1"]) == [float(i) for i in range(20)]
+    index = np.fromfile(os.path.join(segment, INDEX_FILE), dtype="<f8")
+    assert list(index) == list(result["timestamp"][::4])
+    later = store.query("_Slice_0x0A", ["temperature1"], start=result["timestamp"][13])
+    assert list(later["temperature1"]) == [float(i) for i in range(13, 20)]
@@ -0,0 +1,100 @@
+# tests/test_tracing.py
+import json
+
+import pytest
+
+pytest.importorskip("pyCRUMBS")
+
+from loafware.bus_worker import BusWorker  # noqa: E402
+from loafware.relay_heater_slice import RelayHeaterSlice  # noqa: E402
+from loafware.simulated_bus import SimulatedCrumbsBus, SimulatedRLHT  # noqa: E402
+from loafware.tracing import TRACER, Tracer  # noqa: E402
+
+
+@pytest.fixture
+def tracer():
+    TRACER.disable()
+    TRACER.clear()
+    yield TRACER
+    TRACER.disable()
+    TRACER.clear()
+
+
+@pytest.fixture
+def heater():
+    bus = SimulatedCrumbsBus()
+    bus.add_device(0x0A, SimulatedRLHT())
+    return RelayHeaterSlice(0x0A, bus)
+
+
+def test_spans_are_recorded_only_while_enabled():
+    tracer = Tracer(capacity=2)
+    toggles = []
+    tracer.add_toggle(toggles.append)
+    with tracer.span("sweep"):
+        pass
+    assert tracer.spans() == []
+    tracer.enable()
+    tracer.enable()  # already on: no second toggle
+    for i in range(3):
+        with tracer.span("sweep", index=i):
+            pass
+    spans = tracer.spans()
+    assert [(s[0], s[1], s[5]) for s in spans] == [
+        ("sweep", "app", {"index": 1}),
+        ("sweep", "app", {"index": 2}),
+    ]
+    assert all(s[3] >= 0.0 for s in spans)
+    assert tracer.dropped == 1
+    tracer.enable(capacity=10)  # resizing clears the buffer
+    assert tracer.spans() == [] and tracer.capacity == 10
+    tracer.disable()
+    assert toggles == [True, False]
+
+
+def test_chrome_trace_export(tmp_path):
+    tracer = Tracer()
+    tracer.enable()
+    tracer.record("poll", "slice", 1.0, 1.5, {"address": "0x0A"})
+    path = str(tmp_path / "trace.json")
+    assert tracer.dump(path) == 1
+    with open(path) as f:
+        events = json.load(f)["traceEvents"]
+    names = [e for e in events if e["ph"] == "M"]
+    assert names and names[0]["name"] == "thread_name"
+    (span,) = [e for e in events if e["ph"] == "X"]
+    assert span["name"] == "poll" and span["cat"] == "slice"
+    assert span["ts"] == 1e6 and span["dur"] == 0.5e6
+    assert span["args"] == {"address": "0x0A"}
+
+
+def test_slice_methods_are_traced_while_enabled(tracer, heater):
+    heater.request_status()
+    assert tracer.spans() == []
+
+    tracer.enable()
+    heater.request_status()
+    heater.change_setpoints(40.0, 40.0)
+    spans = {(s[0], s[1]): s[5] for s in tracer.spans()}
+    assert spans[("request_status", "slice")] == {"address": "0x0A"}
+    assert spans[("handle_message", "slice")]["address"] == "0x0A"
+    assert spans[("send_command", "slice")] == {"address": "0x0A", "command": 2}
+
+    tracer.disable()
+    tracer.clear()
+    heater.request_status()
+    assert tracer.spans() == []
+
+
+def test_bus_worker_transactions_carry_queue_details(tracer, heater):
+    worker = BusWorker(heater.crumbs, name="rack")
+    try:
+        tracer.enable()
+        worker.request_message(0x0A)
+    finally:
+        worker.close()
+    (span,) = [s for s in tracer.spans() if s[1] == "bus_worker"]
+    assert span[0] == "request_message"
+    assert span[5]["queue"] == "rack"
+    assert span[5]["priority"] == "telemetry"
+    assert span[5]["address"] == "0x0A"
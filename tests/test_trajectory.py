@@ -0,0 +1,92 @@
+# tests/test_trajectory.py
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pyCRUMBS")
+
+from loafware.motor_controller_slice import MotorControllerSlice  # noqa: E402
+from loafware.simulated_bus import SimulatedCrumbsBus, SimulatedDCMT  # noqa: E402
+from loafware.trajectory import (  # noqa: E402
+    TrajectoryExecutor,
+    ramp_soak,
+    s_curve,
+    trapezoid,
+)
+
+
+@pytest.fixture
+def dcmt():
+    bus = SimulatedCrumbsBus()
+    bus.add_device(0x10, SimulatedDCMT())
+    return MotorControllerSlice(0x10, bus)
+
+
+@pytest.mark.parametrize("profile", [trapezoid, s_curve])
+def test_move_profiles_respect_limits(profile):
+    times, positions = profile(0.0, 10.0, max_velocity=4.0, max_accel=8.0, dt=0.01)
+    assert positions[0] == pytest.approx(0.0)
+    assert positions[-1] == pytest.approx(10.0)
+    assert np.all(np.diff(times) > 0)
+    assert np.all(np.diff(positions) >= -1e-9)
+    velocity = np.diff(positions) / np.diff(times)
+    assert velocity.max() <= 4.0 * 1.01
+
+
+def test_ramp_soak_program():
+    times, values = ramp_soak(20.0, [(50.0, 10.0, 2.0)], dt=1.0)
+    assert times[-1] == pytest.approx(5.0)  # 3 s ramp + 2 s soak
+    assert values[-1] == 50.0
+    assert np.interp(1.5, times, values) == pytest.approx(35.0)
+
+
+def test_executor_dispatches_every_point(dcmt):
+    executor = TrajectoryExecutor()
+    executor.start()
+    try:
+        times = [0.0, 0.02, 0.04, 0.06]
+        run = executor.run(dcmt, "set_position_setpoints", times, [1, 2, 3, 4], 0.5)
+        assert executor.wait([run], timeout=2.0)
+    finally:
+        executor.stop()
+    stats = run.stats()
+    assert stats["points"] == stats["sent"] == 4
+    assert stats["skipped"] == stats["failed"] == 0
+    assert (dcmt.motor1_pos_sp, dcmt.motor2_pos_sp) == (4.0, 0.5)
+
+
+def test_late_start_skips_to_newest_due_point(dcmt):
+    executor = TrajectoryExecutor()
+    executor.start()
+    try:
+        run = executor.run(
+            dcmt,
+            "set_position_setpoints",
+            [0.0, 0.1, 0.2, 10.0],
+            [1, 2, 3, 4],
+            start_at=time.monotonic() - 0.5,
+        )
+        time.sleep(0.2)
+        run.cancel()
+    finally:
+        executor.stop()
+    assert run.stats()["sent"] == 1
+    assert run.stats()["skipped"] == 2
+    assert dcmt.motor1_pos_sp == 3.0
+
+
+@pytest.mark.parametrize(
+    "times, setpoint1",
+    [
+        ([], []),
+        ([[0.0, 1.0]], [1.0, 2.0]),
+        ([0.0, 2.0, 1.0], [1.0, 2.0, 3.0]),
+        ([0.0, float("nan")], [1.0, 2.0]),
+        ([0.0, 1.0], [1.0, 2.0, 3.0]),
+    ],
+)
+def test_invalid_trajectories_are_rejected(dcmt, times, setpoint1):
+    executor = TrajectoryExecutor()
+    with pytest.raises(ValueError):
+        executor.run(dcmt, "set_position_setpoints", times, setpoint1)